@@ -3,7 +3,6 @@ import pandas as pd
 from datetime import datetime
 import streamlit as st
 import os
-import time
 import sys
 
 # Add parent directory to path to allow imports
@@ -11,7 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.speech_recognition import SpeechHandler
 from src.nlp_processor import analyze_transcription
-from src.realtime_transcription import RealtimeTranscriber
+from src.realtime_engine import get_engine
+from src.recognition_backends import get_shared_backend
+from src.transcription_cache import TranscriptionCache
 from app.visualization import StreamlitVisualizer, init_visualization
 from src import config
 
@@ -21,16 +22,20 @@ def init_session_state():
         st.session_state.recording = False
     if 'transcriber' not in st.session_state:
         st.session_state.transcriber = None
+    if 'transcript_events' not in st.session_state:
+        st.session_state.transcript_events = None
     if 'analysis_results' not in st.session_state:
         st.session_state.analysis_results = None
     if 'transcripts' not in st.session_state:
         st.session_state.transcripts = []
     if 'metrics_history' not in st.session_state:
         st.session_state.metrics_history = []
+    if 'upload_result' not in st.session_state:
+        st.session_state.upload_result = None
     init_visualization()
 
 def process_uploaded_file(uploaded_file):
-    """Process an uploaded audio file"""
+    """Process an uploaded audio file and keep the result in session state"""
     with st.spinner("Processing audio file..."):
         # Save uploaded file temporarily
         temp_path = os.path.join(config.RAW_DATA_DIR, uploaded_file.name)
@@ -41,36 +46,61 @@ def process_uploaded_file(uploaded_file):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Process the file
-        handler = SpeechHandler()
+        # The backend is shared, so model-based recognizers are not reloaded per upload
+        handler = SpeechHandler(backend=get_shared_backend(), cache=TranscriptionCache())
         result = handler.process_audio_file(temp_path)
         
+        analysis = None
         if result['success']:
-            st.success("Audio processed successfully!")
-            
-            # Create tabs for results
-            transcript_tab, analysis_tab = st.tabs(["Transcription", "Analysis"])
-            
-            with transcript_tab:
-                st.markdown("### Full Transcription")
-                st.markdown(f">{result['transcription']}")
-                
-                # Display audio visualizations with unique keys
-                st.session_state.visualizer.display_audio_waveform(
-                    temp_path, 
-                    f"upload_{timestamp}_waveform"
-                )
-                st.session_state.visualizer.display_spectrogram(temp_path)
+            analysis, _ = analyze_transcription(result['transcript_file'])
+        
+        # Widgets such as the waveform's time-range slider rerun the script,
+        # so the result is rendered from session state rather than here
+        st.session_state.upload_result = {
+            'upload': upload_id(uploaded_file),
+            'result': result,
+            'analysis': analysis,
+            'audio_file': temp_path,
+            'key': f"upload_{timestamp}"
+        }
+
+def upload_id(uploaded_file):
+    """Identify an upload, so results of a previous file are not shown for a new one"""
+    return (uploaded_file.name, uploaded_file.size)
+
+def display_upload_result():
+    """Display the processed upload kept in session state"""
+    upload = st.session_state.upload_result
+    result = upload['result']
+    
+    if result['success']:
+        st.success("Audio processed successfully!")
+        if result.get('partial'):
+            gaps = ", ".join(f"{gap['start']:.1f}-{gap['end']:.1f}s" for gap in result['failed_segments'])
+            st.warning(f"Some segments could not be transcribed, so the text has gaps at {gaps}.")
+        
+        # Create tabs for results
+        transcript_tab, analysis_tab = st.tabs(["Transcription", "Analysis"])
+        
+        with transcript_tab:
+            st.markdown("### Full Transcription")
+            st.markdown(f">{result['transcription']}")
             
-            with analysis_tab:
-                # Perform and display analysis
-                analysis, _ = analyze_transcription(result['transcript_file'])
-                st.session_state.visualizer.create_analysis_dashboard(
-                    analysis,
-                    audio_file=temp_path,
-                    key_suffix=f"upload_{timestamp}"
-                )
-        else:
-            st.error(f"Error processing audio: {result['error']}")
+            # Display audio visualizations with stable keys, so the slider keeps its range across reruns
+            time_range = st.session_state.visualizer.display_audio_waveform(
+                upload['audio_file'], 
+                f"{upload['key']}_waveform"
+            )
+            st.session_state.visualizer.display_spectrogram(upload['audio_file'], time_range=time_range)
+        
+        with analysis_tab:
+            st.session_state.visualizer.create_analysis_dashboard(
+                upload['analysis'],
+                audio_file=upload['audio_file'],
+                key_suffix=upload['key']
+            )
+    else:
+        st.error(f"Error processing audio: {result['error']}")
 
 def update_metrics_history(text=None, analysis=None):
     """Update metrics history for real-time visualization"""
@@ -125,18 +155,31 @@ def main():
             
             if st.button("Process Audio"):
                 process_uploaded_file(uploaded_file)
+            
+            upload = st.session_state.upload_result
+            if upload and upload['upload'] == upload_id(uploaded_file):
+                display_upload_result()
     
     else:  # Real-time Recording mode
         st.header("Real-time Recording")
         
         # Recording controls
+        low_latency = st.checkbox(
+            "Show partial transcripts while speaking",
+            help=(f"Recognize the last {config.PARTIAL_WINDOW_SECONDS:g} s of speech every "
+                  f"{config.PARTIAL_HOP_SECONDS:g} s so words appear before the sentence ends"),
+            disabled=st.session_state.recording
+        )
         col1, col2 = st.columns(2)
         
         with col1:
             if not st.session_state.recording:
                 if st.button("🎙️ Start Recording"):
                     st.session_state.recording = True
-                    st.session_state.transcriber = RealtimeTranscriber(analysis_interval=10)
+                    st.session_state.transcriber = get_engine().open_session(
+                        analysis_interval=10, low_latency=low_latency
+                    )
+                    st.session_state.transcript_events = st.session_state.transcriber.subscribe()
                     st.session_state.transcriber.start_recording()
                     st.session_state.transcripts = []
                     st.session_state.metrics_history = []
@@ -157,25 +200,39 @@ def main():
             # Create containers for real-time updates
             metrics_container = st.container()
             transcript_container = st.container()
+            partial_placeholder = st.empty()
             
-            while st.session_state.recording:
-                if st.session_state.transcriber and st.session_state.transcriber.full_transcript:
-                    latest = st.session_state.transcriber.full_transcript[-1]
-                    if latest not in st.session_state.transcripts:
-                        st.session_state.transcripts.append(latest)
-                        update_metrics_history(text=latest)
-                    
+            while st.session_state.recording and st.session_state.transcript_events:
+                # Blocks until segments arrive; each one is delivered exactly once
+                events = st.session_state.transcript_events.drain(timeout=1)
+                if not events:
+                    if st.session_state.transcript_events.closed:
+                        break
+                    continue
+                for event in events:
+                    if event['type'] == 'segment':
+                        st.session_state.transcripts.append(event['text'])
+                        update_metrics_history(text=event['text'])
+                        partial_placeholder.empty()
+                    elif event['type'] == 'partial':
+                        partial_placeholder.markdown(f"*{event['text']}...*")
+                    elif event['type'] == 'analysis':
+                        update_metrics_history(analysis=event['analysis'])
+                
+                if st.session_state.transcripts:
                     with metrics_container:
                         st.session_state.visualizer.display_realtime_metrics(
                             st.session_state.metrics_history,
                             key_suffix="realtime"
                         )
+                        st.session_state.visualizer.display_queue_stats(
+                            st.session_state.transcriber.queue_stats()
+                        )
                     
                     with transcript_container:
                         st.markdown("**Latest Transcriptions:**")
                         for transcript in st.session_state.transcripts[-5:]:
                             st.markdown(f">{transcript}")
-                time.sleep(1)
         
         # Display analysis results after recording
         if not st.session_state.recording and st.session_state.transcriber:
@@ -13,14 +13,25 @@ from wordcloud import WordCloud
 import soundfile as sf
 import os
 import sys
+from collections import OrderedDict
 
 # Add parent directory to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.decoded_audio_store import DecodedAudioStore
+from src.waveform import min_max_envelope, read_envelope, envelope_trace
+from src.spectrogram_tiles import SpectrogramTileStore
+from src import config
+
 class StreamlitVisualizer:
     """Handle all visualization components for the Streamlit interface"""
     
-    def __init__(self):
+    MAX_CACHED_IMAGES = 16
+    
+    def __init__(self, audio_store=None):
+        self.audio_store = audio_store or DecodedAudioStore()
+        self.spectrogram_tiles = SpectrogramTileStore(audio_store=self.audio_store)
+        self._spectrogram_images = OrderedDict()
         self.color_scheme = {
             'positive': '#28a745',
             'negative': '#dc3545',
@@ -28,19 +39,47 @@ class StreamlitVisualizer:
             'background': '#f8f9fa'
         }
     
-    def display_audio_waveform(self, audio_file, key_suffix=""):
-        """Display audio waveform visualization."""
+    def display_audio_waveform(self, audio_file, key_suffix="", time_range=None):
+        """
+        Display audio waveform visualization.
+        
+        The waveform is drawn as a min/max envelope sized to the plot width,
+        and a time-range slider reads only the selected part of the file.
+        
+        Returns:
+            tuple: Selected (start, end) in seconds, or None if the file could not be read
+        """
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_file)
+            try:
+                duration = sf.info(audio_file).duration
+                streamable = True
+            except RuntimeError:
+                # Formats soundfile cannot seek in come from the shared decoded store
+                y, sr = self.audio_store.load(audio_file)
+                duration = len(y) / sr
+                streamable = False
+            
+            start, end = time_range or st.slider(
+                "Time range (s)",
+                min_value=0.0,
+                max_value=float(duration),
+                value=(0.0, float(duration)),
+                key=f"waveform_range_{key_suffix}"
+            )
             
-            # Create time array
-            times = np.arange(len(y))/sr
+            # Reduce the selected range to an envelope
+            if streamable:
+                times, mins, maxs = read_envelope(audio_file, start, end, config.WAVEFORM_POINTS)
+            else:
+                window = y[int(start * sr):int(end * sr)]
+                mins, maxs, bin_size = min_max_envelope(window, config.WAVEFORM_POINTS)
+                times = start + np.arange(len(mins)) * bin_size / sr
+            x, y = envelope_trace(times, mins, maxs)
             
             # Create figure
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=times,
+            fig.add_trace(go.Scattergl(
+                x=x,
                 y=y,
                 line=dict(color='#1f77b4', width=1),
                 name='Waveform'
@@ -56,32 +95,53 @@ class StreamlitVisualizer:
             )
             
             st.plotly_chart(fig, use_container_width=True, key=f"waveform_{key_suffix}")
+            return start, end
             
         except Exception as e:
             st.error(f"Error displaying waveform: {str(e)}")
+            return None
     
-    def display_spectrogram(self, audio_file, key_suffix=""):
-        """Display audio spectrogram."""
+    def display_spectrogram(self, audio_file, key_suffix="", time_range=None):
+        """
+        Display audio spectrogram.
+        
+        The STFT is computed once per file into cached tiles; reruns and
+        time-range views only assemble tiles, and rendered images are kept
+        for repeated views.
+        """
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_file)
-            
-            # Create spectrogram
-            D = librosa.amplitude_to_db(np.abs(librosa.stft(y)), ref=np.max)
-            
-            # Create figure
-            fig, ax = plt.subplots(figsize=(10, 4))
-            img = librosa.display.specshow(D, x_axis='time', y_axis='log', ax=ax)
-            plt.colorbar(img, ax=ax, format="%+2.f dB")
-            plt.title('Spectrogram')
+            start, end = time_range or (0.0, None)
+            stat = os.stat(audio_file)
+            image_key = (os.path.abspath(audio_file), stat.st_mtime_ns, start, end)
+            
+            image = self._spectrogram_images.get(image_key)
+            if image is None:
+                # Assemble spectrogram from cached tiles
+                D, column_seconds, offset = self.spectrogram_tiles.assemble(
+                    audio_file, start, end, max_columns=config.SPECTROGRAM_MAX_COLUMNS
+                )
+                x_coords = offset + np.arange(D.shape[1] + 1) * column_seconds
             
-            # Convert to streamlit
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            plt.close()
+                # Create figure
+                fig, ax = plt.subplots(figsize=(10, 4))
+                img = librosa.display.specshow(
+                    D, sr=self.spectrogram_tiles.sr, x_coords=x_coords, x_axis='time', y_axis='log', ax=ax
+                )
+                plt.colorbar(img, ax=ax, format="%+2.f dB")
+                plt.title('Spectrogram')
+            
+                # Convert to streamlit
+                buf = io.BytesIO()
+                plt.savefig(buf, format='png')
+                plt.close()
+                image = buf.getvalue()
+                
+                self._spectrogram_images[image_key] = image
+                while len(self._spectrogram_images) > self.MAX_CACHED_IMAGES:
+                    self._spectrogram_images.popitem(last=False)
             
             # Display image without key parameter
-            st.image(buf)
+            st.image(image)
             
         except Exception as e:
             st.error(f"Error displaying spectrogram: {str(e)}")
@@ -202,6 +262,17 @@ class StreamlitVisualizer:
         except Exception as e:
             st.error(f"Error displaying real-time metrics: {str(e)}")
     
+    def display_queue_stats(self, stats):
+        """Display the depth and overflow counters of the realtime utterance queue."""
+        try:
+            cols = st.columns(4)
+            cols[0].metric("Queued utterances", f"{stats['depth']}/{stats['maxsize']}")
+            cols[1].metric("Peak depth", stats['max_depth'])
+            cols[2].metric("Dropped", stats['drops'])
+            cols[3].metric("Merged", stats['merges'])
+        except Exception as e:
+            st.error(f"Error displaying queue statistics: {str(e)}")
+    
     def create_analysis_dashboard(self, analysis_results, audio_file=None, key_suffix=""):
         """Create a complete analysis dashboard."""
         try:
@@ -247,12 +318,13 @@ class StreamlitVisualizer:
             with tabs[1]:
                 if audio_file:
                     st.markdown("### Audio Visualization")
-                    # Use timestamp to create unique keys
-                    self.display_audio_waveform(
+                    # A stable key keeps the time-range slider's state across reruns
+                    time_range = self.display_audio_waveform(
                         audio_file, 
-                        f"{key_suffix}_{timestamp}_waveform"
+                        f"{key_suffix}_dashboard_waveform"
                     )
-                    self.display_spectrogram(audio_file)
+                    # The spectrogram follows the waveform's time range
+                    self.display_spectrogram(audio_file, time_range=time_range)
             
             # Sentiment Tab
             with tabs[2]:
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.nlp_processor import NLPProcessor
+from src.nlp_resources import get_resources
+
+COLD_START = """
+import json, time
+started = time.perf_counter()
+from src.nlp_processor import NLPProcessor
+imported = time.perf_counter()
+processor = NLPProcessor()
+constructed = time.perf_counter()
+load_seconds = processor.resources.preload()
+loaded = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'construct': constructed - imported,
+    'preload': loaded - constructed,
+    'resources': load_seconds
+}))
+"""
+
+def cold_start(runs):
+    """Time import, construction and preloading in fresh interpreters."""
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START],
+            cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+def warm_start(runs):
+    """Time building processors once the shared resources are loaded."""
+    loaded = [name for name in get_resources().preload() if name in get_resources()._loaded]
+    started = time.perf_counter()
+    for _ in range(runs):
+        processor = NLPProcessor()
+        for name in loaded:
+            getattr(processor.resources, name)
+    return (time.perf_counter() - started) / runs
+
+def main():
+    cold = cold_start(3)
+    print("Cold start (fresh process):")
+    for key in ('import', 'construct', 'preload'):
+        values = [run[key] for run in cold]
+        print(f"  {key:<10} mean {sum(values) / len(values) * 1000:8.2f} ms  max {max(values) * 1000:8.2f} ms")
+    print("  resources  " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in cold[-1]['resources'].items()))
+    print(f"Warm construction (shared resources): {warm_start(1000) * 1e6:.2f} us per NLPProcessor")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from src.summarizer import Summarizer
+
+STOP_WORDS = frozenset(ENGLISH_STOP_WORDS)
+
+def synthetic_transcript(words, seed=0):
+    """Meeting-like text: Zipf-distributed vocabulary, 4-20 word sentences, repeated phrases."""
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"term{i}" for i in range(5000)] + sorted(STOP_WORDS)
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    tokens = rng.choice(vocabulary, size=words, p=weights / weights.sum())
+    boundaries = np.cumsum(rng.integers(4, 20, size=words // 4))
+    sentences = [" ".join(sentence) for sentence in np.split(tokens, boundaries[boundaries < words])]
+    for i in rng.integers(0, len(sentences), size=len(sentences) // 50):
+        sentences[i] = "okay let us move on to the next item"  # Filler that repeats verbatim
+    return ". ".join(sentences) + "."
+
+def legacy_summary(text, stop_words, num_sentences=3):
+    """The dict-and-index summarizer NLPProcessor used before Summarizer."""
+    sentences = [s.strip() for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()]
+    if len(sentences) <= num_sentences:
+        return text
+    word_freq = {}
+    for word in text.lower().split():
+        if word.isalnum() and word not in stop_words:
+            word_freq[word] = word_freq.get(word, 0) + 1
+    sentence_scores = {}
+    for sentence in sentences:
+        words = sentence.lower().split()
+        sentence_scores[sentence] = sum(word_freq.get(w, 0) for w in words if w not in stop_words) / (len(words) + 1)
+    top_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)[:num_sentences]
+    return '. '.join(sent for sent, _ in sorted(top_sentences, key=lambda x: sentences.index(x[0]))) + '.'
+
+def timed(function, *args, repeat=3, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args, **kwargs)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    sizes = [100_000, 200_000, 400_000, 800_000]
+    num_sentences = 20  # Roughly a paragraph per hour of speech
+    print(f"{'words':>8} {'legacy':>9} " + " ".join(f"{method:>9}" for method in Summarizer.METHODS) + "  (seconds, best of 3)")
+    for words in sizes:
+        text = synthetic_transcript(words)
+        row = [timed(legacy_summary, text, STOP_WORDS, num_sentences)]
+        for method in Summarizer.METHODS:
+            row.append(timed(Summarizer(STOP_WORDS, method=method).summarize, text, num_sentences))
+        print(f"{words:>8} " + " ".join(f"{seconds:>9.3f}" for seconds in row))
+
+if __name__ == "__main__":
+    main()
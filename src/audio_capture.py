@@ -0,0 +1,444 @@
+import queue
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+from . import config
+from .audio_preprocessing import AudioPreprocessor
+
+class RingBuffer:
+    """
+    Preallocated mono int16 ring buffer with a mirrored second half.
+
+    Every sample is written twice, at i and at i + capacity. Any run of up
+    to `capacity` recent samples is therefore contiguous in memory and can
+    be handed out as a memoryview without copying. Positions are absolute
+    sample counts since the buffer was created.
+
+    There is a single writer and no lock. The writer publishes `reserved`
+    before it overwrites anything and `written` after, so a reader that
+    copies samples and then checks intact() knows whether the copy is good.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype='<i2')
+        self.written = 0
+        self.reserved = 0  # Positions up to here may be mid-write
+
+    def write(self, samples):
+        """Append samples; only the newest `capacity` samples stay readable."""
+        samples = samples[-self.capacity:]
+        self.reserved = self.written + len(samples)
+        start = self.written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        for offset in (0, self.capacity):
+            self._data[start + offset:start + offset + first] = samples[:first]
+        rest = len(samples) - first
+        if rest:
+            # Wrapped: the tail lands at the start of both halves
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity:self.capacity + rest] = samples[first:]
+        self.written += len(samples)
+
+    def oldest(self):
+        """First absolute position that has not been overwritten yet."""
+        return max(0, self.written - self.capacity)
+
+    def intact(self, start):
+        """Whether the samples from `start` on are still unchanged, including by a write in progress."""
+        return start >= self.reserved - self.capacity
+
+    def read(self, start, end):
+        """
+        Copy samples [start, end) out of the buffer.
+
+        Raises:
+            IndexError: The samples are gone, or were overwritten while being copied
+        """
+        samples = self.samples(start, end).copy()
+        if not self.intact(start):
+            raise IndexError(f"samples {start}-{end} were overwritten while being read")
+        return samples
+
+    def samples(self, start, end):
+        """Return samples [start, end) as an int16 array view into the buffer."""
+        if start < self.oldest() or end > self.written or end - start > self.capacity:
+            raise IndexError(f"samples {start}-{end} are not in the buffer")
+        offset = start % self.capacity
+        return self._data[offset:offset + end - start]
+
+    def view(self, start, end):
+        """Return samples [start, end) as a zero-copy memoryview of little-endian int16 bytes."""
+        return memoryview(self.samples(start, end)).cast('B')
+
+class StreamingVAD:
+    """
+    Voice activity detection for a live stream, cutting it into utterances.
+
+    Frames use the same features and classification rules as
+    AudioPreprocessor.speech_mask. The noise floor adapts over a sliding
+    history of recent frame energies instead of the whole signal.
+    """
+
+    def __init__(self, sample_rate=None, min_silence=None, max_seconds=None, history_seconds=None):
+        """
+        Args:
+            sample_rate (int): Sample rate of the stream
+            min_silence (float): Silence that ends an utterance
+            max_seconds (float): Utterances are cut at this length
+            history_seconds (float): Frame energies used to estimate the noise floor
+        """
+        self.sample_rate = sample_rate or config.SAMPLE_RATE
+        self.preprocessor = AudioPreprocessor()
+        self.frame_length = int(self.sample_rate * config.VAD_FRAME_MS / 1000)
+        self.hop_length = int(self.sample_rate * config.VAD_HOP_MS / 1000)
+        self.min_silence_frames = int((min_silence or config.SEGMENT_MIN_SILENCE) * 1000 / config.VAD_HOP_MS)
+        self.max_samples = int((max_seconds or config.SEGMENT_MAX_SECONDS) * self.sample_rate)
+        self.min_speech_samples = int(config.VAD_MIN_SPEECH * self.sample_rate)
+        self.padding = int(config.VAD_PADDING * self.sample_rate)
+
+        history = int((history_seconds or config.CAPTURE_NOISE_HISTORY_SECONDS) * 1000 / config.VAD_HOP_MS)
+        self._history = np.zeros(history, dtype=np.float32)
+        self._history_size = 0
+        self._history_pos = 0
+
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pending_start = 0  # Absolute position of _pending[0]
+        self._speech_start = None  # Position of the first speech frame of the open utterance
+        self._last_speech_end = None
+        self._silent_frames = 0
+
+    def _remember(self, energy):
+        """Add frame energies to the circular noise-floor history."""
+        energy = energy[-len(self._history):]
+        end = self._history_pos + len(energy)
+        if end <= len(self._history):
+            self._history[self._history_pos:end] = energy
+        else:
+            split = len(self._history) - self._history_pos
+            self._history[self._history_pos:] = energy[:split]
+            self._history[:end - len(self._history)] = energy[split:]
+        self._history_pos = end % len(self._history)
+        self._history_size = min(len(self._history), self._history_size + len(energy))
+
+    def process(self, samples):
+        """
+        Consume the next samples of the stream.
+
+        Args:
+            samples (np.ndarray): int16 or float samples following the previously processed ones
+
+        Returns:
+            list: (start, end) absolute sample positions of utterances completed by these samples
+        """
+        samples = np.asarray(samples)
+        if samples.dtype.kind == 'i':
+            samples = samples.astype(np.float32) / 32768
+        self._pending = np.concatenate((self._pending, samples))
+        energy, zcr = self.preprocessor.frame_features(self._pending, self.sample_rate)
+        if not len(energy):
+            return []
+
+        self._remember(energy)
+        threshold = self.preprocessor.speech_threshold(self._history[:self._history_size])
+        mask = self.preprocessor.classify_frames(energy, zcr, threshold)
+
+        segments = []
+        for i, is_speech in enumerate(mask):
+            frame_start = self._pending_start + i * self.hop_length
+            if is_speech:
+                if self._speech_start is None:
+                    self._speech_start = frame_start
+                self._last_speech_end = frame_start + self.frame_length
+                self._silent_frames = 0
+            elif self._speech_start is not None:
+                self._silent_frames += 1
+
+            if self._speech_start is None:
+                continue
+            if self._silent_frames >= self.min_silence_frames:
+                segments.extend(self._close())
+            elif self._last_speech_end - self._speech_start >= self.max_samples:
+                segments.extend(self._close())
+
+        consumed = len(energy) * self.hop_length
+        self._pending = self._pending[consumed:]
+        self._pending_start += consumed
+        return segments
+
+    def _close(self):
+        """End the open utterance and return it padded, unless it is too short."""
+        start, end = self._speech_start, self._last_speech_end
+        self._speech_start = self._last_speech_end = None
+        self._silent_frames = 0
+        if end - start < self.min_speech_samples:
+            return []
+        return [(max(0, start - self.padding), end + self.padding)]
+
+    def flush(self):
+        """Close any utterance still open at the end of the stream."""
+        if self._speech_start is None:
+            return []
+        return self._close()
+
+class FileInputStream:
+    """
+    File-backed stand-in for sounddevice.InputStream.
+
+    A thread reads the file at the stream's sample rate and calls the
+    callback with blocks of int16 samples, shaped (frames, 1), pacing them
+    like a real device. `speed` replays faster than real time, and 0 means
+    as fast as possible.
+    """
+
+    def __init__(self, file_path, samplerate=None, channels=1, dtype='int16', blocksize=None,
+                 callback=None, speed=1.0, **kwargs):
+        self.file_path = file_path
+        self.samplerate = samplerate or config.SAMPLE_RATE
+        self.blocksize = blocksize or config.CHUNK_SIZE
+        self.callback = callback
+        self.speed = speed
+        self.finished = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="FileInputStream", daemon=True)
+        self._thread.start()
+
+    def _blocks(self):
+        """Yield int16 blocks of exactly blocksize frames (the last one may be shorter)."""
+        preprocessor = AudioPreprocessor()
+        carry = np.zeros(0, dtype=np.float32)
+        for block in preprocessor.iter_audio_blocks(self.file_path, sample_rate=self.samplerate):
+            carry = np.concatenate((carry, block))
+            whole = len(carry) // self.blocksize * self.blocksize
+            for start in range(0, whole, self.blocksize):
+                yield carry[start:start + self.blocksize]
+            carry = carry[whole:]
+        if len(carry):
+            yield carry
+
+    def _run(self):
+        started = time.perf_counter()
+        played = 0
+        try:
+            for block in self._blocks():
+                if self._stopped.is_set():
+                    break
+                played += len(block)
+                if self.speed:
+                    # Deliver each block when a device would have finished recording it
+                    delay = started + played / self.samplerate / self.speed - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                samples = np.clip(np.round(block * 32768), -32768, 32767).astype('<i2')
+                self.callback(samples.reshape(-1, 1), len(samples), None, None)
+        finally:
+            self.finished.set()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+class PushInputStream:
+    """
+    Input stream fed by the caller, e.g. with PCM received over a socket.
+
+    Matches the parts of the sounddevice.InputStream interface that
+    RingBufferCapture uses; push() delivers samples to the callback.
+    """
+
+    def __init__(self, samplerate=None, channels=1, dtype='int16', blocksize=None, callback=None, **kwargs):
+        self.samplerate = samplerate or config.SAMPLE_RATE
+        self.callback = callback
+        self.active = False
+
+    def start(self):
+        self.active = True
+
+    def push(self, pcm):
+        """Deliver mono little-endian int16 PCM (bytes or an int16 array)."""
+        if not self.active:
+            raise RuntimeError("stream is not running")
+        samples = np.frombuffer(pcm, dtype='<i2') if isinstance(pcm, (bytes, bytearray, memoryview)) else pcm
+        self.callback(samples.reshape(-1, 1), len(samples), None, None)
+
+    def stop(self):
+        self.active = False
+
+    def close(self):
+        self.stop()
+
+class RingSegment(sr.AudioData):
+    """
+    Utterance whose frame_data is a zero-copy memoryview into a RingBuffer.
+
+    The view stays valid until the ring wraps past it. Whoever holds the
+    segment beyond that point, such as a recognition worker taking it from
+    a queue, calls detach() first.
+    """
+
+    def __init__(self, ring, start, end, sample_rate, on_stale=None):
+        super().__init__(ring.view(start, end), sample_rate, 2)
+        self.ring = ring
+        self.ring_start = start
+        self.on_stale = on_stale
+
+    def detach(self):
+        """
+        Copy the frames out of the ring.
+
+        Returns:
+            sr.AudioData: Independent copy with the same attributes, or None if
+            the ring has already overwritten part of the segment
+        """
+        frame_data = bytes(self.frame_data)
+        if not self.ring.intact(self.ring_start):
+            if self.on_stale:
+                self.on_stale()
+            return None
+        audio = sr.AudioData(frame_data, self.sample_rate, self.sample_width)
+        for name in ('captured_at', 'start', 'end'):
+            if hasattr(self, name):
+                setattr(audio, name, getattr(self, name))
+        return audio
+
+def detach(audio):
+    """Make a queued utterance independent of the capture ring, see RingSegment.detach."""
+    return audio.detach() if isinstance(audio, RingSegment) else audio
+
+class RingBufferCapture:
+    """
+    Gap-free audio capture into a preallocated ring buffer.
+
+    The input stream's callback only copies each block into the ring and
+    signals an analysis thread. That thread copies the new samples out,
+    runs StreamingVAD over them and hands each finished utterance to
+    on_segment as a RingSegment, whose frame_data points into the ring.
+    Queues can therefore hold utterances without copying them. Consumers
+    detach() a segment before recognizing it; a segment the ring has
+    wrapped past is dropped and counted as stale rather than recognized
+    from overwritten audio.
+    """
+
+    def __init__(self, on_segment=None, on_block=None, sample_rate=None, block_frames=None,
+                 ring_seconds=None, device=None, input_stream_factory=None):
+        """
+        Args:
+            on_segment (callable): Called with each utterance as sr.AudioData
+            on_block (callable): Called with every captured block as a memoryview, e.g. for partial transcripts
+            sample_rate (int): Capture sample rate
+            block_frames (int): Frames per callback block
+            ring_seconds (float): Audio the ring buffer holds
+            device (int | str): Input device for sounddevice
+            input_stream_factory (callable): Builds the input stream, defaults to sounddevice.InputStream
+        """
+        self.on_segment = on_segment
+        self.on_block = on_block
+        self.sample_rate = sample_rate or config.SAMPLE_RATE
+        self.block_frames = block_frames or config.CHUNK_SIZE
+        self.ring = RingBuffer(int((ring_seconds or config.CAPTURE_RING_SECONDS) * self.sample_rate))
+        self.vad = StreamingVAD(self.sample_rate)
+        self.device = device
+        self.input_stream_factory = input_stream_factory
+
+        self.stream = None
+        self._written = queue.Queue()
+        self._thread = None
+        self._analyzed = 0
+        self._counters = {'blocks': 0, 'overflows': 0, 'segments': 0, 'lost_samples': 0, 'stale_segments': 0}
+
+    def _callback(self, indata, frames, time_info, status):
+        """Audio thread: copy the block into the ring and wake the analysis thread."""
+        if status:
+            self._counters['overflows'] += 1
+        self.ring.write(indata[:frames, 0])
+        self._counters['blocks'] += 1
+        self._written.put_nowait(self.ring.written)
+
+    def start(self):
+        """Open the input stream and start capturing."""
+        factory = self.input_stream_factory
+        if factory is None:
+            # Imported here so PortAudio is only needed for live capture
+            import sounddevice
+            factory = sounddevice.InputStream
+        self.stream = factory(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='int16',
+            blocksize=self.block_frames,
+            device=self.device,
+            callback=self._callback
+        )
+        self._thread = threading.Thread(target=self._analyze, name="CaptureAnalysisThread", daemon=True)
+        self._thread.start()
+        self.stream.start()
+
+    def _analyze(self):
+        while True:
+            written = self._written.get()
+            if written is None:
+                break
+            if written < self._analyzed:
+                continue
+            # The callback keeps writing meanwhile, so copy the new samples out and retry if they were overwritten
+            while True:
+                start = min(max(self._analyzed, self.ring.oldest()), written)
+                try:
+                    samples = self.ring.read(start, written)
+                    break
+                except IndexError:
+                    continue
+            self._counters['lost_samples'] += start - self._analyzed
+            if self.on_block:
+                self.on_block(memoryview(samples).cast('B'))
+            for segment in self.vad.process(samples):
+                self._emit(*segment)
+            self._analyzed = written
+
+        for segment in self.vad.flush():
+            self._emit(*segment)
+
+    def _emit(self, start, end):
+        start = max(start, self.ring.oldest())
+        end = min(end, self.ring.written)
+        if end <= start:
+            return
+        self._counters['segments'] += 1
+        if self.on_segment:
+            audio = RingSegment(self.ring, start, end, self.sample_rate, on_stale=self._count_stale)
+            audio.captured_at = time.perf_counter()  # When the utterance was complete, for latency measurements
+            audio.start, audio.end = start / self.sample_rate, end / self.sample_rate  # Stream positions in seconds
+            self.on_segment(audio)
+
+    def _count_stale(self):
+        self._counters['stale_segments'] += 1
+
+    def wait(self, timeout=None):
+        """Wait until a file-backed stream has delivered its last block."""
+        finished = getattr(self.stream, 'finished', None)
+        return finished.wait(timeout) if finished is not None else False
+
+    def stop(self):
+        """Stop the stream, then analyze the remaining audio and close the last utterance."""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+        self._written.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        """Capture counters: callback blocks, device overflows, segments, and samples and segments lost to ring wrap-around."""
+        return {**self._counters, 'captured_seconds': self.ring.written / self.sample_rate}
@@ -1,4 +1,7 @@
+import io
 import os
+import uuid
+import numpy as np
 import librosa
 import soundfile as sf
 from pydub import AudioSegment
@@ -17,22 +20,78 @@ class AudioFileHandler:
         """Check if the file format is supported."""
         return any(file_path.lower().endswith(fmt) for fmt in self.SUPPORTED_FORMATS)
     
-    def convert_to_wav(self, input_file):
-        """Convert any supported audio format to WAV."""
+    def decode(self, input_file, dtype='int16'):
+        """
+        Decode any supported audio format into memory.
+        
+        Formats libsndfile understands are decoded in-process; everything else
+        goes through pydub/ffmpeg.
+        
+        Args:
+            input_file (str): Path to the audio file
+            dtype (str): 'int16' for raw PCM or 'float32' for samples in [-1, 1]
+        
+        Returns:
+            tuple: (samples, sample_rate) with samples shaped (frames,) or (frames, channels)
+        """
+        if not self.is_supported_format(input_file):
+            raise ValueError(f"Unsupported file format. Supported formats are: {self.SUPPORTED_FORMATS}")
+        
+        try:
+            return sf.read(input_file, dtype=dtype)
+        except RuntimeError:
+            pass  # Not a format libsndfile can read
+        
+        audio = AudioSegment.from_file(input_file).set_sample_width(2)
+        samples = np.array(audio.get_array_of_samples(), dtype=np.int16)
+        if audio.channels > 1:
+            samples = samples.reshape(-1, audio.channels)
+        if dtype == 'float32':
+            samples = samples.astype(np.float32) / 32768
+        return samples, audio.frame_rate
+    
+    def decode_to_buffer(self, input_file):
+        """Decode an audio file into an in-memory 16-bit WAV buffer."""
+        samples, sample_rate = self.decode(input_file)
+        buffer = io.BytesIO()
+        sf.write(buffer, samples, sample_rate, format='WAV', subtype='PCM_16')
+        buffer.seek(0)
+        return buffer
+    
+    def wav_source(self, input_file):
+        """
+        Return something sr.AudioFile and librosa can read as WAV.
+        
+        WAV files are used in place; other formats are decoded into memory
+        rather than written to disk.
+        """
         if not self.is_supported_format(input_file):
             raise ValueError(f"Unsupported file format. Supported formats are: {self.SUPPORTED_FORMATS}")
         
-        # If already WAV, return the original file path
         if input_file.lower().endswith('.wav'):
             return input_file
+        return self.decode_to_buffer(input_file)
+    
+    def convert_to_wav(self, input_file, output_path=None):
+        """Convert any supported audio format to a WAV file on disk."""
+        if not self.is_supported_format(input_file):
+            raise ValueError(f"Unsupported file format. Supported formats are: {self.SUPPORTED_FORMATS}")
+        
+        # If already WAV, return the original file path
+        if input_file.lower().endswith('.wav') and output_path is None:
+            return input_file
             
-        # Generate output filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.splitext(os.path.basename(input_file))[0]
-        output_path = os.path.join(config.PROCESSED_DATA_DIR, f"{filename}_{timestamp}.wav")
+        # Generate a unique output filename so concurrent uploads never collide
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.splitext(os.path.basename(input_file))[0]
+            output_path = os.path.join(
+                config.PROCESSED_DATA_DIR,
+                f"{filename}_{timestamp}_{uuid.uuid4().hex[:8]}.wav"
+            )
         
         # Convert to WAV
-        audio = AudioSegment.from_file(input_file)
-        audio.export(output_path, format="wav")
+        with open(output_path, 'wb') as f:
+            f.write(self.decode_to_buffer(input_file).getbuffer())
         
-        return output_path
\ No newline at end of file
+        return output_path
@@ -1,43 +1,282 @@
 import numpy as np
 import librosa
 import soundfile as sf
+import soxr
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from . import config
 
 class AudioPreprocessor:
-    def __init__(self):
+    def __init__(self, audio_store=None):
+        """
+        Args:
+            audio_store (DecodedAudioStore): Optional store serving decoded files as memory-mapped arrays
+        """
         self.sample_rate = config.SAMPLE_RATE
+        self.audio_store = audio_store
     
     def load_audio(self, file_path):
-        """Load audio file and return signal array and sample rate."""
+        """Load an audio file or in-memory WAV buffer and return signal array and sample rate."""
+        if self.audio_store and isinstance(file_path, str):
+            return self.audio_store.load(file_path, self.sample_rate)
         audio_data, sr = librosa.load(file_path, sr=self.sample_rate)
         return audio_data, sr
     
+    def iter_audio_blocks(self, file_path, block_size=None, sample_rate=None):
+        """
+        Read an audio file block by block as mono float32 at the target sample rate.
+        
+        Produces the same signal as load_audio without holding the whole file
+        in memory: channels are averaged like librosa.to_mono and resampling
+        uses a streaming soxr resampler at librosa's default quality.
+        """
+        sample_rate = sample_rate or self.sample_rate
+        block_size = block_size or int(config.PREPROCESS_BLOCK_SECONDS * sample_rate)
+        with sf.SoundFile(file_path) as f:
+            resampler = None
+            if f.samplerate != sample_rate:
+                resampler = soxr.ResampleStream(f.samplerate, sample_rate, 1, dtype='float32', quality='HQ')
+            # librosa fixes the resampled length to ceil(frames * ratio)
+            expected = self.resampled_length(f.frames, f.samplerate, sample_rate)
+            emitted = 0
+            
+            for block in f.blocks(blocksize=block_size, dtype='float32', always_2d=True):
+                mono = np.mean(block, axis=1)
+                if resampler:
+                    mono = resampler.resample_chunk(mono)
+                mono = mono[:expected - emitted]
+                emitted += len(mono)
+                if len(mono):
+                    yield mono
+            
+            if resampler:
+                tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+                tail = tail[:expected - emitted]
+                emitted += len(tail)
+                if len(tail):
+                    yield tail
+            if emitted < expected:
+                yield np.zeros(expected - emitted, dtype=np.float32)
+    
+    @staticmethod
+    def resampled_length(frames, orig_sr, target_sr):
+        """Number of samples librosa produces when resampling frames from orig_sr to target_sr."""
+        return int(np.ceil(frames * target_sr / orig_sr))
+    
     def reduce_noise(self, audio_data):
         """Basic noise reduction using librosa."""
         return librosa.effects.preemphasis(audio_data)
     
+    def iter_reduce_noise(self, blocks):
+        """Apply reduce_noise across blocks, carrying the filter state between them."""
+        zi = None
+        pending = np.zeros(0, dtype=np.float32)
+        for block in blocks:
+            if zi is None:
+                # The initial filter state extrapolates from the first two samples
+                pending = np.concatenate([pending, block])
+                if len(pending) < 2:
+                    continue
+                block = pending
+            audio_data, zi = librosa.effects.preemphasis(block, zi=zi, return_zf=True)
+            yield audio_data
+        if zi is None and len(pending):
+            yield pending
+    
     def normalize_audio(self, audio_data):
         """Normalize audio to -1 to 1 range."""
         return librosa.util.normalize(audio_data)
     
-    def process_audio(self, file_path):
-        """Complete audio preprocessing pipeline."""
+    def preprocess(self, audio_data):
+        """Apply the preprocessing steps to an in-memory signal."""
+        audio_data = self.reduce_noise(audio_data)
+        return self.normalize_audio(audio_data)
+    
+    def frame_features(self, audio_data, sr=None):
+        """
+        Compute per-frame RMS energy and zero-crossing rate.
+        
+        Frames are strided views over the signal, so no frame data is copied.
+        
+        Returns:
+            tuple: (energy, zcr) arrays with one value per VAD_HOP_MS step
+        """
+        sr = sr or self.sample_rate
+        frame_length = int(sr * config.VAD_FRAME_MS / 1000)
+        hop_length = int(sr * config.VAD_HOP_MS / 1000)
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        if len(audio_data) < frame_length:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        
+        frames = np.lib.stride_tricks.sliding_window_view(audio_data, frame_length)[::hop_length]
+        energy = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
+        
+        # Crossings per frame from a running count, instead of per-frame diffs
+        signs = np.signbit(audio_data)
+        crossings = np.concatenate(([0], np.cumsum(signs[1:] != signs[:-1])))
+        starts = np.arange(len(frames)) * hop_length
+        zcr = (crossings[starts + frame_length - 1] - crossings[starts]) / (frame_length - 1)
+        return energy, zcr
+    
+    def speech_mask(self, audio_data, sr=None):
+        """Classify each VAD_HOP_MS step of the signal as speech (True) or silence."""
+        energy, zcr = self.frame_features(audio_data, sr)
+        if not len(energy):
+            return np.zeros(0, dtype=bool)
+        return self.classify_frames(energy, zcr, self.speech_threshold(energy))
+    
+    @staticmethod
+    def speech_threshold(energy):
+        """Frame energy above which speech is assumed, adapted to a reference set of frames."""
+        # The quietest frames estimate the noise floor; a signal that is speech
+        # throughout has no quiet frames, so cap the threshold well below its
+        # peak, low enough that a quieter second speaker is not cut
+        noise_floor = np.percentile(energy, 10)
+        threshold = min(noise_floor * config.VAD_NOISE_RATIO, energy.max() * config.VAD_PEAK_FRACTION)
+        return max(config.VAD_ENERGY_FLOOR, threshold)
+    
+    @staticmethod
+    def classify_frames(energy, zcr, threshold):
+        """Mark frames as speech: loud frames, or quieter ones with many zero crossings."""
+        voiced = energy >= threshold
+        unvoiced = (energy >= threshold / 2) & (zcr >= config.VAD_ZCR_THRESHOLD)
+        return voiced | unvoiced
+    
+    def detect_speech(self, audio_data, sr=None):
+        """
+        Find speech segments in a signal.
+        
+        Returns:
+            list: Segments as dicts with 'start' and 'end' in seconds
+        """
+        sr = sr or self.sample_rate
+        mask = self.speech_mask(audio_data, sr)
+        if not mask.any():
+            return []
+        
+        hop = config.VAD_HOP_MS / 1000
+        frame = config.VAD_FRAME_MS / 1000
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False]))))
+        starts = edges[::2] * hop
+        ends = (edges[1::2] - 1) * hop + frame
+        
+        # Bridge short pauses, then drop bursts too short to be speech
+        keep = starts[1:] - ends[:-1] >= config.VAD_MIN_SILENCE
+        starts = starts[np.concatenate(([True], keep))]
+        ends = ends[np.concatenate((keep, [True]))]
+        long_enough = ends - starts >= config.VAD_MIN_SPEECH
+        
+        duration = len(audio_data) / sr
+        starts = np.maximum(starts[long_enough] - config.VAD_PADDING, 0.0)
+        ends = np.minimum(ends[long_enough] + config.VAD_PADDING, duration)
+        return [{'start': float(start), 'end': float(end)} for start, end in zip(starts, ends)]
+    
+    def trim_silence(self, audio_data, sr=None):
+        """
+        Remove silence from a signal.
+        
+        Returns:
+            tuple: (speech-only signal, speech segments)
+        """
+        sr = sr or self.sample_rate
+        segments = self.detect_speech(audio_data, sr)
+        pieces = [audio_data[int(s['start'] * sr):int(s['end'] * sr)] for s in segments]
+        speech = np.concatenate(pieces) if pieces else audio_data[:0]
+        return speech, segments
+    
+    @staticmethod
+    def vad_report(total_seconds, speech_seconds):
+        """Summarise how much audio voice activity detection kept back."""
+        skipped = max(0.0, total_seconds - speech_seconds)
+        return {
+            'total_seconds': round(total_seconds, 3),
+            'speech_seconds': round(speech_seconds, 3),
+            'skipped_seconds': round(skipped, 3),
+            'skipped_ratio': round(skipped / total_seconds, 3) if total_seconds else 0.0
+        }
+    
+    def is_streamable(self, file_path):
+        """Check whether soundfile can read the file block by block."""
+        try:
+            sf.info(file_path)
+            return True
+        except RuntimeError:
+            return False
+    
+    def process_audio(self, file_path, output_path=None):
+        """
+        Complete audio preprocessing pipeline.
+        
+        Files soundfile can read are processed block by block in two passes:
+        the first finds the peak of the pre-emphasised signal, the second
+        writes it normalised. Peak memory is one block regardless of length.
+        Other formats are loaded whole through librosa.
+        """
+        output_path = output_path or self._output_path(file_path)
+        if not self.is_streamable(file_path):
+            return self._process_in_memory(file_path, output_path)
+        
+        # First pass: peak of the pre-emphasised signal, as librosa.util.normalize uses
+        peak = 0.0
+        for block in self.iter_reduce_noise(self.iter_audio_blocks(file_path)):
+            peak = max(peak, float(np.max(np.abs(block))))
+        if peak < np.finfo(np.float32).tiny:
+            peak = 1.0
+        
+        # Second pass: normalise and write
+        with sf.SoundFile(output_path, 'w', samplerate=self.sample_rate, channels=1) as out:
+            for block in self.iter_reduce_noise(self.iter_audio_blocks(file_path)):
+                out.write(block / np.float32(peak))
+        return output_path
+    
+    def _process_in_memory(self, file_path, output_path):
+        """Preprocess a file by loading it whole."""
         # Load audio
         audio_data, sr = self.load_audio(file_path)
         
         # Apply preprocessing steps
-        audio_data = self.reduce_noise(audio_data)
-        audio_data = self.normalize_audio(audio_data)
+        audio_data = self.preprocess(audio_data)
         
-        # Generate output filename
+        # Save processed audio
+        sf.write(output_path, audio_data, sr)
+        return output_path
+    
+    def _output_path(self, file_path):
+        """Generate the output filename for a processed file."""
         filename = os.path.basename(file_path)
-        output_path = os.path.join(
+        return os.path.join(
             config.PROCESSED_DATA_DIR,
             f'processed_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{filename}'
         )
         
-        # Save processed audio
-        sf.write(output_path, audio_data, sr)
-        return output_path
\ No newline at end of file
+    def process_batch(self, file_paths, workers=1):
+        """
+        Preprocess many files in one call.
+        
+        Args:
+            file_paths (list): Audio files to process
+            workers (int): Worker processes; 1 processes the files in this process
+        
+        Returns:
+            list: One result dict per file, in input order
+        """
+        if workers == 1:
+            return [_process_file(file_path) for file_path in file_paths]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_process_file, file_paths))
+
+def _process_file(file_path):
+    """Preprocess one file and report the outcome instead of raising."""
+    try:
+        return {
+            'success': True,
+            'original_file': file_path,
+            'output_file': AudioPreprocessor().process_audio(file_path)
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'original_file': file_path,
+            'error': str(e)
+        }
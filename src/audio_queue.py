@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+from collections import deque
+import speech_recognition as sr
+from . import config
+from .audio_capture import detach
+
+class BoundedAudioQueue:
+    """
+    Bounded FIFO of utterances waiting for recognition.
+
+    When the queue is full, put() follows one of three policies:
+
+    - 'block': wait until a worker frees a slot, which holds up the capture
+    - 'drop_oldest': discard the oldest queued utterance
+    - 'merge': join two adjacent utterances into one recognition request,
+      falling back to dropping the oldest if nothing can be merged
+
+    None is accepted at any time as a worker shutdown marker and never
+    counts toward the bound.
+    """
+
+    POLICIES = ('block', 'drop_oldest', 'merge')
+
+    def __init__(self, maxsize=None, policy=None, merge_max_seconds=None):
+        """
+        Args:
+            maxsize (int): Utterances held before the policy applies
+            policy (str): 'block', 'drop_oldest' or 'merge'
+            merge_max_seconds (float): Longest utterance a merge may produce
+        """
+        self.maxsize = maxsize or config.AUDIO_QUEUE_MAXSIZE
+        self.policy = policy or config.AUDIO_QUEUE_POLICY
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy '{self.policy}'. Available policies are: {list(self.POLICIES)}")
+        self.merge_max_seconds = merge_max_seconds or config.AUDIO_MERGE_MAX_SECONDS
+
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._depth = 0  # Queued utterances, excluding shutdown markers
+        self._counters = {'puts': 0, 'drops': 0, 'merges': 0, 'max_depth': 0, 'blocked_seconds': 0.0}
+
+    def put(self, audio, timeout=None):
+        """
+        Queue an utterance, applying the overflow policy when full.
+
+        Raises:
+            queue.Full: The 'block' policy timed out waiting for a free slot
+        """
+        with self._not_full:
+            if audio is not None:
+                self._counters['puts'] += 1
+                if self._depth >= self.maxsize:
+                    self._make_room(timeout)
+                self._depth += 1
+                self._counters['max_depth'] = max(self._counters['max_depth'], self._depth)
+            self._items.append(audio)
+            self._not_empty.notify()
+
+    def _make_room(self, timeout):
+        """Free one slot according to the policy; called with the lock held."""
+        if self.policy == 'block':
+            started = time.perf_counter()
+            try:
+                if not self._not_full.wait_for(lambda: self._depth < self.maxsize, timeout):
+                    raise queue.Full
+            finally:
+                self._counters['blocked_seconds'] += time.perf_counter() - started
+            return
+        if self.policy == 'merge' and self._merge_adjacent():
+            return
+        self._drop_oldest()
+
+    def _merge_adjacent(self):
+        """Merge the first mergeable pair of neighbouring utterances, oldest first; returns whether a slot was freed."""
+        items = self._items
+        for i in range(len(items) - 1):
+            first, second = items[i], items[i + 1]
+            if first is None or second is None:
+                continue
+            if (first.sample_rate, first.sample_width) != (second.sample_rate, second.sample_width):
+                continue
+            frames = len(first.frame_data) + len(second.frame_data)
+            if frames / (first.sample_rate * first.sample_width) > self.merge_max_seconds:
+                continue
+            # Segments still pointing into the capture ring are copied out first
+            first, second = detach(first), detach(second)
+            if first is None or second is None:
+                # Already overwritten in the ring; dropping it frees the slot instead
+                del items[i if first is None else i + 1]
+                self._depth -= 1
+                self._counters['drops'] += 1
+                return True
+            frame_data = b''.join((first.frame_data, second.frame_data))
+            items[i] = sr.AudioData(frame_data, first.sample_rate, first.sample_width)
+            # The merged utterance starts with the first and is complete with the second
+            for source, name in ((first, 'start'), (second, 'end'), (second, 'captured_at')):
+                if hasattr(source, name):
+                    setattr(items[i], name, getattr(source, name))
+            del items[i + 1]
+            self._depth -= 1
+            self._counters['merges'] += 1
+            return True
+        return False
+
+    def _drop_oldest(self):
+        for i, item in enumerate(self._items):
+            if item is not None:
+                del self._items[i]
+                self._depth -= 1
+                self._counters['drops'] += 1
+                return
+
+    def get(self, timeout=None):
+        """
+        Remove and return the oldest item.
+
+        Raises:
+            queue.Empty: Nothing arrived within the timeout
+        """
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            audio = self._items.popleft()
+            if audio is not None:
+                self._depth -= 1
+                self._not_full.notify()
+            return audio
+
+    def qsize(self):
+        with self._lock:
+            return self._depth
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def stats(self):
+        """Return the current depth and the put, drop and merge counters."""
+        with self._lock:
+            return {
+                'depth': self._depth,
+                'maxsize': self.maxsize,
+                'policy': self.policy,
+                **self._counters
+            }
@@ -7,6 +7,8 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DATA_DIR = os.path.join(PROJECT_ROOT, 'data', 'raw')
 PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, 'data', 'processed')
 TRANSCRIPTIONS_DIR = os.path.join(PROJECT_ROOT, 'data', 'transcriptions')
+CACHE_DIR = os.path.join(PROJECT_ROOT, 'data', 'cache')
+DECODED_AUDIO_DIR = os.path.join(CACHE_DIR, 'decoded')
 
 # Audio settings
 SAMPLE_RATE = 16000
@@ -14,6 +16,98 @@ CHANNELS = 1
 CHUNK_SIZE = 1024
 RECORD_SECONDS = 5  # Default recording time
 
+# Recognizer backend settings ('google', 'whisper', 'vosk', 'http' or 'fake')
+RECOGNIZER_BACKEND = 'google'
+RECOGNIZER_OPTIONS = {
+    'google': {'language': 'en-US'},
+    'whisper': {'model': 'base', 'language': 'en'},
+    'vosk': {'model_path': os.path.join(PROJECT_ROOT, 'models', 'vosk')},
+    'http': {'url': 'http://localhost:8000/recognize'},
+    'fake': {'latency': 0.0}
+}
+
+# HTTP recognition client settings
+RECOGNITION_CONCURRENCY = 16  # Requests in flight per client
+RECOGNITION_BUDGET = 30.0  # Seconds one utterance may spend across all retries
+RECOGNITION_REQUEST_TIMEOUT = 10.0  # Seconds allowed for a single attempt
+RECOGNITION_MAX_ATTEMPTS = 5  # Attempts per utterance, including the first
+RECOGNITION_BACKOFF_BASE = 0.25  # Upper bound of the first retry delay
+RECOGNITION_BACKOFF_MAX = 4.0  # Upper bound of any retry delay
+
+# Realtime transcription settings
+REALTIME_RECOGNITION_WORKERS = 4  # Utterances recognized concurrently while recording
+AUDIO_QUEUE_MAXSIZE = 16  # Utterances waiting for recognition before the queue policy applies
+AUDIO_QUEUE_POLICY = 'block'  # 'block' the capture, 'drop_oldest' or 'merge' adjacent utterances
+AUDIO_MERGE_MAX_SECONDS = 60  # Longest utterance the 'merge' policy may produce
+ENGINE_RECOGNITION_WORKERS = 8  # Recognition threads shared by all realtime sessions of a process
+ENGINE_ANALYSIS_WORKERS = 2  # Analysis threads shared by all realtime sessions of a process
+REALTIME_CAPTURE = 'ring'  # 'ring' (sounddevice ring buffer and our VAD) or 'listen' (recognizer.listen)
+CAPTURE_RING_SECONDS = 300  # Audio held by the capture ring buffer; segments queued longer are dropped as stale
+CAPTURE_NOISE_HISTORY_SECONDS = 10  # Recent audio used to estimate the noise floor while capturing
+PARTIAL_WINDOW_SECONDS = 5.0  # Trailing audio recognized for each partial hypothesis
+PARTIAL_HOP_SECONDS = 0.5  # New speech between partial hypotheses
+PARTIAL_PAUSE_SECONDS = 0.8  # Silence that ends an utterance in low-latency mode
+PARTIAL_PREROLL_SECONDS = 0.3  # Audio kept from before the speech onset
+SEGMENT_LOG = True  # Append each realtime segment to a JSONL log in TRANSCRIPTIONS_DIR as it is recognized
+SEGMENT_LOG_FSYNC_INTERVAL = 1.0  # Seconds between fsyncs of the segment log
+SEGMENT_LOG_FSYNC_BATCH = 32  # Segments written before the log is fsynced regardless of the interval
+
+# NLP resource settings
+NLTK_DOWNLOAD = True  # Download NLTK data that is not installed locally; False never touches the network
+NLP_STOPWORDS_LANGUAGE = 'english'  # NLTK stopword list shared by all analyzers
+
+# Summary settings
+SUMMARY_METHOD = 'textrank'  # 'frequency', 'tfidf' or 'textrank' sentence scoring of full reports; interim summaries use 'frequency'
+SUMMARY_SENTENCES = 3  # Sentences in a summary
+
+# Incremental analysis settings
+SUMMARY_CANDIDATES = 200  # Best-scoring sentences kept as summary candidates
+TOPIC_VOCABULARY_SIZE = 5000  # Words the online topic model can learn
+
+# Corpus topic model settings
+TOPIC_MODEL_PATH = os.path.join(PROCESSED_DATA_DIR, 'topic_model.joblib')  # Shared model, trained across transcripts
+CORPUS_TOPICS = 10  # Topics learned across all transcripts
+TOPIC_MODEL_LEARN = False  # Train (and save) the corpus model with each analyzed transcript; opt-in
+TOPIC_MODEL_MIN_DOCUMENTS = 100  # Sentences the corpus model must have learned before it replaces per-transcript LDA
+
+# Streaming transcription settings
+STREAMING_MIN_DURATION = 60  # Files longer than this (seconds) are transcribed segment by segment
+STREAM_BLOCK_SECONDS = 10  # Audio read from disk per block
+SEGMENT_MIN_SILENCE = 0.5  # Seconds of silence that end an utterance
+SEGMENT_MAX_SECONDS = 30  # Utterances are cut at this length
+
+# Voice activity detection settings
+VAD_FRAME_MS = 30  # Analysis frame length
+VAD_HOP_MS = 10  # Step between analysis frames
+VAD_ENERGY_FLOOR = 0.01  # Minimum frame RMS (full scale = 1.0) treated as speech
+VAD_NOISE_RATIO = 3.0  # Speech must be this much louder than the estimated noise floor
+VAD_PEAK_FRACTION = 0.1  # ...but never needs to exceed this fraction of the loudest frame (-20 dB), so quieter speakers still count
+VAD_ZCR_THRESHOLD = 0.3  # Quieter frames crossing zero this often count as unvoiced speech
+VAD_MIN_SILENCE = 0.3  # Shorter pauses are kept inside a speech segment
+VAD_MIN_SPEECH = 0.1  # Shorter bursts are discarded as noise
+VAD_PADDING = 0.1  # Seconds kept around each speech segment
+
+# Batch processing settings
+CONVERSION_WORKERS = os.cpu_count() or 1  # Processes converting files to WAV
+RECOGNITION_WORKERS = 8  # Threads waiting on the recognizer
+MAX_IN_FLIGHT = 32  # Files being converted or transcribed at once
+ANALYSIS_WORKERS = 1  # Processes used by NLPProcessor.analyze_batch; 1 analyzes in the calling process
+ANALYSIS_CHUNK_SIZE = 32  # Documents analyzed together, sharing one vectorizer vocabulary
+
+# Preprocessing settings
+PREPROCESS_BLOCK_SECONDS = 30  # Audio held in memory per block when preprocessing files
+
+# Visualization settings
+WAVEFORM_POINTS = 2000  # Envelope bins drawn across the waveform plot
+WAVEFORM_BLOCK_FRAMES = 1 << 20  # Samples read per block when building an envelope
+SPECTROGRAM_TILE_FRAMES = 1024  # STFT frames per cached spectrogram tile
+SPECTROGRAM_MAX_COLUMNS = 1200  # Spectrogram columns rendered per view
+SPECTROGRAM_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Cached tiles beyond this are evicted LRU-first, per file
+
+# Transcription cache settings
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # Stored transcripts beyond this are evicted LRU-first
+DECODED_AUDIO_MAX_BYTES = 2 * 1024 ** 3  # Decoded .npy arrays beyond this are evicted LRU-first
+
 # Create directories if they don't exist
-for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, TRANSCRIPTIONS_DIR]:
+for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, TRANSCRIPTIONS_DIR, CACHE_DIR, DECODED_AUDIO_DIR]:
     os.makedirs(directory, exist_ok=True)
\ No newline at end of file
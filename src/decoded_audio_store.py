@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
+import librosa
+import soundfile as sf
+from . import config
+from .audio_preprocessing import AudioPreprocessor
+
+class DecodedAudioStore:
+    """
+    Decode each audio file once per sample rate and serve it memory-mapped.
+    
+    Decoded signals are saved as float32 .npy files next to a small JSON
+    sidecar recording the source file's mtime and size. Callers get read-only
+    memory-mapped arrays, so several consumers share one decode without
+    copying. An entry is decoded again when its source changes; with
+    verify_hash, a touched but unchanged file is detected by content hash
+    and kept. The least recently used decodes are evicted once the stored
+    arrays exceed max_bytes; a sidecar's mtime records its last access.
+    """
+    
+    def __init__(self, directory=None, verify_hash=False, max_bytes=None):
+        """
+        Args:
+            directory (str): Where decoded arrays are kept, defaults to config.DECODED_AUDIO_DIR
+            verify_hash (bool): Compare content hashes before re-decoding a file whose mtime changed
+            max_bytes (int): Size bound for stored arrays, defaults to config.DECODED_AUDIO_MAX_BYTES
+        """
+        self.directory = directory or config.DECODED_AUDIO_DIR
+        self.verify_hash = verify_hash
+        self.max_bytes = max_bytes or config.DECODED_AUDIO_MAX_BYTES
+        self.preprocessor = AudioPreprocessor()
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _paths(self, file_path, sr):
+        """Return the (.npy, .json) paths for a file decoded at a sample rate."""
+        key = hashlib.sha1(f"{os.path.abspath(file_path)}:{sr}".encode()).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.npy", f"{base}.json"
+    
+    @staticmethod
+    def _file_hash(file_path):
+        """Hash the raw bytes of a source file."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _is_fresh(self, file_path, meta, stat):
+        """Check whether a stored decode still matches its source file."""
+        if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            return True
+        return bool(self.verify_hash and meta.get('sha256') and meta['sha256'] == self._file_hash(file_path))
+    
+    def load(self, file_path, sr=22050):
+        """
+        Return a file's signal at a sample rate, decoding it only if needed.
+        
+        Returns:
+            tuple: (read-only memory-mapped float32 array, sample rate)
+        """
+        npy_path, meta_path = self._paths(file_path, sr)
+        stat = os.stat(file_path)
+        
+        meta = None
+        if os.path.exists(npy_path) and os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        
+        if meta is None or not self._is_fresh(file_path, meta, stat):
+            self._decode(file_path, sr, npy_path)
+        elif meta['mtime_ns'] == stat.st_mtime_ns:
+            os.utime(meta_path)  # Mark as recently used
+            return np.load(npy_path, mmap_mode='r'), sr
+        
+        # Record the current source state, whether freshly decoded or verified by hash
+        meta = {
+            'source': os.path.abspath(file_path),
+            'sample_rate': sr,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size
+        }
+        if self.verify_hash:
+            meta['sha256'] = self._file_hash(file_path)
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        audio_data = np.load(npy_path, mmap_mode='r')
+        self._evict(keep=npy_path)
+        return audio_data, sr
+    
+    def _decode(self, file_path, sr, npy_path):
+        """Decode a file into an .npy array, block by block where soundfile can read it."""
+        tmp_path = f"{npy_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if self.preprocessor.is_streamable(file_path):
+                info = sf.info(file_path)
+                length = self.preprocessor.resampled_length(info.frames, info.samplerate, sr)
+                out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(length,))
+                position = 0
+                for block in self.preprocessor.iter_audio_blocks(file_path, sample_rate=sr):
+                    out[position:position + len(block)] = block
+                    position += len(block)
+                out.flush()
+                del out
+            else:
+                audio_data, _ = librosa.load(file_path, sr=sr)
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, audio_data.astype(np.float32))
+            os.replace(tmp_path, npy_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _evict(self, keep=None):
+        """Remove least recently used decodes until the stored arrays fit in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npy'):
+                continue
+            npy_path = os.path.join(self.directory, name)
+            meta_path = f"{npy_path[:-len('.npy')]}.json"
+            try:
+                size = os.path.getsize(npy_path)
+                last_access = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0.0
+            except OSError:
+                continue  # Removed by another process meanwhile
+            entries.append((last_access, size, npy_path, meta_path))
+        
+        total = sum(entry[1] for entry in entries)
+        for _, size, npy_path, meta_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if npy_path == keep:
+                continue
+            try:
+                # Arrays already mapped by a reader stay valid after the unlink
+                os.remove(npy_path)
+                if os.path.exists(meta_path):
+                    os.remove(meta_path)
+            except OSError:
+                continue
+            total -= size
+    
+    @staticmethod
+    def _write_atomic(path, data):
+        """Write a file so concurrent readers never see it half written."""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def invalidate(self, file_path, sr=22050):
+        """Drop the stored decode of a file at a sample rate."""
+        for path in self._paths(file_path, sr):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,117 @@
+import heapq
+from collections import Counter
+import numpy as np
+from . import config
+from .nlp_processor import NLPProcessor
+from .tokenized_document import TokenizedDocument
+from .topic_model import OnlineTopicModel
+
+class IncrementalAnalyzer:
+    """
+    NLP analysis of a growing transcript that only processes new segments.
+
+    Produces the same report shape as NLPProcessor.analyze_text, built from
+    running state instead of the full text:
+
+    - key phrases come from running word frequencies;
+    - sentiment is the word-count weighted mean of per-segment VADER scores;
+    - the summary is chosen from a bounded set of best-scoring candidate
+      sentences, rescored against the current word frequencies
+      (Summarizer's 'frequency' method). This is deliberately not
+      config.SUMMARY_METHOD: 'tfidf' and 'textrank' score each sentence
+      against every other one, which a bounded running state cannot do.
+      The final report of a recording, from analyze_text, may therefore
+      pick different sentences than the last interim summary;
+    - topics come from an online LDA model updated with the new sentences.
+    """
+
+    def __init__(self, nlp_processor, num_sentences=None, num_topics=3, num_words=5, candidate_limit=None):
+        """
+        Args:
+            nlp_processor (NLPProcessor): Source of the sentiment analyzer and stop words
+            num_sentences (int): Sentences in the summary, defaults to config.SUMMARY_SENTENCES
+            num_topics (int): Number of topics
+            num_words (int): Words reported per topic
+            candidate_limit (int): Summary candidate sentences kept between updates
+        """
+        self.sia = nlp_processor.sia
+        self.stop_words = nlp_processor.stop_words
+        self.num_sentences = num_sentences or config.SUMMARY_SENTENCES
+        self.num_words = num_words
+        self.candidate_limit = candidate_limit or config.SUMMARY_CANDIDATES
+
+        self.segments_seen = 0
+        self.sentence_count = 0
+        self.word_freq = Counter()
+        self.sentiment_totals = Counter()
+        self.sentiment_weight = 0
+        self.candidates = []  # (sentence index, sentence, lowercased words)
+        self.topic_model = OnlineTopicModel(num_topics=num_topics, stop_words=self.stop_words)
+
+    def update(self, segments):
+        """Fold new transcript segments into the running analysis."""
+        new_documents = []
+        for segment in segments:
+            self.segments_seen += 1
+            # Tokenized the same way as NLPProcessor's analyzers
+            document = TokenizedDocument(segment, self.stop_words)
+            if not document.num_words:
+                continue
+
+            counts = document.term_counts()
+            self.word_freq.update({document.terms[i]: int(counts[i]) for i in np.flatnonzero(counts)})
+
+            scores = self.sia.polarity_scores(segment)
+            for name, value in scores.items():
+                self.sentiment_totals[name] += value * document.num_words
+            self.sentiment_weight += document.num_words
+
+            new_documents.append(document)
+            for index, sentence in enumerate(document.sentences):
+                words = [document.terms[i] for i in document.sentence_terms(index)]
+                self.candidates.append((self.sentence_count, sentence, words))
+                self.sentence_count += 1
+
+        if len(self.candidates) > self.candidate_limit:
+            self.candidates = heapq.nlargest(self.candidate_limit, self.candidates, key=self._sentence_score)
+        if new_documents:
+            self.topic_model.partial_fit(new_documents, by_sentence=True)
+        return self
+
+    def update_from(self, transcript):
+        """Process the segments of a growing transcript list that haven't been seen yet."""
+        return self.update(transcript[self.segments_seen:])
+
+    def _sentence_score(self, candidate):
+        words = candidate[2]
+        return sum(self.word_freq.get(word, 0) for word in words) / (len(words) + 1)
+
+    def sentiment(self):
+        if not self.sentiment_weight:
+            scores = {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+        else:
+            scores = {name: value / self.sentiment_weight for name, value in self.sentiment_totals.items()}
+        return NLPProcessor.sentiment_from_scores(scores)
+
+    def summary(self):
+        top = heapq.nlargest(self.num_sentences, self.candidates, key=self._sentence_score)
+        if not top:
+            return ''
+        return '. '.join(sentence for _, sentence, _ in sorted(top)) + '.'
+
+    def key_phrases(self):
+        return [word for word, _ in self.word_freq.most_common(10)]
+
+    def topics(self):
+        if self.sentence_count < 2 or not self.topic_model.is_fitted:
+            return [{'topic': 'Main Topic', 'words': self.key_phrases()[:5]}]
+        return self.topic_model.topics(self.num_words)
+
+    def report(self):
+        """Return the current analysis in the shape produced by NLPProcessor.analyze_text."""
+        return {
+            'sentiment': self.sentiment(),
+            'summary': self.summary(),
+            'topics': self.topics(),
+            'key_phrases': self.key_phrases()
+        }
@@ -1,47 +1,44 @@
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
+import numpy as np
 import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
+from . import config
+from .nlp_resources import get_resources, preload
+from .summarizer import Summarizer
+from .tokenized_document import TokenizedDocument
 
 class NLPProcessor:
-    def __init__(self):
-        # Download required NLTK data
-        try:
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('vader_lexicon', quiet=True)
-            nltk.download('averaged_perceptron_tagger', quiet=True)
-        except Exception as e:
-            print(f"Warning: Could not download some NLTK data: {e}")
-        
-        self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, resources=None):
+        """
+        Args:
+            resources (NLPResources): Models and word lists, defaults to the process-wide registry
+        """
+        # Nothing is loaded here; resources load on first use and are shared
+        self.resources = resources or get_resources()
+    
+    @property
+    def sia(self):
+        return self.resources.sentiment_analyzer
+    
+    @property
+    def stop_words(self):
+        return self.resources.stop_words
+    
+    def tokenize(self, text):
+        """Return text as a TokenizedDocument; documents are passed through unchanged."""
+        if isinstance(text, TokenizedDocument):
+            return text
+        return TokenizedDocument(text, self.stop_words)
     
     def analyze_sentiment(self, text):
         """Analyze the sentiment of the text using NLTK's VADER sentiment analyzer."""
+        if isinstance(text, TokenizedDocument):
+            text = text.text  # VADER reads punctuation and capitals, so it scores the raw text
         try:
-            scores = self.sia.polarity_scores(text)
-            
-            # Determine overall sentiment
-            compound = scores['compound']
-            if compound >= 0.05:
-                sentiment = 'positive'
-            elif compound <= -0.05:
-                sentiment = 'negative'
-            else:
-                sentiment = 'neutral'
-                
-            return {
-                'sentiment': sentiment,
-                'polarity': compound,
-                'subjectivity': abs(compound),
-                'scores': scores
-            }
+            return self.sentiment_from_scores(self.sia.polarity_scores(text))
         except Exception as e:
             return {
                 'sentiment': 'neutral',
@@ -51,125 +48,300 @@ class NLPProcessor:
                 'error': str(e)
             }
 
-    def generate_summary(self, text, num_sentences=3):
-        """Generate a summary using sentence scoring based on word frequency."""
-        try:
-            # Split into sentences (handling multiple punctuation marks)
-            sentences = [s.strip() for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()]
-            
-            # Return original text if it's too short
-            if len(sentences) <= num_sentences:
-                return text
+    @staticmethod
+    def sentiment_from_scores(scores):
+        """Build a sentiment result from VADER polarity scores."""
+        # Determine overall sentiment
+        compound = scores['compound']
+        if compound >= 0.05:
+            sentiment = 'positive'
+        elif compound <= -0.05:
+            sentiment = 'negative'
+        else:
+            sentiment = 'neutral'
             
-            # Calculate word frequencies
-            words = text.lower().split()
-            word_freq = {}
-            for word in words:
-                if word.isalnum() and word not in self.stop_words:
-                    word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # Score sentences
-            sentence_scores = {}
-            for sentence in sentences:
-                words = sentence.lower().split()
-                score = sum(word_freq.get(word, 0) for word in words if word not in self.stop_words)
-                score = score / (len(words) + 1)  # Normalize by length
-                sentence_scores[sentence] = score
-            
-            # Select top sentences
-            top_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)[:num_sentences]
-            summary = '. '.join(sent for sent, _ in sorted(top_sentences, key=lambda x: sentences.index(x[0])))
-            
-            return summary + '.'
+        return {
+            'sentiment': sentiment,
+            'polarity': compound,
+            'subjectivity': abs(compound),
+            'scores': scores
+        }
+
+    def generate_summary(self, text, num_sentences=None, method=None, ratio=None):
+        """
+        Generate an extractive summary, see Summarizer.
+        
+        Args:
+            text (str | TokenizedDocument): Text to summarize
+            num_sentences (int): Sentences in the summary, defaults to config.SUMMARY_SENTENCES
+            method (str): 'frequency', 'tfidf' or 'textrank', defaults to config.SUMMARY_METHOD
+            ratio (float): Summary length as a fraction of the sentences; overrides num_sentences
+        """
+        try:
+            return Summarizer(self.stop_words, method).summarize(self.tokenize(text), num_sentences, ratio)
         except Exception as e:
             return str(e)
 
     def extract_topics(self, text, num_topics=3, num_words=5):
-        """Extract main topics using LDA with proper error handling."""
+        """
+        Extract main topics using LDA with proper error handling.
+        
+        Once the corpus topic model has been trained, topics are inferred from
+        it, so they are comparable across transcripts. Until then a small LDA
+        model is fitted to the sentences of this text.
+        """
+        document = None
         try:
-            # Split text into sentences to create multiple documents
-            sentences = [s.strip() for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()]
-            
-            if len(sentences) < 2:
-                return [{'topic': 'Main Topic', 'words': self.extract_key_phrases(text)[:5]}]
-            
-            # Create document-term matrix
-            vectorizer = CountVectorizer(
-                max_df=0.95,
-                min_df=1,
-                stop_words='english',
-                max_features=100  # Limit features for short texts
-            )
-            doc_term_matrix = vectorizer.fit_transform(sentences)
-            
-            # Adjust number of topics based on text length
-            actual_num_topics = min(num_topics, len(sentences), 3)
+            # Each sentence is a separate document for LDA
+            document = self.tokenize(text)
             
-            # Create and fit LDA model
-            lda_model = LatentDirichletAllocation(
-                n_components=actual_num_topics,
-                random_state=42,
-                max_iter=10  # Faster convergence for short texts
-            )
-            lda_output = lda_model.fit_transform(doc_term_matrix)
-            
-            # Get feature names
-            feature_names = vectorizer.get_feature_names_out()
+            if document.num_sentences < 2:
+                return [{'topic': 'Main Topic', 'words': self.extract_key_phrases(document)[:5]}]
             
-            # Extract topics
-            topics = []
-            for topic_idx, topic in enumerate(lda_model.components_):
-                top_words_idx = topic.argsort()[:-num_words-1:-1]
-                top_words = [feature_names[i] for i in top_words_idx]
-                topics.append({
-                    'topic': f'Topic {topic_idx + 1}',
-                    'words': top_words
-                })
+            corpus_model = self._corpus_topic_model()
+            if corpus_model is not None:
+                return corpus_model.document_topics(document, num_topics, num_words)
             
-            return topics
+            return self._document_topics(document, num_topics, num_words)
         except Exception as e:
             # Fallback to key phrases
-            key_phrases = self.extract_key_phrases(text)
+            key_phrases = self.extract_key_phrases(document or text)
             return [{'topic': 'Main Topic', 'words': key_phrases[:5]}]
     
+    def _document_topics(self, document, num_topics, num_words, max_features=100):
+        """Fit LDA to the sentence-term matrix of one document."""
+        doc_term_matrix = document.sentence_term_matrix()
+        settings = self.resources.vectorizer_settings
+        # Same pruning as CountVectorizer(min_df, max_df, max_features)
+        document_frequency = np.bincount(doc_term_matrix.indices, minlength=doc_term_matrix.shape[1])
+        kept = np.flatnonzero(
+            (document_frequency >= settings['min_df']) &
+            (document_frequency <= settings['max_df'] * document.num_sentences)
+        )
+        kept = kept[np.argsort(-document.term_counts()[kept], kind='stable')[:max_features]]  # Limit features for short texts
+        if not len(kept):
+            raise ValueError("After pruning, no terms remain")
+        return self._topics_from_matrix(doc_term_matrix[:, kept], [document.terms[i] for i in kept], num_topics, num_words)
+
+    def _corpus_topic_model(self):
+        """Return the shared corpus topic model once it has seen config.TOPIC_MODEL_MIN_DOCUMENTS, else None."""
+        model = getattr(self.resources, 'corpus_topic_model', None)
+        if model is None or not model.is_fitted or model.documents_seen < config.TOPIC_MODEL_MIN_DOCUMENTS:
+            return None
+        return model
+    
+    def update_topic_model(self, texts, save=True):
+        """
+        Train the corpus topic model on new transcripts.
+        
+        Args:
+            texts (str | TokenizedDocument | iterable): One transcript or many
+            save (bool): Write the updated model to config.TOPIC_MODEL_PATH
+        """
+        if isinstance(texts, (str, TokenizedDocument)):
+            texts = [texts]
+        model = self.resources.corpus_topic_model
+        for text in texts:
+            model.partial_fit(self.tokenize(text))
+        if save:
+            model.save(config.TOPIC_MODEL_PATH)
+        return model
+    
+    @staticmethod
+    def _topics_from_matrix(doc_term_matrix, feature_names, num_topics, num_words):
+        """Fit LDA on a sentence-term matrix and return the top words of each topic."""
+        # Adjust number of topics based on text length
+        actual_num_topics = min(num_topics, doc_term_matrix.shape[0], 3)
+        
+        # Create and fit LDA model
+        lda_model = LatentDirichletAllocation(
+            n_components=actual_num_topics,
+            random_state=42,
+            max_iter=10  # Faster convergence for short texts
+        )
+        lda_model.fit(doc_term_matrix)
+        
+        # Extract topics
+        topics = []
+        for topic_idx, topic in enumerate(lda_model.components_):
+            top_words_idx = topic.argsort()[:-num_words-1:-1]
+            top_words = [feature_names[i] for i in top_words_idx]
+            topics.append({
+                'topic': f'Topic {topic_idx + 1}',
+                'words': top_words
+            })
+        
+        return topics
+    
     def extract_key_phrases(self, text):
         """Extract key phrases using frequency-based approach."""
         try:
-            # Split text into words
-            words = text.lower().split()
-            
-            # Remove stopwords and non-alphanumeric words
-            words = [word for word in words 
-                    if word.isalnum() and word not in self.stop_words]
-            
-            # Get word frequency
-            word_freq = {}
-            for word in words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # Get top words as key phrases
-            key_words = sorted(word_freq.items(), 
-                             key=lambda x: x[1], 
-                             reverse=True)[:10]
-            
-            return [word for word, _ in key_words]
-            
+            # The ten most frequent content words, ties in order of appearance
+            return self.tokenize(text).top_terms(10)
         except Exception as e:
             return [f"Error extracting key phrases: {str(e)}"]
 
-    def analyze_text(self, text, output_dir='data/analysis'):
-        """Perform complete NLP analysis on the text."""
+    def analyze_batch(self, items, from_files=False, workers=None, chunk_size=None,
+                      num_sentences=None, num_topics=3, num_words=5):
+        """
+        Analyze many texts or transcript files, yielding one record per document.
+        
+        Documents are analyzed in chunks. Each document is tokenized once
+        into a TokenizedDocument shared by its summary, topics and key
+        phrases, and the chunk is sentiment-scored in one pass over the
+        shared analyzer. Until the corpus topic model takes over, topics
+        come from one vocabulary pruned across the whole chunk, which every
+        document's LDA reads its columns from. No report files are written and the corpus topic
+        model is not updated; see update_topic_model.
+        
+        Args:
+            items (iterable): Texts, or transcript paths when from_files is set
+            from_files (bool): Read each item as a UTF-8 transcript file
+            workers (int): Processes analyzing chunks, defaults to config.ANALYSIS_WORKERS;
+                they use this processor's resources, which must be picklable unless
+                they are the process-wide registry
+            chunk_size (int): Documents per chunk, defaults to config.ANALYSIS_CHUNK_SIZE
+            num_sentences (int): Sentences per summary, defaults to config.SUMMARY_SENTENCES
+            num_topics (int): Topics per document
+            num_words (int): Words per topic
+        
+        Yields:
+            dict: Records in input order with 'index', 'source', 'success' and either
+            'words', 'sentiment', 'summary', 'topics' and 'key_phrases' or 'error'
+        """
+        workers = workers or config.ANALYSIS_WORKERS
+        chunk_size = chunk_size or config.ANALYSIS_CHUNK_SIZE
+        options = (from_files, num_sentences, num_topics, num_words)
+        numbered = enumerate(items)
+        chunks = iter(lambda: list(islice(numbered, chunk_size)), [])
+        
+        if workers == 1:
+            for chunk in chunks:
+                yield from self._analyze_chunk(chunk, *options)
+            return
+        
+        # Workers load their own registry, or analyze with the caller's resources
+        resources = None if self.resources is get_resources() else self.resources
+        with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(resources,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                while len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+                pending.append(pool.submit(_analyze_chunk, chunk, *options))
+            while pending:
+                yield from pending.popleft().result()
+
+    def _analyze_chunk(self, chunk, from_files, num_sentences, num_topics, num_words):
+        """Analyze a list of (index, text or path) pairs; see analyze_batch."""
+        records, documents = [], []
+        for index, item in chunk:
+            record = {'index': index, 'source': str(item) if from_files else None}
+            records.append(record)
+            try:
+                if from_files:
+                    with open(item, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                else:
+                    text = item
+            except Exception as e:
+                record.update(success=False, error=str(e))
+                continue
+            document = self.tokenize(text)
+            record['words'] = document.num_words
+            documents.append((record, document))
+        
+        sentiments = self._batch_sentiment([document.text for _, document in documents])
+        vocabulary = None
+        if self._corpus_topic_model() is None:
+            vocabulary = self._chunk_vocabulary([document for _, document in documents])
+        for (record, document), sentiment in zip(documents, sentiments):
+            if vocabulary is None:
+                topics = self.extract_topics(document, num_topics, num_words)
+            else:
+                topics = self._chunk_topics(document, vocabulary, num_topics, num_words)
+            record.update(
+                success=True,
+                sentiment=sentiment,
+                summary=self.generate_summary(document, num_sentences),
+                topics=topics,
+                key_phrases=self.extract_key_phrases(document)
+            )
+        return records
+
+    def _chunk_vocabulary(self, documents):
+        """
+        Topic terms of a chunk, pruned like one CountVectorizer fitted on all its sentences.
+        
+        Returns:
+            dict: Term to column, in alphabetical order as CountVectorizer numbers its features
+        """
+        settings = self.resources.vectorizer_settings
+        document_frequency = Counter()
+        num_sentences = 0
+        for document in documents:
+            if document.num_sentences < 2:
+                continue  # Summarized by key phrases, see extract_topics
+            frequency = np.bincount(document.sentence_term_matrix().indices, minlength=len(document.terms))
+            document_frequency.update({document.terms[i]: int(frequency[i]) for i in np.flatnonzero(frequency)})
+            num_sentences += document.num_sentences
+        kept = sorted(
+            term for term, frequency in document_frequency.items()
+            if settings['min_df'] <= frequency <= settings['max_df'] * num_sentences
+        )
+        return {term: column for column, term in enumerate(kept)}
+
+    def _chunk_topics(self, document, vocabulary, num_topics, num_words):
+        """Fit LDA to one document's sentences over the chunk vocabulary; see extract_topics."""
+        try:
+            if document.num_sentences < 2:
+                raise ValueError("Too few sentences for topics")
+            kept = [i for i in np.flatnonzero(document.term_counts()) if document.terms[i] in vocabulary]
+            if not kept:
+                raise ValueError("After pruning, no terms remain")
+            kept.sort(key=lambda i: vocabulary[document.terms[i]])
+            return self._topics_from_matrix(
+                document.sentence_term_matrix()[:, kept], [document.terms[i] for i in kept], num_topics, num_words
+            )
+        except Exception:
+            return [{'topic': 'Main Topic', 'words': self.extract_key_phrases(document)[:5]}]
+
+    def _batch_sentiment(self, texts):
+        """Score many texts with the shared VADER analyzer."""
+        try:
+            score = self.sia.polarity_scores
+        except Exception:
+            return [self.analyze_sentiment(text) for text in texts]  # Reports the error per document
+        return [self.sentiment_from_scores(score(text)) for text in texts]
+
+    def analyze_text(self, text, output_dir='data/analysis', learn_topics=None):
+        """
+        Perform complete NLP analysis on the text.
+        
+        Args:
+            text (str): Text to analyze
+            output_dir (str): Where the report is written
+            learn_topics (bool): Train the corpus topic model with the text afterwards,
+                defaults to config.TOPIC_MODEL_LEARN
+        """
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
-        # Perform analysis
+        # Perform analysis on a single tokenization of the text
+        document = self.tokenize(text)
+        text = document.text
         analysis = {
-            'sentiment': self.analyze_sentiment(text),
-            'summary': self.generate_summary(text),
-            'topics': self.extract_topics(text),
-            'key_phrases': self.extract_key_phrases(text)
+            'sentiment': self.analyze_sentiment(document),
+            'summary': self.generate_summary(document),
+            'topics': self.extract_topics(document),
+            'key_phrases': self.extract_key_phrases(document)
         }
         
+        if config.TOPIC_MODEL_LEARN if learn_topics is None else learn_topics:
+            try:
+                self.update_topic_model(document)
+            except Exception as e:
+                print(f"Error updating topic model: {e}")
+        
         # Save analysis to file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = os.path.join(output_dir, f'analysis_{timestamp}.txt')
@@ -190,15 +362,41 @@ class NLPProcessor:
         
         return analysis, output_file
 
-def analyze_transcription(transcription_file):
-    """Analyze a transcription file using NLP techniques."""
+_processor = None
+
+def get_processor():
+    """Return the process-wide NLPProcessor."""
+    global _processor
+    if _processor is None:
+        _processor = NLPProcessor()
+    return _processor
+
+def _start_worker(resources=None):
+    """Analysis worker initializer: adopt the caller's resources, or preload the registry."""
+    global _processor
+    if resources is None:
+        preload()
+    else:
+        _processor = NLPProcessor(resources)
+
+def _analyze_chunk(chunk, *options):
+    """Analyze a chunk of documents inside an analysis worker process."""
+    return get_processor()._analyze_chunk(chunk, *options)
+
+def analyze_transcription(transcription_file, nlp=None):
+    """
+    Analyze a transcription file using NLP techniques.
+    
+    Args:
+        transcription_file (str): Transcript to analyze
+        nlp (NLPProcessor): Processor to use, defaults to the shared one
+    """
     try:
         # Read the transcription
         with open(transcription_file, 'r', encoding='utf-8') as f:
             text = f.read()
         
-        # Initialize NLP processor
-        nlp = NLPProcessor()
+        nlp = nlp or get_processor()
         
         # Analyze the text
         analysis, output_file = nlp.analyze_text(text)
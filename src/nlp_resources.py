@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+import nltk
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from . import config
+
+def ensure_nltk_data(resource, package):
+    """
+    Make an NLTK resource available, looking for a local copy first.
+
+    Args:
+        resource (str): Path searched by nltk.data.find, e.g. 'corpora/stopwords'
+        package (str): Package passed to nltk.download when the resource is missing
+
+    Returns:
+        bool: Whether the resource is installed
+    """
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        pass
+    if not config.NLTK_DOWNLOAD:
+        return False
+    try:
+        nltk.download(package, quiet=True)
+        nltk.data.find(resource)
+        return True
+    except Exception as e:
+        print(f"Warning: Could not download NLTK data '{package}': {e}")
+        return False
+
+class NLPResources:
+    """
+    Process-wide registry of the models and word lists used by the analyzers.
+
+    Each resource is loaded on first access, at most once per process, and
+    then shared by every NLPProcessor. The VADER lexicon takes most of the
+    load time, so a processor that only extracts key phrases never pays
+    for it. Call preload() at worker startup to move all loading out of
+    the first request.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = {}
+        self._failed = {}  # Resources that could not be loaded are not retried
+        self.load_seconds = {}
+
+    def _get(self, name, loader):
+        """Return a loaded resource, loading it once on first use."""
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name in self._failed:
+                raise self._failed[name]
+            if name not in self._loaded:
+                started = time.perf_counter()
+                try:
+                    self._loaded[name] = loader()
+                except Exception as e:
+                    self._failed[name] = e
+                    raise
+                finally:
+                    self.load_seconds[name] = time.perf_counter() - started
+            return self._loaded[name]
+
+    @property
+    def sentiment_analyzer(self):
+        """Shared VADER SentimentIntensityAnalyzer."""
+        def load():
+            from nltk.sentiment import SentimentIntensityAnalyzer
+            ensure_nltk_data('sentiment/vader_lexicon.zip', 'vader_lexicon')
+            return SentimentIntensityAnalyzer()
+        return self._get('sentiment_analyzer', load)
+
+    @property
+    def stop_words(self):
+        """Shared stop word set, falling back to scikit-learn's list when NLTK's is unavailable."""
+        def load():
+            if ensure_nltk_data('corpora/stopwords', 'stopwords'):
+                from nltk.corpus import stopwords
+                return frozenset(stopwords.words(config.NLP_STOPWORDS_LANGUAGE))
+            print("Warning: NLTK stopwords unavailable, using scikit-learn's English stop words")
+            return frozenset(ENGLISH_STOP_WORDS)
+        return self._get('stop_words', load)
+
+    @property
+    def vectorizer_settings(self):
+        """Document-frequency pruning of the per-text topic model, as CountVectorizer options."""
+        return {'max_df': 0.95, 'min_df': 1}
+
+    @property
+    def corpus_topic_model(self):
+        """Shared OnlineTopicModel, read from config.TOPIC_MODEL_PATH when it exists."""
+        def load():
+            from .topic_model import OnlineTopicModel
+            if os.path.exists(config.TOPIC_MODEL_PATH):
+                try:
+                    return OnlineTopicModel.load(config.TOPIC_MODEL_PATH)
+                except Exception as e:
+                    print(f"Warning: Could not load topic model, starting a new one: {e}")
+            return OnlineTopicModel(num_topics=config.CORPUS_TOPICS)
+        return self._get('corpus_topic_model', load)
+
+    def preload(self):
+        """
+        Load every resource now.
+
+        Returns:
+            dict: Seconds spent loading each resource in this process
+        """
+        for name in ('sentiment_analyzer', 'stop_words', 'corpus_topic_model'):
+            try:
+                getattr(self, name)
+            except Exception as e:
+                print(f"Warning: Could not load NLP resource '{name}': {e}")
+        return dict(self.load_seconds)
+
+_resources = NLPResources()
+
+def get_resources():
+    """Return the process-wide NLPResources."""
+    return _resources
+
+def preload():
+    """Load all NLP resources of this process, e.g. in a worker initializer."""
+    return _resources.preload()
@@ -0,0 +1,286 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+import speech_recognition as sr
+from . import config
+
+class PartialTranscriber:
+    """
+    Low-latency transcription of a live chunk stream.
+
+    Chunks of raw PCM are fed as they are captured. An energy endpointer
+    finds utterances. While an utterance is in progress, its most recent
+    `window_seconds` are recognized every `hop_seconds`, so consecutive
+    windows overlap and partial hypotheses arrive within about one hop of
+    speech. When the utterance ends, the whole utterance is recognized
+    and the final text replaces the partials.
+
+    Results are dicts:
+        {'utterance': int, 'final': bool, 'text': str, 'start': float, 'end': float}
+    where start/end are stream positions in seconds. They are delivered to
+    the on_result callback or, without one, through the results() generator.
+    Finals are released in utterance order. Each utterance has at most one
+    partial waiting for a worker; newer windows replace its audio, so a slow
+    backend never builds up a backlog. Partials already superseded when a
+    worker picks them up, or when their text arrives, are discarded as stale.
+    """
+
+    def __init__(self, backend, sample_rate=None, sample_width=2, energy_threshold=300,
+                 window_seconds=None, hop_seconds=None, pause_seconds=None, preroll_seconds=None,
+                 max_utterance_seconds=None, workers=None, on_result=None, clock=time.perf_counter,
+                 executor=None):
+        """
+        Args:
+            backend (RecognizerBackend): Recognition engine
+            sample_rate (int): Sample rate of the fed chunks
+            sample_width (int): Bytes per sample of the fed chunks (mono)
+            energy_threshold (float): RMS above which a chunk counts as speech, as in sr.Recognizer
+            window_seconds (float): Audio recognized for each partial hypothesis
+            hop_seconds (float): New speech between partial hypotheses
+            pause_seconds (float): Silence that ends an utterance
+            preroll_seconds (float): Audio kept from before the speech onset
+            max_utterance_seconds (float): Utterances are cut at this length
+            workers (int): Recognitions in flight at once
+            on_result (callable): Called with each result dict; without one, results are queued for results()
+            clock (callable): Time source used for latency measurements
+            executor (Executor): Pool to recognize on, e.g. one shared by many streams;
+                by default the transcriber starts its own with `workers` threads
+        """
+        self.backend = backend
+        self.sample_rate = sample_rate or config.SAMPLE_RATE
+        self.sample_width = sample_width
+        self.energy_threshold = energy_threshold
+        self.on_result = on_result
+        self.clock = clock
+
+        bytes_per_second = self.sample_rate * self.sample_width
+        self._bytes_per_second = bytes_per_second
+        self._window_bytes = self._aligned((window_seconds or config.PARTIAL_WINDOW_SECONDS) * bytes_per_second)
+        self._hop_bytes = self._aligned((hop_seconds or config.PARTIAL_HOP_SECONDS) * bytes_per_second)
+        self._pause_bytes = self._aligned((pause_seconds or config.PARTIAL_PAUSE_SECONDS) * bytes_per_second)
+        self._preroll_bytes = self._aligned(
+            (preroll_seconds if preroll_seconds is not None else config.PARTIAL_PREROLL_SECONDS) * bytes_per_second
+        )
+        self._max_bytes = self._aligned((max_utterance_seconds or config.SEGMENT_MAX_SECONDS) * bytes_per_second)
+        self._dtype = {1: np.int8, 2: '<i2', 4: '<i4'}[sample_width]
+
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=workers or config.REALTIME_RECOGNITION_WORKERS,
+            thread_name_prefix="PartialRecognition"
+        )
+        self._futures = set()  # Outstanding recognitions, waited for by close() on a shared executor
+        self._results = queue.Queue() if on_result is None else None
+        self._lock = threading.Lock()
+
+        # Capture state, only touched by the feeding thread
+        self._position = 0  # Bytes fed so far
+        self._preroll = deque()
+        self._preroll_size = 0
+        self._utterance = None
+        self._utterance_id = -1
+        self._utterance_start = 0
+        self._silent_bytes = 0
+        self._since_partial = 0
+        self._revision = 0
+
+        # Delivery state, guarded by _lock
+        self._queued_partials = {}  # utterance -> newest partial waiting for a worker
+        self._ended = -1  # Newest utterance whose final was submitted
+        self._captured_at = {}  # utterance -> capture time of its first speech chunk
+        self._latest_partial = {}  # utterance -> newest partial revision delivered
+        self._pending_finals = {}
+        self._next_final = 0
+        self._first_word_latencies = []
+        self._counters = {'utterances': 0, 'partials': 0, 'finals': 0, 'stale_partials': 0, 'coalesced_partials': 0}
+        self._closed = False
+
+    def _aligned(self, size):
+        return max(self.sample_width, int(size) // self.sample_width * self.sample_width)
+
+    def feed(self, chunk, capture_time=None):
+        """
+        Add a chunk of raw PCM from the stream.
+
+        Args:
+            chunk (bytes): Mono samples in the configured rate and width
+            capture_time (float): When the chunk was captured, in clock() time; defaults to now
+        """
+        capture_time = self.clock() if capture_time is None else capture_time
+        chunk = bytes(chunk)
+        samples = np.frombuffer(chunk, dtype=self._dtype).astype(np.float64)
+        is_speech = samples.size > 0 and np.sqrt(np.mean(samples ** 2)) > self.energy_threshold
+        self._position += len(chunk)
+
+        if self._utterance is None:
+            if not is_speech:
+                self._remember_preroll(chunk)
+                return
+            self._start_utterance(capture_time, self._position - len(chunk))
+
+        self._utterance += chunk
+        self._since_partial += len(chunk)
+        self._silent_bytes = 0 if is_speech else self._silent_bytes + len(chunk)
+
+        if self._silent_bytes >= self._pause_bytes or len(self._utterance) >= self._max_bytes:
+            self._finish_utterance()
+        elif self._since_partial >= self._hop_bytes:
+            self._since_partial = 0
+            self._revision += 1
+            self._submit(bytes(self._utterance[-self._window_bytes:]), final=False, revision=self._revision)
+
+    def _remember_preroll(self, chunk):
+        self._preroll.append(chunk)
+        self._preroll_size += len(chunk)
+        while self._preroll and self._preroll_size - len(self._preroll[0]) >= self._preroll_bytes:
+            self._preroll_size -= len(self._preroll.popleft())
+
+    def _start_utterance(self, capture_time, onset):
+        self._utterance = bytearray(b''.join(self._preroll))
+        self._utterance_start = onset - self._preroll_size
+        self._preroll.clear()
+        self._preroll_size = 0
+        self._utterance_id += 1
+        self._silent_bytes = 0
+        self._since_partial = 0
+        self._revision = 0
+        with self._lock:
+            self._captured_at[self._utterance_id] = capture_time
+            self._counters['utterances'] += 1
+
+    def _finish_utterance(self):
+        """Send the whole utterance, minus the trailing pause, for final recognition."""
+        audio = bytes(self._utterance[:len(self._utterance) - self._silent_bytes]) or bytes(self._utterance)
+        with self._lock:
+            self._ended = self._utterance_id
+        self._submit(audio, final=True, revision=None)
+        self._utterance = None
+        self._silent_bytes = 0
+
+    def _submit(self, audio, final, revision):
+        utterance = self._utterance_id
+        start = self._utterance_start / self._bytes_per_second
+        end = start + len(audio) / self._bytes_per_second if final else self._position / self._bytes_per_second
+        if final:
+            self._track(self._executor.submit(self._recognize, utterance, audio, final, revision, start, end))
+            return
+        with self._lock:
+            queued = utterance in self._queued_partials
+            if queued:
+                self._counters['coalesced_partials'] += 1
+            self._queued_partials[utterance] = (audio, revision, start, end)
+        if not queued:
+            self._track(self._executor.submit(self._recognize_partial, utterance))
+
+    def _track(self, future):
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._untrack)
+
+    def _untrack(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _recognize_partial(self, utterance):
+        """Recognize the newest window queued for an utterance, unless it is already superseded."""
+        with self._lock:
+            audio, revision, start, end = self._queued_partials.pop(utterance)
+            if utterance <= self._ended or revision <= self._latest_partial.get(utterance, 0):
+                self._counters['stale_partials'] += 1
+                return
+        self._recognize(utterance, audio, False, revision, start, end)
+
+    def _recognize(self, utterance, audio, final, revision, start, end):
+        text = ''
+        try:
+            text = self.backend.transcribe(sr.AudioData(audio, self.sample_rate, self.sample_width))
+        except sr.UnknownValueError:
+            pass  # Nothing intelligible in this window
+        except sr.RequestError as e:
+            print(f"Speech recognition service error: {e}")
+        except Exception as e:
+            print(f"Error processing audio: {e}")
+        result = {'utterance': utterance, 'final': final, 'text': text, 'start': start, 'end': end}
+        if final:
+            self._deliver_final(result)
+        else:
+            self._deliver_partial(result, revision)
+
+    def _deliver_partial(self, result, revision):
+        utterance = result['utterance']
+        with self._lock:
+            if utterance < self._next_final or revision <= self._latest_partial.get(utterance, 0):
+                self._counters['stale_partials'] += 1
+                return
+            self._latest_partial[utterance] = revision
+            if result['text']:
+                self._counters['partials'] += 1
+                self._emit(result)
+
+    def _deliver_final(self, result):
+        with self._lock:
+            self._pending_finals[result['utterance']] = result
+            while self._next_final in self._pending_finals:
+                final = self._pending_finals.pop(self._next_final)
+                self._latest_partial.pop(self._next_final, None)
+                self._next_final += 1
+                self._counters['finals'] += 1
+                self._emit(final)
+                self._captured_at.pop(final['utterance'], None)
+
+    def _emit(self, result):
+        """Deliver a result; called with the lock held so results keep their order."""
+        captured_at = self._captured_at.get(result['utterance'])
+        if result['text'] and captured_at is not None:
+            # First words of this utterance: measure capture-to-text latency once
+            self._first_word_latencies.append(self.clock() - captured_at)
+            self._captured_at[result['utterance']] = None
+        if self._results is not None:
+            self._results.put(result)
+        if self.on_result:
+            self.on_result(result)
+
+    def results(self, timeout=None):
+        """Yield results as they arrive until close() has delivered the last one."""
+        if self._results is None:
+            raise RuntimeError("results are delivered to on_result")
+        while True:
+            result = self._results.get(timeout=timeout)
+            if result is None:
+                return
+            yield result
+
+    def close(self):
+        """Finish the current utterance, wait for outstanding recognitions and end results()."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._utterance is not None:
+            self._finish_utterance()
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+        else:
+            with self._lock:
+                futures = list(self._futures)
+            wait(futures)
+        if self._results is not None:
+            self._results.put(None)
+
+    def stats(self):
+        """Result counters and capture-to-first-word latency statistics in seconds."""
+        with self._lock:
+            latencies = np.array(self._first_word_latencies)
+            counters = dict(self._counters)
+        if latencies.size:
+            counters['first_word_latency'] = {
+                'mean': float(latencies.mean()),
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'max': float(latencies.max())
+            }
+        else:
+            counters['first_word_latency'] = None
+        return counters
@@ -0,0 +1,299 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import speech_recognition as sr
+from . import config
+from .audio_capture import RingBufferCapture, detach
+from .audio_queue import BoundedAudioQueue
+from .nlp_processor import NLPProcessor
+from .partial_transcription import PartialTranscriber
+from .recognition_backends import get_shared_backend
+from .transcript_session import TranscriptSession
+
+class RealtimeSession(TranscriptSession):
+    """
+    One input stream served by a RealtimeEngine.
+
+    Offers the recording interface of RealtimeTranscriber (start_recording,
+    stop_recording, full_transcript, queue_stats). Its utterances are
+    recognized and analyzed on the engine's shared pools. Audio can come
+    from a device or file through RingBufferCapture, or be pushed with
+    submit() from any other source, such as a socket.
+
+    In low-latency mode the captured blocks go to a PartialTranscriber on
+    the engine's partial pool instead, and partial hypotheses are published
+    while an utterance is still being spoken.
+    """
+
+    def __init__(self, engine, session_id, analysis_interval=30, queue_size=None, queue_policy=None,
+                 device=None, input_stream_factory=None, segment_log=None, low_latency=False, on_result=None):
+        """
+        Args:
+            engine (RealtimeEngine): Engine whose pools serve this session
+            session_id (int): Identifier unique within the engine
+            analysis_interval (int): Seconds between interim analyses
+            queue_size (int): Utterances waiting for recognition before queue_policy applies
+            queue_policy (str): 'block', 'drop_oldest' or 'merge', see BoundedAudioQueue
+            device (int | str): Input device for live capture
+            input_stream_factory (callable): Input stream for capture, e.g. FileInputStream or PushInputStream
+            segment_log (bool | str): Append segments to a crash-safe log as they are recognized;
+                a path chooses the file, defaults to config.SEGMENT_LOG
+            low_latency (bool): Emit partial hypotheses while an utterance is still being spoken
+            on_result (callable): Called with each result dict, see PartialTranscriber
+        """
+        super().__init__(engine.backend, analysis_interval=analysis_interval, on_result=on_result,
+                         segment_log=segment_log, name=session_id, session=session_id)
+        self.engine = engine
+        self.session_id = session_id
+        self.transcript_queue = BoundedAudioQueue(maxsize=queue_size, policy=queue_policy)
+        self.device = device
+        self.input_stream_factory = input_stream_factory
+        self.low_latency = low_latency
+        self.partial_transcriber = None
+        self.capture = None
+        self.is_recording = False
+        self.next_analysis_time = None
+        self.analysis_future = None
+
+        # Numbered as the engine dequeues them, see TranscriptSession.release_result
+        self.dequeued = 0
+        self.in_flight = 0
+        self.idle = threading.Condition()
+
+    @property
+    def nlp_processor(self):
+        return self.engine.nlp_processor
+
+    def start_recording(self):
+        """Start capturing from the session's input stream."""
+        self._open_segment_log()
+        if self.low_latency:
+            self.partial_transcriber = PartialTranscriber(
+                self.backend,
+                executor=self.engine.partial_pool,
+                on_result=self.on_partial_result
+            )
+        self.capture = RingBufferCapture(
+            on_segment=None if self.low_latency else self.submit,
+            on_block=self.partial_transcriber.feed if self.low_latency else None,
+            device=self.device,
+            input_stream_factory=self.input_stream_factory
+        )
+        self.capture.start()
+        self.is_recording = True
+        self.next_analysis_time = time.time() + self.analysis_interval
+
+    def submit(self, audio):
+        """Queue an utterance (sr.AudioData) for recognition on the shared pool."""
+        self.transcript_queue.put(audio)
+        self.engine.schedule(self)
+
+    def push(self, pcm):
+        """Feed PCM to a session recording from a PushInputStream."""
+        self.capture.stream.push(pcm)
+
+    def wait_idle(self, timeout=None):
+        """Wait until every queued utterance has been recognized."""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.transcript_queue.empty() and self.in_flight == 0, timeout)
+
+    def stop_recording(self, timeout=30.0):
+        """Stop capturing, finish the queued utterances and return the final analysis."""
+        self.is_recording = False
+        if self.capture:
+            self.capture.stop()
+        if self.partial_transcriber:
+            self.partial_transcriber.close()
+        self.wait_idle(timeout)
+        if self.analysis_future:
+            self.analysis_future.result()
+        self.engine.close_session(self)
+        self._close_outputs()
+
+        self._save_final_transcript()
+        return self.engine.analysis_pool.submit(self._perform_analysis).result()
+
+    def queue_stats(self):
+        """Depth, drop and merge counters of the session's utterance queue."""
+        return self.transcript_queue.stats()
+
+    def release_result(self, sequence, text, captured_at=None, recognition_seconds=None, start=None, end=None):
+        """Release a result in order, see TranscriptSession.release_result, and mark it done."""
+        try:
+            super().release_result(sequence, text, captured_at, recognition_seconds, start, end)
+        finally:
+            with self.idle:
+                self.in_flight -= 1
+                self.idle.notify_all()
+
+class RealtimeEngine:
+    """
+    Process-wide realtime transcription for many concurrent input streams.
+
+    All sessions share one backend, a fixed pool of recognition threads, a
+    pool for the partial windows of low-latency sessions, a pool of analysis
+    threads and a single NLPProcessor. The thread count therefore does not
+    grow with the number of users.
+
+    Scheduling is round-robin over the sessions that have queued utterances,
+    taking one utterance per turn. A stream that floods its queue cannot
+    starve the others, and each session's own queue policy decides what
+    happens to its backlog.
+    """
+
+    def __init__(self, backend=None, recognition_workers=None, analysis_workers=None, nlp_processor=None):
+        """
+        Args:
+            backend (RecognizerBackend): Recognition engine shared by all sessions
+            recognition_workers (int): Utterances recognized concurrently across all sessions
+            analysis_workers (int): Analyses run concurrently across all sessions
+            nlp_processor (NLPProcessor): Shared processor, built on first use when omitted
+        """
+        self.backend = backend or get_shared_backend()
+        self._nlp_processor = nlp_processor
+        self._nlp_lock = threading.Lock()
+        self.sessions = {}
+        self._session_ids = itertools.count()
+
+        self._ready = deque()  # Sessions with queued utterances, in turn order
+        self._scheduled = set()
+        self._schedule_lock = threading.Condition()
+        self._running = True
+        self._stopped = threading.Event()
+
+        # Low-latency sessions recognize their partial windows and finals here
+        self.partial_pool = ThreadPoolExecutor(
+            max_workers=recognition_workers or config.ENGINE_RECOGNITION_WORKERS,
+            thread_name_prefix="EnginePartial"
+        )
+        self.analysis_pool = ThreadPoolExecutor(
+            max_workers=analysis_workers or config.ENGINE_ANALYSIS_WORKERS,
+            thread_name_prefix="EngineAnalysis"
+        )
+        self.workers = [
+            threading.Thread(target=self._recognize, name=f"EngineRecognition-{i}", daemon=True)
+            for i in range(recognition_workers or config.ENGINE_RECOGNITION_WORKERS)
+        ]
+        self.workers.append(threading.Thread(target=self._schedule_analyses, name="EngineAnalysisTimer", daemon=True))
+        for worker in self.workers:
+            worker.start()
+
+    @property
+    def nlp_processor(self):
+        with self._nlp_lock:
+            if self._nlp_processor is None:
+                self._nlp_processor = NLPProcessor()
+            return self._nlp_processor
+
+    def open_session(self, **options):
+        """Create a session; options are passed to RealtimeSession."""
+        session = RealtimeSession(self, next(self._session_ids), **options)
+        self.sessions[session.session_id] = session
+        return session
+
+    def close_session(self, session):
+        self.sessions.pop(session.session_id, None)
+
+    def schedule(self, session):
+        """Give a session with queued utterances a turn on the recognition pool."""
+        with self._schedule_lock:
+            if session.session_id not in self._scheduled:
+                self._scheduled.add(session.session_id)
+                self._ready.append(session)
+                self._schedule_lock.notify()
+
+    def _next_utterance(self):
+        """Take one utterance from the session whose turn it is, or None on shutdown."""
+        with self._schedule_lock:
+            while True:
+                self._schedule_lock.wait_for(lambda: self._ready or not self._running)
+                if not self._running:
+                    return None
+                session = self._ready.popleft()
+                with session.idle:
+                    try:
+                        audio = session.transcript_queue.get(timeout=0)
+                    except queue.Empty:
+                        audio = None  # Emptied by its queue policy since it was scheduled
+                    else:
+                        sequence = session.dequeued
+                        session.dequeued += 1
+                        session.in_flight += 1
+                if session.transcript_queue.empty():
+                    self._scheduled.discard(session.session_id)
+                else:
+                    self._ready.append(session)  # Back of the line
+                if audio is not None:
+                    return session, sequence, audio
+
+    def _recognize(self):
+        """Recognition worker shared by all sessions."""
+        while True:
+            job = self._next_utterance()
+            if job is None:
+                return
+            session, sequence, audio = job
+            text = None
+            captured_at, start, end = (getattr(audio, name, None) for name in ('captured_at', 'start', 'end'))
+            started = time.perf_counter()
+            try:
+                audio = detach(audio)  # Copy ring-buffer segments out before the ring wraps past them
+                if audio is None:
+                    continue  # Overwritten while queued; released below as an empty result
+                text = self.backend.transcribe(audio)
+            except sr.UnknownValueError:
+                pass  # Ignore unrecognized audio
+            except sr.RequestError as e:
+                print(f"Speech recognition service error: {e}")
+            except Exception as e:
+                print(f"Error processing audio: {e}")
+            finally:
+                session.release_result(sequence, text, captured_at, time.perf_counter() - started, start, end)
+
+    def _schedule_analyses(self):
+        """Submit interim analyses of recording sessions as their intervals elapse."""
+        while not self._stopped.wait(1):
+            now = time.time()
+            for session in list(self.sessions.values()):
+                if not session.is_recording or now < session.next_analysis_time:
+                    continue
+                if session.analysis_future and not session.analysis_future.done():
+                    continue  # Previous analysis of this session still running
+                session.next_analysis_time = now + session.analysis_interval
+                session.analysis_future = self.analysis_pool.submit(session.interim_analysis)
+
+    def stats(self):
+        """Engine-wide counters and the queue of every open session."""
+        with self._schedule_lock:
+            waiting = len(self._ready)
+        return {
+            'sessions': len(self.sessions),
+            'threads': len(self.workers),
+            'sessions_waiting': waiting,
+            'queues': {session_id: session.queue_stats() for session_id, session in list(self.sessions.items())}
+        }
+
+    def shutdown(self):
+        """Stop the shared pools; queued utterances are abandoned."""
+        with self._schedule_lock:
+            self._running = False
+            self._schedule_lock.notify_all()
+        self._stopped.set()
+        for worker in self.workers:
+            worker.join()
+        self.partial_pool.shutdown(wait=True)
+        self.analysis_pool.shutdown(wait=True)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine(**options):
+    """Return the process-wide RealtimeEngine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RealtimeEngine(**options)
+        return _engine
@@ -1,77 +1,155 @@
 import speech_recognition as sr
 import threading
-import queue
 import time
-from datetime import datetime
-import os
 from .nlp_processor import NLPProcessor
+from .audio_queue import BoundedAudioQueue
+from .partial_transcription import PartialTranscriber
+from .audio_capture import RingBufferCapture, detach
+from .recognition_backends import get_backend
+from .transcript_session import TranscriptSession
 from . import config
 
-class RealtimeTranscriber:
-    def __init__(self, device_index=None, analysis_interval=30):
+class RealtimeTranscriber(TranscriptSession):
+    def __init__(self, device_index=None, analysis_interval=30, backend=None, recognition_workers=None,
+                 queue_size=None, queue_policy=None, low_latency=False, on_result=None, capture=None,
+                 input_stream_factory=None, segment_log=None):
         """
         Initialize the transcriber with specific device settings.
         
         Args:
             device_index (int): Index of the microphone device to use
             analysis_interval (int): Seconds between NLP analyses
+            backend (RecognizerBackend): Recognition engine, defaults to config.RECOGNIZER_BACKEND
+            recognition_workers (int): Utterances recognized concurrently
+            queue_size (int): Utterances waiting for recognition before queue_policy applies
+            queue_policy (str): 'block', 'drop_oldest' or 'merge', see BoundedAudioQueue
+            low_latency (bool): Emit partial hypotheses while an utterance is still being spoken
+            on_result (callable): Called with each result dict, see PartialTranscriber
+            capture (str): 'ring' for RingBufferCapture or 'listen' for recognizer.listen,
+                defaults to config.REALTIME_CAPTURE
+            input_stream_factory (callable): Input stream for ring capture, e.g. FileInputStream
+            segment_log (bool | str): Append segments to a crash-safe log as they are recognized;
+                a path chooses the file, defaults to config.SEGMENT_LOG
         """
         self.recognizer = sr.Recognizer()
-        try:
-            self.microphone = sr.Microphone(device_index=device_index)
-            # Test microphone initialization
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-        except Exception as e:
-            raise Exception(f"Error initializing microphone: {e}")
+        super().__init__(backend or get_backend(recognizer=self.recognizer), analysis_interval=analysis_interval,
+                         on_result=on_result, segment_log=segment_log)
+        self.device_index = device_index
+        self.capture_mode = capture or config.REALTIME_CAPTURE
+        self.input_stream_factory = input_stream_factory
+        self.capture = None
+        self.microphone = None
+        if self.capture_mode == 'listen':
+            try:
+                self.microphone = sr.Microphone(device_index=device_index)
+                # Test microphone initialization
+                with self.microphone as source:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            except Exception as e:
+                raise Exception(f"Error initializing microphone: {e}")
             
-        self.nlp_processor = NLPProcessor()
-        self.transcript_queue = queue.Queue()
+        self._nlp_processor = None  # Built on first analysis
+        self.transcript_queue = BoundedAudioQueue(maxsize=queue_size, policy=queue_policy)
         self.is_recording = False
-        self.analysis_interval = analysis_interval
-        self.full_transcript = []
         self.threads = []
+        self.recognition_workers = recognition_workers or config.REALTIME_RECOGNITION_WORKERS
+        self.workers = []
+        self.low_latency = low_latency
+        self.partial_transcriber = None
+        
+        # Utterances are numbered as they leave the queue, see TranscriptSession.release_result
+        self._dequeue_lock = threading.Lock()
+        self._dequeued = 0
+    
+    @property
+    def nlp_processor(self):
+        if self._nlp_processor is None:
+            self._nlp_processor = NLPProcessor()
+        return self._nlp_processor
     
     def start_recording(self):
         """Start real-time recording and transcription."""
         print("Initializing recording...")
         
-        try:
-            with self.microphone as source:
-                print("Calibrating for ambient noise... Please wait.")
-                self.recognizer.adjust_for_ambient_noise(source, duration=2)
-                print("Calibration complete.")
-        except Exception as e:
-            raise Exception(f"Error during calibration: {e}")
+        if self.microphone is not None:
+            try:
+                with self.microphone as source:
+                    print("Calibrating for ambient noise... Please wait.")
+                    self.recognizer.adjust_for_ambient_noise(source, duration=2)
+                    print("Calibration complete.")
+            except Exception as e:
+                raise Exception(f"Error during calibration: {e}")
         
         self.is_recording = True
+        self._open_segment_log()
         
-        # Create and start threads
-        self.threads = [
-            threading.Thread(target=self._record_audio, name="RecordingThread"),
-            threading.Thread(target=self._process_queue, name="ProcessingThread"),
-            threading.Thread(target=self._periodic_analysis, name="AnalysisThread")
-        ]
+        if self.low_latency:
+            self.partial_transcriber = PartialTranscriber(
+                self.backend,
+                sample_rate=self.microphone.SAMPLE_RATE if self.microphone else config.SAMPLE_RATE,
+                sample_width=self.microphone.SAMPLE_WIDTH if self.microphone else 2,
+                energy_threshold=self.recognizer.energy_threshold,
+                workers=self.recognition_workers,
+                on_result=self.on_partial_result
+            )
+        else:
+            self._start_recognition_workers()
+        
+        # Create and start threads; ring capture is driven by the input stream callback
+        self.threads = [threading.Thread(target=self._periodic_analysis, name="AnalysisThread")]
+        if self.capture_mode == 'listen':
+            recorder = self._record_stream if self.low_latency else self._record_audio
+            self.threads.append(threading.Thread(target=recorder, name="RecordingThread"))
         
         for thread in self.threads:
             thread.daemon = True  # Make threads daemon so they exit when main program exits
             thread.start()
         
+        if self.capture_mode == 'ring':
+            self.capture = RingBufferCapture(
+                on_segment=None if self.low_latency else self.transcript_queue.put,
+                on_block=self.partial_transcriber.feed if self.low_latency else None,
+                device=self.device_index,
+                input_stream_factory=self.input_stream_factory
+            )
+            self.capture.start()
+        
         print("Recording started successfully.")
     
-    def stop_recording(self):
-        """Stop recording and perform final analysis."""
+    def stop_recording(self, finalize=True):
+        """
+        Stop recording and perform final analysis.
+        
+        Args:
+            finalize (bool): Save the transcript and analyze it; False just drains the pipeline
+        """
         print("Stopping recording...")
         self.is_recording = False
         
+        # Stopping the capture hands over the utterance still in progress
+        if self.capture:
+            self.capture.stop()
+        
         # Wait for threads to complete with timeout
         for thread in self.threads:
             thread.join(timeout=5.0)
+        if self.partial_transcriber:
+            self.partial_transcriber.close()
+        else:
+            self._stop_recognition_workers()
+        self._close_outputs()
+        
+        if not finalize:
+            return None
         
         # Perform final analysis
         self._save_final_transcript()
         return self._perform_analysis()
     
+    def queue_stats(self):
+        """Depth, drop and merge counters of the utterance queue."""
+        return self.transcript_queue.stats()
+    
     def _record_audio(self):
         """Continuously record audio in chunks."""
         print("Starting audio recording...")
@@ -80,6 +158,7 @@ class RealtimeTranscriber:
             while self.is_recording:
                 try:
                     audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=30)
+                    audio.captured_at = time.perf_counter()
                     self.transcript_queue.put(audio)
                 except sr.WaitTimeoutError:
                     continue
@@ -88,27 +167,62 @@ class RealtimeTranscriber:
                     if self.is_recording:  # Only break if we're supposed to be recording
                         break
     
+    def _record_stream(self):
+        """Feed raw microphone chunks to the partial transcriber (low-latency mode)."""
+        print("Starting low-latency audio recording...")
+        
+        with self.microphone as source:
+            while self.is_recording:
+                try:
+                    self.partial_transcriber.feed(source.stream.read(source.CHUNK))
+                except Exception as e:
+                    print(f"Error recording audio: {e}")
+                    break
+    
+    def _start_recognition_workers(self):
+        """Start the threads that recognize queued utterances."""
+        self.workers = [
+            threading.Thread(target=self._process_queue, name=f"RecognitionThread-{i}", daemon=True)
+            for i in range(self.recognition_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+    
+    def _stop_recognition_workers(self, timeout=30.0):
+        """Let the workers finish the queued utterances, then stop them."""
+        for _ in self.workers:
+            self.transcript_queue.put(None)
+        deadline = time.time() + timeout
+        for worker in self.workers:
+            worker.join(timeout=max(0.0, deadline - time.time()))
+        self.workers = []
+    
     def _process_queue(self):
-        """Process audio chunks from queue."""
-        while self.is_recording or not self.transcript_queue.empty():
+        """Recognition worker: transcribe utterances from the queue until it receives None."""
+        while True:
+            with self._dequeue_lock:
+                audio = self.transcript_queue.get()
+                if audio is None:
+                    return
+                sequence = self._dequeued
+                self._dequeued += 1
+            
+            text = None
+            captured_at, start, end = (getattr(audio, name, None) for name in ('captured_at', 'start', 'end'))
+            started = time.perf_counter()
             try:
-                if not self.transcript_queue.empty():
-                    audio = self.transcript_queue.get(timeout=1)  # 1 second timeout
-                    try:
-                        text = self.recognizer.recognize_google(audio)
-                        if text.strip():  # Only add non-empty transcriptions
-                            self.full_transcript.append(text)
-                            print(f"Transcribed: {text}")
-                    except sr.UnknownValueError:
-                        pass  # Ignore unrecognized audio
-                    except sr.RequestError as e:
-                        print(f"Speech recognition service error: {e}")
-                else:
-                    time.sleep(0.1)
-            except queue.Empty:
-                continue
+                audio = detach(audio)  # Copy ring-buffer segments out before the ring wraps past them
+                if audio is None:
+                    continue  # Overwritten while queued; released below as an empty result
+                text = self.backend.transcribe(audio)
+            except sr.UnknownValueError:
+                pass  # Ignore unrecognized audio
+            except sr.RequestError as e:
+                print(f"Speech recognition service error: {e}")
             except Exception as e:
                 print(f"Error processing audio: {e}")
+            finally:
+                self.release_result(sequence, text, captured_at, time.perf_counter() - started, start, end)
     
     def _periodic_analysis(self):
         """Perform periodic NLP analysis on accumulated transcript."""
@@ -117,41 +231,9 @@ class RealtimeTranscriber:
         while self.is_recording:
             current_time = time.time()
             if current_time - last_analysis_time >= self.analysis_interval:
-                analysis = self._perform_analysis()
+                analysis = self.interim_analysis()
                 if analysis:
                     print("\nInterim Analysis:")
                     print(f"Sentiment: {analysis['sentiment']['sentiment']}")
                 last_analysis_time = current_time
             time.sleep(1)
-    
-    def _perform_analysis(self):
-        """Perform NLP analysis on current transcript."""
-        if not self.full_transcript:
-            return None
-            
-        full_text = " ".join(self.full_transcript)
-        try:
-            analysis_result, _ = self.nlp_processor.analyze_text(
-                full_text,
-                output_dir=os.path.join(config.PROCESSED_DATA_DIR, 'realtime_analysis')
-            )
-            return analysis_result
-        except Exception as e:
-            print(f"Error performing analysis: {e}")
-            return None
-    
-    def _save_final_transcript(self):
-        """Save the complete transcript to a file."""
-        if not self.full_transcript:
-            return
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"realtime_transcript_{timestamp}.txt"
-        filepath = os.path.join(config.TRANSCRIPTIONS_DIR, filename)
-        
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("\n".join(self.full_transcript))
-            print(f"Full transcript saved to: {filepath}")
-        except Exception as e:
-            print(f"Error saving transcript: {e}")
\ No newline at end of file
@@ -0,0 +1,236 @@
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+from . import config
+
+class RecognizerBackend(ABC):
+    """
+    Interface shared by all speech recognition engines.
+    
+    transcribe() returns the text of one utterance and raises
+    sr.UnknownValueError when nothing intelligible was said or sr.RequestError
+    when the engine itself failed, matching speech_recognition's conventions.
+    """
+    
+    name = None
+    
+    @abstractmethod
+    def transcribe(self, audio):
+        """Transcribe one sr.AudioData utterance and return its text."""
+    
+    def transcribe_batch(self, audios):
+        """
+        Transcribe several utterances.
+        
+        Returns:
+            list: One result dict per utterance, in input order
+        """
+        results = []
+        for audio in audios:
+            try:
+                results.append({"success": True, "text": self.transcribe(audio)})
+            except sr.UnknownValueError:
+                results.append({"success": False, "error": "Speech recognition could not understand the audio"})
+            except sr.RequestError as e:
+                results.append({"success": False, "error": f"Could not request results from service; {str(e)}"})
+        return results
+    
+    def settings(self):
+        """Describe the backend and the options that affect its output."""
+        return {'backend': self.name}
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API through speech_recognition."""
+    
+    name = 'google'
+    
+    def __init__(self, recognizer=None, language='en-US', key=None):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+        self.key = key
+    
+    def transcribe(self, audio):
+        return self.recognizer.recognize_google(audio, key=self.key, language=self.language)
+    
+    def settings(self):
+        return {'backend': self.name, 'language': self.language}
+
+class WhisperBackend(RecognizerBackend):
+    """Local Whisper model on the CPU; the model is loaded once per backend."""
+    
+    name = 'whisper'
+    
+    def __init__(self, model='base', language='en', device='cpu'):
+        # Imported here so torch is only loaded when Whisper is actually selected
+        import whisper
+        
+        self.model_name = model
+        self.language = language
+        self.model = whisper.load_model(model, device=device)
+    
+    def transcribe(self, audio):
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        try:
+            result = self.model.transcribe(samples.astype(np.float32) / 32768.0, language=self.language, fp16=False)
+        except Exception as e:
+            raise sr.RequestError(f"Whisper transcription failed: {e}")
+        text = result['text'].strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+    
+    def settings(self):
+        return {'backend': self.name, 'model': self.model_name, 'language': self.language}
+
+class VoskBackend(RecognizerBackend):
+    """Offline Kaldi recognition through Vosk; the model is loaded once per backend."""
+    
+    name = 'vosk'
+    SAMPLE_RATE = 16000
+    
+    def __init__(self, model_path='model'):
+        # Imported here because Vosk is an optional engine
+        import vosk
+        
+        self.vosk = vosk
+        self.model_path = model_path
+        self.model = vosk.Model(model_path)
+    
+    def transcribe(self, audio):
+        recognizer = self.vosk.KaldiRecognizer(self.model, self.SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get('text', '').strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+    
+    def settings(self):
+        return {'backend': self.name, 'model_path': self.model_path}
+
+class HttpBackend(RecognizerBackend):
+    """
+    HTTP recognition service through the pooled, retrying RecognitionClient.
+    
+    The client runs on its own event loop thread, so calls from many
+    recognition threads share one connection pool and run concurrently.
+    """
+    
+    name = 'http'
+    
+    def __init__(self, url, **client_options):
+        from .recognition_client import ClientLoop, RecognitionClient
+        
+        self.url = url
+        self.client = RecognitionClient(url, **client_options)
+        self._loop = ClientLoop(self.client)
+    
+    def transcribe(self, audio):
+        return self._loop.run(self.client.recognize(audio))
+    
+    def transcribe_batch(self, audios):
+        return self._loop.run(self.client.recognize_many(audios))
+    
+    def stats(self):
+        """Request, retry and throughput counters of the underlying client."""
+        return self.client.stats()
+    
+    def close(self):
+        self._loop.close()
+    
+    def settings(self):
+        return {'backend': self.name, 'url': self.url}
+
+class FakeBackend(RecognizerBackend):
+    """
+    Deterministic offline backend for tests, benchmarks and load runs.
+    
+    The transcript is derived from a hash of the audio, so the same audio
+    always yields the same words. Latency is simulated as a fixed delay
+    plus a delay proportional to the audio duration.
+    """
+    
+    name = 'fake'
+    WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel',
+             'india', 'juliet', 'kilo', 'lima', 'mike', 'november', 'oscar', 'papa']
+    
+    def __init__(self, latency=0.0, realtime_factor=0.0, words_per_second=2.0, text=None):
+        """
+        Args:
+            latency (float): Seconds added to every call
+            realtime_factor (float): Seconds added per second of audio
+            words_per_second (float): Length of the generated transcript
+            text (str): Fixed transcript to return instead of generated words
+        """
+        self.latency = latency
+        self.realtime_factor = realtime_factor
+        self.words_per_second = words_per_second
+        self.text = text
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def transcribe(self, audio):
+        frame_data = audio.frame_data
+        duration = len(frame_data) / (audio.sample_rate * audio.sample_width)
+        delay = self.latency + self.realtime_factor * duration
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.calls += 1
+        
+        if not any(frame_data):
+            raise sr.UnknownValueError()
+        if self.text is not None:
+            return self.text
+        
+        digest = hashlib.sha256(frame_data).digest()
+        count = max(1, int(round(duration * self.words_per_second)))
+        return " ".join(self.WORDS[digest[i % len(digest)] % len(self.WORDS)] for i in range(count))
+    
+    def settings(self):
+        return {'backend': self.name, 'text': self.text, 'words_per_second': self.words_per_second}
+
+BACKENDS = {
+    'google': GoogleBackend,
+    'whisper': WhisperBackend,
+    'vosk': VoskBackend,
+    'http': HttpBackend,
+    'fake': FakeBackend
+}
+
+def get_backend(name=None, recognizer=None, **options):
+    """
+    Create a recognizer backend.
+    
+    Args:
+        name (str): Backend name, defaults to config.RECOGNIZER_BACKEND
+        recognizer (sr.Recognizer): Recognizer reused by backends built on speech_recognition
+        **options: Backend options, defaulting to config.RECOGNIZER_OPTIONS[name]
+    """
+    name = name or config.RECOGNIZER_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown recognizer backend '{name}'. Available backends are: {list(BACKENDS)}")
+    
+    options = {**config.RECOGNIZER_OPTIONS.get(name, {}), **options}
+    if name == 'google':
+        options['recognizer'] = recognizer
+    return BACKENDS[name](**options)
+
+_shared_backends = {}
+_shared_lock = threading.Lock()
+
+def get_shared_backend(name=None):
+    """
+    Return the process-wide backend of a name, creating it on first use.
+    
+    Backends that load a model (whisper, vosk) load it once per process
+    this way, however many handlers use them.
+    """
+    name = name or config.RECOGNIZER_BACKEND
+    with _shared_lock:
+        if name not in _shared_backends:
+            _shared_backends[name] = get_backend(name)
+        return _shared_backends[name]
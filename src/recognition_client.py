@@ -0,0 +1,235 @@
+import asyncio
+import random
+import threading
+import time
+import httpx
+import speech_recognition as sr
+from . import config
+
+class RecognitionClient:
+    """
+    Asyncio client for HTTP speech recognition services.
+
+    The service receives a WAV body in a POST request and answers with JSON
+    containing a "text" field. Requests share a pool of keep-alive connections
+    and at most `concurrency` of them are in flight at once. Failed attempts
+    (transport errors, timeouts, 429 and 5xx responses) are retried with
+    jittered exponential backoff until the per-job time budget runs out.
+    """
+
+    RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(self, url, concurrency=None, budget=None, request_timeout=None, max_attempts=None,
+                 backoff_base=None, backoff_max=None, headers=None, transport=None):
+        """
+        Args:
+            url (str): Recognition endpoint
+            concurrency (int): Requests in flight at once
+            budget (float): Seconds one job may spend across all its attempts
+            request_timeout (float): Seconds allowed for a single attempt
+            max_attempts (int): Attempts per job, including the first
+            backoff_base (float): Upper bound of the first retry delay
+            backoff_max (float): Upper bound of any retry delay
+            headers (dict): Extra request headers, e.g. authorization
+            transport (httpx.AsyncBaseTransport): Custom transport, mainly for tests
+        """
+        self.url = url
+        self.concurrency = concurrency or config.RECOGNITION_CONCURRENCY
+        self.budget = budget or config.RECOGNITION_BUDGET
+        self.request_timeout = request_timeout or config.RECOGNITION_REQUEST_TIMEOUT
+        self.max_attempts = max_attempts or config.RECOGNITION_MAX_ATTEMPTS
+        self.backoff_base = backoff_base if backoff_base is not None else config.RECOGNITION_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else config.RECOGNITION_BACKOFF_MAX
+        self.headers = headers or {}
+        self.transport = transport
+
+        self._client = None
+        self._semaphore = None
+        self._counters = {'requests': 0, 'retries': 0, 'succeeded': 0, 'failed': 0, 'bytes_sent': 0}
+        # Throughput is measured over the time at least one job was in progress
+        self._active_jobs = 0
+        self._busy_since = None
+        self._busy_seconds = 0.0
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        """Create the connection pool; must run inside the event loop that will use it."""
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            self._client = httpx.AsyncClient(
+                limits=limits,
+                timeout=self.request_timeout,
+                headers=self.headers,
+                transport=self.transport
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def recognize(self, audio):
+        """
+        Transcribe one utterance.
+
+        Args:
+            audio (sr.AudioData | bytes): Utterance, or a complete WAV file as bytes
+
+        Returns:
+            str: Recognized text
+
+        Raises:
+            sr.UnknownValueError: The service heard no speech
+            sr.RequestError: The job failed permanently or ran out of budget
+        """
+        await self.open()
+        body = audio.get_wav_data() if isinstance(audio, sr.AudioData) else bytes(audio)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.budget
+        if self._active_jobs == 0:
+            self._busy_since = time.perf_counter()
+        self._active_jobs += 1
+        try:
+            return await self._attempts(body, loop, deadline)
+        finally:
+            self._active_jobs -= 1
+            if self._active_jobs == 0:
+                self._busy_seconds += time.perf_counter() - self._busy_since
+                self._busy_since = None
+
+    async def _attempts(self, body, loop, deadline):
+        """Send a job until it succeeds, fails permanently or runs out of budget."""
+        for attempt in range(self.max_attempts):
+            retry_after = None
+            response = None
+            # The slot is held per attempt, so jobs waiting out a backoff don't block others.
+            # Time spent queueing for a slot is charged to the job's budget, and the wait
+            # ends as soon as the budget does.
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                self._counters['failed'] += 1
+                raise sr.RequestError(f"recognition budget ran out waiting for a connection after {attempt} attempts")
+            try:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self._counters['failed'] += 1
+                    raise sr.RequestError(f"recognition budget ran out waiting for a connection after {attempt} attempts")
+                self._counters['requests'] += 1
+                self._counters['bytes_sent'] += len(body)
+                try:
+                    response = await self._client.post(
+                        self.url,
+                        content=body,
+                        headers={'Content-Type': 'audio/wav'},
+                        timeout=min(self.request_timeout, remaining)
+                    )
+                except httpx.TransportError as e:
+                    error = f"{type(e).__name__}: {e}"
+            finally:
+                self._semaphore.release()
+
+            if response is not None:
+                if response.status_code not in self.RETRY_STATUSES:
+                    return self._parse(response)
+                error = f"HTTP {response.status_code}"
+                retry_after = self._retry_after(response)
+
+            delay = self.backoff_delay(attempt)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if attempt + 1 == self.max_attempts or loop.time() + delay >= deadline:
+                self._counters['failed'] += 1
+                raise sr.RequestError(f"recognition failed after {attempt + 1} attempts; {error}")
+            self._counters['retries'] += 1
+            await asyncio.sleep(delay)
+
+    def _parse(self, response):
+        """Turn a final (non-retryable) response into text or a recognition error."""
+        if response.status_code >= 400:
+            self._counters['failed'] += 1
+            raise sr.RequestError(f"recognition request rejected; HTTP {response.status_code}")
+        try:
+            text = response.json().get('text', '').strip()
+        except ValueError:
+            self._counters['failed'] += 1
+            raise sr.RequestError("recognition service returned invalid JSON")
+        self._counters['succeeded'] += 1
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    @staticmethod
+    def _retry_after(response):
+        """Seconds requested by a Retry-After header, if it holds a number."""
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            return None
+
+    async def recognize_many(self, audios):
+        """
+        Transcribe many utterances concurrently.
+
+        Returns:
+            list: One result dict per utterance, in input order
+        """
+        async def job(audio):
+            try:
+                return {"success": True, "text": await self.recognize(audio)}
+            except sr.UnknownValueError:
+                return {"success": False, "error": "Speech recognition could not understand the audio"}
+            except sr.RequestError as e:
+                return {"success": False, "error": f"Could not request results from service; {str(e)}"}
+
+        return await asyncio.gather(*(job(audio) for audio in audios))
+
+    def stats(self):
+        """Return request, retry and failure counters plus completed jobs per busy second."""
+        elapsed = self._busy_seconds
+        if self._busy_since is not None:
+            elapsed += time.perf_counter() - self._busy_since
+        return {
+            **self._counters,
+            'elapsed': elapsed,
+            'throughput': self._counters['succeeded'] / elapsed if elapsed > 0 else 0.0
+        }
+
+class ClientLoop:
+    """
+    Run a RecognitionClient on a private event loop thread.
+
+    This lets synchronous callers, such as the recognition threads of
+    SpeechHandler, share one connection pool and have their requests
+    pipelined onto the same loop.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self.run(client.open())
+
+    def run(self, coroutine):
+        """Run a coroutine on the loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        """Close the client and stop the loop thread."""
+        self.run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
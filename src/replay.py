@@ -0,0 +1,102 @@
+import argparse
+import functools
+import json
+import threading
+import time
+import numpy as np
+import soundfile as sf
+from .audio_capture import FileInputStream
+from .realtime_transcription import RealtimeTranscriber
+from .recognition_backends import get_backend
+
+def latency_percentiles(latencies):
+    """Summarise latencies in seconds as mean, percentiles and max."""
+    if not len(latencies):
+        return None
+    latencies = np.asarray(latencies)
+    summary = {'mean': float(latencies.mean())}
+    for percentile in (50, 90, 95, 99):
+        summary[f'p{percentile}'] = float(np.percentile(latencies, percentile))
+    summary['max'] = float(latencies.max())
+    return summary
+
+def replay(wav_path, speed=1.0, backend=None, sample_interval=0.1, timeout=None, **transcriber_options):
+    """
+    Stream a WAV file through RealtimeTranscriber as if it were a microphone.
+
+    Args:
+        wav_path (str): Recording to replay
+        speed (float): Replay speed; 1.0 is real time and 0 is as fast as possible
+        backend (RecognizerBackend): Recognition engine, defaults to config.RECOGNIZER_BACKEND
+        sample_interval (float): Seconds between queue depth samples
+        timeout (float): Give up waiting for the file after this many seconds
+        **transcriber_options: Passed to RealtimeTranscriber, e.g. recognition_workers or queue_policy
+
+    Returns:
+        dict: End-to-end latency percentiles, queue depth over time, real-time
+        factor and the transcript of the run. The real-time factor is the
+        recognizer's busy time per second of audio, so it does not depend on
+        the replay speed. timed_out is set when the file had not finished
+        playing after `timeout` seconds; the report then covers only part of it.
+    """
+    audio_seconds = sf.info(wav_path).duration
+    transcriber_options.setdefault('segment_log', False)
+    transcriber = RealtimeTranscriber(
+        backend=backend,
+        capture='ring',
+        input_stream_factory=functools.partial(FileInputStream, wav_path, speed=speed),
+        **transcriber_options
+    )
+
+    depth = []
+    sampling = threading.Event()
+    started = time.perf_counter()
+
+    def sample_queue():
+        while not sampling.wait(sample_interval):
+            depth.append((round(time.perf_counter() - started, 3), transcriber.transcript_queue.qsize()))
+
+    sampler = threading.Thread(target=sample_queue, name="QueueDepthSampler", daemon=True)
+    sampler.start()
+    transcriber.start_recording()
+    finished = transcriber.capture.wait(timeout)
+    transcriber.stop_recording(finalize=False)
+    wall_seconds = time.perf_counter() - started
+    sampling.set()
+    sampler.join()
+
+    return {
+        'audio_seconds': audio_seconds,
+        'wall_seconds': wall_seconds,
+        'speed': speed,
+        'timed_out': not finished,
+        'real_time_factor': transcriber.recognition_time / audio_seconds if audio_seconds else None,
+        'utterances': len(transcriber.latencies),
+        'latency': latency_percentiles(transcriber.latencies),
+        'queue_depth': depth,
+        'max_queue_depth': max((d for _, d in depth), default=0),
+        'queue': transcriber.queue_stats(),
+        'capture': transcriber.capture.stats(),
+        'transcript': list(transcriber.full_transcript)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a WAV file through the realtime transcriber")
+    parser.add_argument('wav_file')
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay speed, 0 for as fast as possible")
+    parser.add_argument('--backend', default=None, help="Recognizer backend, e.g. 'fake'")
+    parser.add_argument('--workers', type=int, default=None, help="Recognition workers")
+    args = parser.parse_args()
+
+    report = replay(
+        args.wav_file,
+        speed=args.speed,
+        backend=get_backend(args.backend) if args.backend else None,
+        recognition_workers=args.workers
+    )
+    print(json.dumps(report, indent=2))
+    if report['timed_out']:
+        parser.exit(1, "Replay timed out before the end of the file\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from . import config
+
+class SegmentLog:
+    """
+    Append-only JSONL log of the segments of one realtime session.
+
+    The first line describes the session, each following line is one
+    recognized segment, and a clean close appends an 'end' line. Lines are
+    flushed as they are written, so other processes can read the log while
+    recording continues, and fsynced in batches, after fsync_batch segments
+    or fsync_interval seconds, whichever comes first. A timer enforces the
+    interval even when no further segment arrives. A log without an 'end'
+    line belongs to a session that crashed; recover() rebuilds its transcript.
+    """
+
+    def __init__(self, path, fsync_interval=None, fsync_batch=None, **session_fields):
+        """
+        Args:
+            path (str): Log file, created or appended to
+            fsync_interval (float): Longest time a written segment may go without an fsync
+            fsync_batch (int): Segments written between fsyncs at most
+            **session_fields: Extra fields for the session line, e.g. backend
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval if fsync_interval is not None else config.SEGMENT_LOG_FSYNC_INTERVAL
+        self.fsync_batch = fsync_batch or config.SEGMENT_LOG_FSYNC_BATCH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._timer = None  # Pending interval fsync of the unsynced segments
+        self.segments = 0
+        self.fsyncs = 0
+        self._write({'type': 'session', 'started': time.time(), **session_fields})
+        self._sync()
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.fsyncs += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _timed_sync(self):
+        """Timer callback: fsync segments that have waited fsync_interval."""
+        with self._lock:
+            self._timer = None
+            if self._file is not None and self._unsynced:
+                self._sync()
+
+    def append(self, sequence, text, **timings):
+        """
+        Write one recognized segment.
+
+        Args:
+            sequence (int): Position of the segment in the transcript
+            text (str): Recognized text
+            **timings: Recognizer timings in seconds, e.g. recognition_seconds or latency
+        """
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"Segment log {self.path} is closed")
+            self._write({'type': 'segment', 'sequence': sequence, 'time': time.time(), 'text': text, **timings})
+            self.segments += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.fsync_interval, self._timed_sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def close(self):
+        """Mark the session complete and make the log durable."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._write({'type': 'end', 'time': time.time(), 'segments': self.segments})
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @staticmethod
+    def read(path):
+        """
+        Read the records of a log, also while it is being written.
+
+        A final line cut short by a crash or an in-progress write is skipped.
+        """
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Torn or still being written
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
+    @classmethod
+    def recover(cls, path):
+        """
+        Rebuild a session from its log.
+
+        Returns:
+            dict: The session line, segments in sequence order, the transcript
+            and whether the session ended cleanly
+        """
+        records = cls.read(path)
+        segments = sorted((r for r in records if r.get('type') == 'segment'), key=lambda r: r['sequence'])
+        return {
+            'session': next((r for r in records if r.get('type') == 'session'), None),
+            'segments': segments,
+            'transcript': [segment['text'] for segment in segments],
+            'complete': any(r.get('type') == 'end' for r in records)
+        }
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
+import librosa
+from . import config
+from .decoded_audio_store import DecodedAudioStore
+
+class SpectrogramTileStore:
+    """
+    Compute spectrograms once per file and serve them from cached tiles.
+    
+    The STFT is computed tile by tile over the memory-mapped decode, so
+    memory stays bounded on long inputs. Each tile is stored as uint8 dB
+    values relative to the tile's own peak; assembling a view rescales the
+    tiles to the file's peak, matching amplitude_to_db(..., ref=np.max) to
+    within one quantisation step. Tiles are keyed by the source file hash
+    and the STFT parameters. Once the cache exceeds max_bytes, the tiles of
+    the least recently viewed files are evicted; an index's mtime records
+    its last access.
+    """
+    
+    DB_RANGE = 120.0  # Dynamic range kept per tile; quantisation step is DB_RANGE / 255
+    AMIN = 1e-5
+    
+    def __init__(self, directory=None, audio_store=None, sr=22050, n_fft=2048, hop_length=512, max_bytes=None):
+        self.directory = directory or os.path.join(config.CACHE_DIR, 'spectrograms')
+        self.max_bytes = max_bytes or config.SPECTROGRAM_CACHE_MAX_BYTES
+        self.audio_store = audio_store or DecodedAudioStore()
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.tile_frames = config.SPECTROGRAM_TILE_FRAMES
+        self._file_hashes = {}
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _file_hash(self, file_path):
+        """Content hash of a file, remembered while its mtime and size are unchanged."""
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        if memo_key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            self._file_hashes[memo_key] = digest.hexdigest()
+        return self._file_hashes[memo_key]
+    
+    def _base_path(self, file_path):
+        """Path prefix shared by the index and tiles of a file and parameter set."""
+        params = f"{self.sr}:{self.n_fft}:{self.hop_length}:{self.tile_frames}"
+        key = hashlib.sha1(f"{self._file_hash(file_path)}:{params}".encode()).hexdigest()
+        return os.path.join(self.directory, key)
+    
+    def get_index(self, file_path):
+        """Return the tile index of a file, computing the tiles on first use."""
+        base = self._base_path(file_path)
+        index_path = f"{base}.json"
+        if os.path.exists(index_path):
+            os.utime(index_path)  # Mark as recently used
+        else:
+            self._compute_tiles(file_path, base)
+            self._evict(keep=os.path.basename(base))
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _evict(self, keep=None):
+        """Remove the tiles of least recently viewed files until the cache fits in max_bytes."""
+        entries = {}
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp'):
+                continue
+            key = name.split('.')[0].split('_')[0]
+            path = os.path.join(self.directory, name)
+            try:
+                size = os.path.getsize(path)
+                last_access = os.path.getmtime(path) if name.endswith('.json') else None
+            except OSError:
+                continue  # Removed by another process meanwhile
+            entry = entries.setdefault(key, {'size': 0, 'last_access': 0.0, 'paths': []})
+            entry['size'] += size
+            entry['paths'].append(path)
+            if last_access is not None:
+                entry['last_access'] = last_access
+        
+        total = sum(entry['size'] for entry in entries.values())
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            # The index goes first, so a half-evicted entry is recomputed rather than read
+            for path in sorted(entry['paths'], key=lambda path: not path.endswith('.json')):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= entry['size']
+    
+    def _compute_tiles(self, file_path, base):
+        """Compute and store every tile of a file, then write its index."""
+        y, _ = self.audio_store.load(file_path, self.sr)
+        total_frames = 1 + len(y) // self.hop_length
+        tile_peaks = []
+        
+        for tile, first in enumerate(range(0, total_frames, self.tile_frames)):
+            frames = min(self.tile_frames, total_frames - first)
+            db = self._tile_db(y, first, frames)
+            peak = float(db.max())
+            quantised = np.clip(np.rint((peak - db) * 255 / self.DB_RANGE), 0, 255).astype(np.uint8)
+            self._save_atomic(f"{base}_{tile}.npy", quantised)
+            tile_peaks.append(peak)
+        
+        index = {
+            'sr': self.sr,
+            'n_fft': self.n_fft,
+            'hop_length': self.hop_length,
+            'tile_frames': self.tile_frames,
+            'total_frames': total_frames,
+            'tile_peaks': tile_peaks,
+            'peak_db': max(tile_peaks)
+        }
+        tmp_path = f"{base}.json.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, f"{base}.json")
+    
+    def _tile_db(self, y, first, frames):
+        """
+        Absolute dB magnitudes of STFT frames [first, first + frames).
+        
+        Reproduces librosa.stft(center=True) by slicing the samples each frame
+        needs, zero-padded at the file edges like librosa's constant padding.
+        """
+        half = self.n_fft // 2
+        start = first * self.hop_length - half
+        stop = (first + frames - 1) * self.hop_length + half
+        segment = np.zeros(stop - start, dtype=np.float32)
+        lo, hi = max(start, 0), min(stop, len(y))
+        if hi > lo:
+            segment[lo - start:hi - start] = y[lo:hi]
+        
+        magnitude = np.abs(librosa.stft(segment, n_fft=self.n_fft, hop_length=self.hop_length, center=False))
+        return 20.0 * np.log10(np.maximum(magnitude, self.AMIN))
+    
+    @staticmethod
+    def _save_atomic(path, array):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    
+    def assemble(self, file_path, start=0.0, end=None, max_columns=None, top_db=80.0):
+        """
+        Assemble the dB spectrogram of a time range from cached tiles.
+        
+        Args:
+            file_path (str): Audio file
+            start (float): Range start in seconds
+            end (float): Range end in seconds, defaults to the end of the file
+            max_columns (int): Columns are max-pooled down to at most this many
+            top_db (float): Dynamic range below the file's peak, as in amplitude_to_db
+        
+        Returns:
+            tuple: (dB array of shape (1 + n_fft // 2, columns), seconds per column, start time)
+        """
+        base = self._base_path(file_path)
+        try:
+            return self._assemble(self.get_index(file_path), base, start, end, max_columns, top_db)
+        except FileNotFoundError:
+            # Evicted by another store sharing the directory; compute the tiles again
+            self._compute_tiles(file_path, base)
+            return self._assemble(self.get_index(file_path), base, start, end, max_columns, top_db)
+    
+    def _assemble(self, index, base, start, end, max_columns, top_db):
+        """Assemble a time range from the tiles of one index, see assemble."""
+        frame_seconds = self.hop_length / self.sr
+        first = min(index['total_frames'] - 1, max(0, int(start / frame_seconds)))
+        last = index['total_frames'] if end is None else min(index['total_frames'], max(first + 1, int(np.ceil(end / frame_seconds))))
+        
+        pieces = []
+        for tile in range(first // self.tile_frames, (last - 1) // self.tile_frames + 1):
+            quantised = np.load(f"{base}_{tile}.npy", mmap_mode='r')
+            tile_first = tile * self.tile_frames
+            window = quantised[:, max(first - tile_first, 0):last - tile_first]
+            pieces.append(index['tile_peaks'][tile] - window.astype(np.float32) * (self.DB_RANGE / 255))
+        db = np.concatenate(pieces, axis=1) - index['peak_db']
+        db = np.maximum(db, -top_db)
+        
+        # Max-pool columns so wide ranges render at display resolution
+        pool = 1
+        if max_columns and db.shape[1] > max_columns:
+            pool = -(-db.shape[1] // max_columns)
+            usable = db.shape[1] // pool * pool
+            pooled = db[:, :usable].reshape(db.shape[0], -1, pool).max(axis=2)
+            if usable < db.shape[1]:
+                pooled = np.concatenate([pooled, db[:, usable:].max(axis=1, keepdims=True)], axis=1)
+            db = pooled
+        return db, pool * frame_seconds, first * frame_seconds
@@ -1,28 +1,278 @@
 import speech_recognition as sr
+import numpy as np
 import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 from . import config
 from .audio_file_handler import AudioFileHandler
+from .audio_preprocessing import AudioPreprocessor
+from .recognition_backends import get_backend
+
+# numpy dtypes for the sample widths produced by sr.AudioFile; 24-bit samples are unpacked by pcm_to_float
+SAMPLE_DTYPES = {1: np.int8, 2: '<i2', 4: '<i4'}
+
+def pcm_to_float(frame_data, width):
+    """
+    Decode signed little-endian PCM frames, as produced by sr.AudioFile, into floats in [-1, 1).
+    
+    Args:
+        frame_data (bytes): Raw frames
+        width (int): Bytes per sample, 1 to 4
+    """
+    if width == 3:
+        # Place each 3-byte sample in the high bytes of an int32 so the sign carries over
+        raw = np.frombuffer(frame_data, dtype=np.uint8)
+        padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = raw[:len(padded) * 3].reshape(-1, 3)
+        return padded.view('<i4').ravel() / float(2 ** 31)
+    if width not in SAMPLE_DTYPES:
+        raise ValueError(f"Unsupported sample width: {width} bytes")
+    return np.frombuffer(frame_data, dtype=SAMPLE_DTYPES[width]) / float(2 ** (8 * width - 1))
 
 class SpeechHandler:
-    def __init__(self):
+    def __init__(self, cache=None, backend=None):
+        """
+        Args:
+            cache (TranscriptionCache): Optional cache consulted before recognizing a file
+            backend (RecognizerBackend): Recognition engine, defaults to config.RECOGNIZER_BACKEND
+        """
         self.recognizer = sr.Recognizer()
+        self.backend = backend or get_backend(recognizer=self.recognizer)
         self.microphone = sr.Microphone()
         self.audio_handler = AudioFileHandler()
+        self.preprocessor = AudioPreprocessor()
+        self.cache = cache
+    
+    def recognizer_settings(self, streaming=None):
+        """Describe the recognizer backend and settings that affect its output."""
+        settings = {
+            **self.backend.settings(),
+            'streaming': streaming,
+            'vad': [config.VAD_FRAME_MS, config.VAD_HOP_MS, config.VAD_ENERGY_FLOOR, config.VAD_NOISE_RATIO,
+                    config.VAD_PEAK_FRACTION, config.VAD_ZCR_THRESHOLD, config.VAD_MIN_SILENCE,
+                    config.VAD_MIN_SPEECH, config.VAD_PADDING]
+        }
+        if streaming is not False:
+            settings.update({
+                'streaming_min_duration': config.STREAMING_MIN_DURATION,
+                'segment_min_silence': config.SEGMENT_MIN_SILENCE,
+                'segment_max_seconds': config.SEGMENT_MAX_SECONDS
+            })
+        return settings
     
     def transcribe_file(self, audio_file_path):
-        """Transcribe audio file using Google's Speech Recognition."""
+        """Transcribe the speech in an audio file with the configured recognizer backend."""
+        return self.transcribe(audio_file_path, streaming=False)
+    
+    def transcribe(self, audio_file_path, streaming=None):
+        """
+        Transcribe a WAV file or buffer, opening it only once.
+        
+        Args:
+            audio_file_path (str): WAV file or in-memory buffer
+            streaming (bool): Transcribe segment by segment; by default only
+                files longer than config.STREAMING_MIN_DURATION are streamed
+        """
+        try:
+            with sr.AudioFile(_rewind(audio_file_path)) as source:
+                if streaming is None:
+                    streaming = source.DURATION > config.STREAMING_MIN_DURATION
+                if streaming:
+                    return self._transcribe_segments(source)
+                return self._transcribe_whole(source)
+        except Exception as e:
+            return {"success": False, "error": f"Unexpected error: {str(e)}"}
+    
+    def _transcribe_whole(self, source):
+        """Transcribe an open audio source in a single recognizer call."""
         try:
-            with sr.AudioFile(audio_file_path) as source:
-                audio_data = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio_data)
-                return {"success": True, "text": text}
+            audio_data = self.recognizer.record(source)
+            speech_data, vad = self._speech_only(audio_data)
+            # Let the recognizer judge audio the VAD found no speech in, rather than failing outright
+            text = self.backend.transcribe(speech_data or audio_data)
+            return {"success": True, "text": text, "vad": vad}
         except sr.UnknownValueError:
             return {"success": False, "error": "Speech recognition could not understand the audio"}
         except sr.RequestError as e:
             return {"success": False, "error": f"Could not request results from service; {str(e)}"}
         except Exception as e:
             return {"success": False, "error": f"Unexpected error: {str(e)}"}
+    
+    def _speech_only(self, audio_data):
+        """
+        Drop the silence from recorded audio before it is sent to the recognizer.
+        
+        Returns:
+            tuple: (AudioData holding only speech or None, VAD report)
+        """
+        rate = audio_data.sample_rate
+        width = audio_data.sample_width
+        samples = pcm_to_float(audio_data.frame_data, width)
+        segments = self.preprocessor.detect_speech(samples, rate)
+        
+        speech_seconds = sum(segment['end'] - segment['start'] for segment in segments)
+        vad = self.preprocessor.vad_report(len(samples) / rate, speech_seconds)
+        if not segments:
+            return None, vad
+        
+        frame_data = b"".join(
+            audio_data.frame_data[int(segment['start'] * rate) * width:int(segment['end'] * rate) * width]
+            for segment in segments
+        )
+        return sr.AudioData(frame_data, rate, width), vad
+    
+    def iter_transcribe_file(self, audio_file_path, report=None):
+        """
+        Transcribe a WAV file utterance by utterance.
+        
+        The file is read in blocks and split into speech segments, so memory
+        use stays flat regardless of the file length and silence is never
+        sent to the recognizer.
+        
+        Args:
+            audio_file_path (str): WAV file or in-memory buffer
+            report (dict): Optional dict filled with 'total_seconds' and
+                'speech_seconds' as the file is read
+        
+        Yields:
+            dict: One result per segment with 'start' and 'end' offsets in seconds
+        """
+        try:
+            with sr.AudioFile(_rewind(audio_file_path)) as source:
+                yield from self._iter_source(source, report)
+        except Exception as e:
+            yield {"success": False, "error": f"Unexpected error: {str(e)}", "start": None, "end": None}
+    
+    def _iter_source(self, source, report=None):
+        """Recognize the speech segments of an open audio source, see iter_transcribe_file."""
+        if report is not None:
+            report.update({'total_seconds': source.DURATION, 'speech_seconds': 0.0})
+        for start, end, frame_data in self._iter_segments(source):
+            if report is not None:
+                report['speech_seconds'] += end - start
+            audio_data = sr.AudioData(frame_data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            try:
+                text = self.backend.transcribe(audio_data)
+                yield {"success": True, "text": text, "start": start, "end": end}
+            except sr.UnknownValueError:
+                continue  # Nothing intelligible in this segment
+            except sr.RequestError as e:
+                yield {
+                    "success": False,
+                    "error": f"Could not request results from service; {str(e)}",
+                    "start": start,
+                    "end": end
+                }
+    
+    def _iter_segments(self, source):
+        """Split an open audio source into (start, end, frame_data) speech segments."""
+        rate = source.SAMPLE_RATE
+        width = source.SAMPLE_WIDTH
+        hop = max(1, int(rate * config.VAD_HOP_MS / 1000))
+        block_frames = hop * max(1, int(config.STREAM_BLOCK_SECONDS * rate) // hop)
+        silence_limit = int(config.SEGMENT_MIN_SILENCE * rate)
+        max_frames = int(config.SEGMENT_MAX_SECONDS * rate)
+        
+        segment = []
+        segment_start = 0
+        segment_frames = 0
+        silent_frames = 0
+        position = 0
+        
+        while True:
+            block = source.stream.read(block_frames)
+            if not block:
+                break
+            
+            samples = pcm_to_float(block, width)
+            mask = self.preprocessor.speech_mask(samples, rate)
+                
+            # One decision per hop; the block tail shorter than a frame inherits the last one
+            steps = -(-len(samples) // hop)
+            tail = mask[-1] if len(mask) else False
+            mask = np.concatenate((mask, np.full(steps - len(mask), tail)))
+                
+            # Walk runs of equal decisions rather than individual frames
+            bounds = np.concatenate(([0], np.flatnonzero(np.diff(mask)) + 1, [steps]))
+            for run_start, run_end in zip(bounds[:-1], bounds[1:]):
+                is_speech = mask[run_start]
+                offset = run_start * hop
+                run_stop = min(run_end * hop, len(samples))
+                
+                while offset < run_stop:
+                    if is_speech:
+                        if not segment:
+                            segment_start = position + offset
+                        silent_frames = 0
+                        take = min(run_stop - offset, max_frames - segment_frames)
+                    elif segment:
+                        take = min(run_stop - offset, silence_limit - silent_frames, max_frames - segment_frames)
+                        silent_frames += take
+                    else:
+                        break  # Skip silence between utterances
+                    
+                    segment.append(block[offset * width:(offset + take) * width])
+                    segment_frames += take
+                    offset += take
+                    
+                    if silent_frames >= silence_limit or segment_frames >= max_frames:
+                        yield segment_start / rate, (position + offset) / rate, b"".join(segment)
+                        segment = []
+                        segment_frames = 0
+                        silent_frames = 0
+            
+            position += len(samples)
+        
+        if segment:
+            yield segment_start / rate, position / rate, b"".join(segment)
+    
+    def transcribe_file_streaming(self, audio_file_path):
+        """Transcribe a long audio file segment by segment and stitch the results."""
+        return self.transcribe(audio_file_path, streaming=True)
+    
+    def _transcribe_segments(self, source):
+        """
+        Transcribe an open audio source segment by segment and stitch the results.
+        
+        If some segments fail while others succeed, the result is marked
+        'partial' and lists the 'errors' and the 'failed_segments' (start,
+        end and error of each), so callers can tell the text has gaps.
+        """
+        segments = []
+        errors = []
+        failed_segments = []
+        report = {}
+        try:
+            for result in self._iter_source(source, report):
+                if result["success"]:
+                    segments.append({"start": result["start"], "end": result["end"], "text": result["text"]})
+                else:
+                    errors.append(result["error"])
+                    failed_segments.append({"start": result["start"], "end": result["end"], "error": result["error"]})
+        except Exception as e:
+            errors.append(f"Unexpected error: {str(e)}")
+        vad = self.preprocessor.vad_report(report.get('total_seconds', 0.0), report.get('speech_seconds', 0.0))
+        
+        if not segments:
+            error = errors[0] if errors else "Speech recognition could not understand the audio"
+            return {"success": False, "error": error, "vad": vad}
+        
+        result = {
+            "success": True,
+            "text": " ".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "vad": vad
+        }
+        if errors:
+            result.update(partial=True, errors=errors, failed_segments=failed_segments)
+        return result
+    
+    def get_duration(self, audio_file_path):
+        """Return the duration of a WAV file or buffer in seconds."""
+        with sr.AudioFile(_rewind(audio_file_path)) as source:
+            return source.DURATION
 
     def save_transcription(self, text, original_filename):
         """Save transcribed text to file."""
@@ -40,8 +290,15 @@ class SpeechHandler:
         except Exception as e:
             return {"success": False, "error": f"Error saving transcription: {str(e)}"}
 
-    def process_audio_file(self, file_path):
-        """Process a single audio file and return its transcription."""
+    def process_audio_file(self, file_path, streaming=None):
+        """
+        Process a single audio file and return its transcription.
+        
+        Args:
+            file_path (str): Path to the audio file
+            streaming (bool): Transcribe segment by segment; by default only
+                files longer than config.STREAMING_MIN_DURATION are streamed
+        """
         try:
             print(f"\nProcessing file: {file_path}")
             
@@ -53,13 +310,58 @@ class SpeechHandler:
                     'error': 'File does not exist'
                 }
 
-            # Convert to WAV if needed
+            # Identical uploads seen before skip conversion entirely
+            file_hash, cached = self._lookup_source(file_path, streaming)
+            if cached:
+                return cached
+            
+            # Decode to WAV in memory if needed
             print("Converting to WAV format...")
-            wav_file = self.audio_handler.convert_to_wav(file_path)
+            wav_file = self.audio_handler.wav_source(file_path)
+            
+            return self.transcribe_converted(file_path, wav_file, streaming, file_hash)
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'original_file': file_path,
+                'error': str(e)
+            }
+    
+    def _lookup_source(self, file_path, streaming=None):
+        """
+        Look an original file up in the cache by its bytes, before any conversion.
+        
+        Returns:
+            tuple: The file hash (None without a cache) and the cached result, or None
+        """
+        if not self.cache:
+            return None, None
+        file_hash = self.cache.file_hash(file_path)
+        audio_hash = self.cache.lookup_source(file_hash)
+        if audio_hash:
+            key = self.cache.make_key(audio_hash, self.recognizer_settings(streaming))
+            cached = self.cache.get(key)
+            if cached:
+                return file_hash, self._cached_result(file_path, file_path, cached)
+        return file_hash, None
+    
+    def transcribe_converted(self, file_path, wav_file, streaming=None, file_hash=None):
+        """Transcribe an already converted WAV file or buffer and save the transcription."""
+        try:
+            key = None
+            if self.cache:
+                audio_hash = self.cache.audio_hash(wav_file)
+                if file_hash:
+                    self.cache.remember_source(file_hash, audio_hash)
+                key = self.cache.make_key(audio_hash, self.recognizer_settings(streaming))
+                cached = self.cache.get(key)
+                if cached:
+                    return self._cached_result(file_path, wav_file, cached)
             
             # Transcribe
             print("Transcribing audio...")
-            transcription_result = self.transcribe_file(wav_file)
+            transcription_result = self.transcribe(wav_file, streaming)
             
             if not transcription_result["success"]:
                 return {
@@ -69,7 +371,7 @@ class SpeechHandler:
                 }
             
             # Save transcription
-            save_result = self.save_transcription(transcription_result["text"], wav_file)
+            save_result = self.save_transcription(transcription_result["text"], file_path)
             
             if not save_result["success"]:
                 return {
@@ -78,13 +380,31 @@ class SpeechHandler:
                     'error': save_result["error"]
                 }
             
-            return {
+            result = {
                 'success': True,
                 'original_file': file_path,
-                'wav_file': wav_file,
+                'wav_file': wav_file if isinstance(wav_file, str) else None,
                 'transcription': transcription_result["text"],
                 'transcript_file': save_result["file_path"]
             }
+            if "segments" in transcription_result:
+                result['segments'] = transcription_result["segments"]
+            if transcription_result.get("partial"):
+                for name in ("partial", "errors", "failed_segments"):
+                    result[name] = transcription_result[name]
+                print(f"Warning: {len(transcription_result['errors'])} segment(s) could not be transcribed")
+            if "vad" in transcription_result:
+                result['vad'] = transcription_result["vad"]
+                print(f"Skipped {result['vad']['skipped_seconds']:.1f}s of "
+                      f"{result['vad']['total_seconds']:.1f}s as silence")
+            
+            # A transcript with failed segments is retried next time rather than kept
+            if key and not result.get('partial'):
+                self.cache.put(key, {
+                    'transcription': result['transcription'],
+                    'segments': result.get('segments')
+                })
+            return result
             
         except Exception as e:
             return {
@@ -93,23 +413,134 @@ class SpeechHandler:
                 'error': str(e)
             }
     
-    def process_directory(self, directory_path):
-        """Process all supported audio files in a directory."""
+    def _cached_result(self, file_path, wav_file, cached):
+        """Build a processing result from a cached transcription."""
+        print("Using cached transcription...")
+        save_result = self.save_transcription(cached['transcription'], file_path)
+        if not save_result["success"]:
+            return {
+                'success': False,
+                'original_file': file_path,
+                'error': save_result["error"]
+            }
+        
+        result = {
+            'success': True,
+            'original_file': file_path,
+            'wav_file': wav_file if isinstance(wav_file, str) else None,
+            'transcription': cached['transcription'],
+            'transcript_file': save_result["file_path"],
+            'cached': True
+        }
+        if cached.get('segments'):
+            result['segments'] = cached['segments']
+        return result
+    
+    def find_audio_files(self, directory_path):
+        """Yield all supported audio files below a directory."""
+        for root, _, files in os.walk(directory_path):
+            for file in sorted(files):
+                file_path = os.path.join(root, file)
+                if self.audio_handler.is_supported_format(file_path):
+                    yield file_path
+    
+    def process_directory(self, directory_path, conversion_workers=None,
+                          recognition_workers=None, max_in_flight=None):
+        """
+        Process all supported audio files in a directory.
+        
+        Args:
+            directory_path (str): Directory to walk
+            conversion_workers (int): Processes converting files to WAV
+            recognition_workers (int): Threads transcribing converted files
+            max_in_flight (int): Maximum number of files being processed at once
+        
+        Returns:
+            list: One result per file, in directory walk order
+        """
         if not os.path.exists(directory_path):
             print(f"Error: Directory '{directory_path}' does not exist")
             return []
 
-        results = []
         print(f"\nProcessing directory: {directory_path}")
+        results = list(self.iter_process_directory(
+            directory_path, conversion_workers, recognition_workers, max_in_flight
+        ))
+        return sorted(results, key=lambda result: result['index'])
+    
+    def iter_process_directory(self, directory_path, conversion_workers=None,
+                               recognition_workers=None, max_in_flight=None):
+        """
+        Process a directory, yielding results as soon as each file completes.
         
-        for root, _, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if self.audio_handler.is_supported_format(file_path):
-                    result = self.process_audio_file(file_path)
-                    results.append(result)
+        Conversion runs on a process pool and recognition on a thread pool.
+        Every result carries an 'index' giving its position in walk order.
+        """
+        conversion_workers = conversion_workers or config.CONVERSION_WORKERS
+        recognition_workers = recognition_workers or config.RECOGNITION_WORKERS
+        max_in_flight = max_in_flight or config.MAX_IN_FLIGHT
         
-        return results
+        files = self.find_audio_files(directory_path)
+        if conversion_workers == 1 and recognition_workers == 1:
+            for index, file_path in enumerate(files):
+                result = self.process_audio_file(file_path)
+                result['index'] = index
+                yield result
+            return
+        
+        results = queue.Queue()
+        
+        def transcribe_job(index, file_path, wav_file, file_hash):
+            result = self.transcribe_converted(file_path, wav_file, file_hash=file_hash)
+            result['index'] = index
+            results.put(result)
+        
+        def on_converted(index, file_path, file_hash, future):
+            try:
+                recognizers.submit(transcribe_job, index, file_path, future.result(), file_hash)
+            except Exception as e:
+                results.put({
+                    'success': False,
+                    'original_file': file_path,
+                    'error': str(e),
+                    'index': index
+                })
+        
+        with ProcessPoolExecutor(max_workers=conversion_workers) as converters, \
+                ThreadPoolExecutor(max_workers=recognition_workers) as recognizers:
+            in_flight = 0
+            for index, file_path in enumerate(files):
+                while in_flight >= max_in_flight:
+                    yield results.get()
+                    in_flight -= 1
+                
+                print(f"\nProcessing file: {file_path}")
+                in_flight += 1
+                # Files seen before are answered from the cache without decoding
+                try:
+                    file_hash, cached = self._lookup_source(file_path)
+                except Exception as e:
+                    file_hash, cached = None, {'success': False, 'original_file': file_path, 'error': str(e)}
+                if cached:
+                    cached['index'] = index
+                    results.put(cached)
+                    continue
+                future = converters.submit(_decode_to_wav, file_path)
+                future.add_done_callback(partial(on_converted, index, file_path, file_hash))
+            
+            while in_flight:
+                yield results.get()
+                in_flight -= 1
+
+def _decode_to_wav(file_path):
+    """Decode a file to a WAV source inside a conversion worker process."""
+    return AudioFileHandler().wav_source(file_path)
+
+def _rewind(source):
+    """Seek in-memory WAV buffers back to the start before each read."""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
 
 def process_single_file(file_path):
     handler = SpeechHandler()
@@ -126,11 +557,17 @@ def process_single_file(file_path):
     
     return result
 
-def process_directory(directory_path):
+def process_directory(directory_path, conversion_workers=None, recognition_workers=None,
+                      max_in_flight=None):
     handler = SpeechHandler()
     print(f"\nProcessing directory: {directory_path}")
     
-    results = handler.process_directory(directory_path)
+    results = handler.process_directory(
+        directory_path,
+        conversion_workers=conversion_workers,
+        recognition_workers=recognition_workers,
+        max_in_flight=max_in_flight
+    )
     
     print("\nProcessing Results:")
     for result in results:
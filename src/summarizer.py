@@ -0,0 +1,104 @@
+import heapq
+import numpy as np
+from scipy.sparse import diags
+from . import config
+from .tokenized_document import TokenizedDocument
+
+class Summarizer:
+    """
+    Extractive summarizer that runs in time linear in the transcript length.
+
+    Scoring works on the sparse sentence-term matrix of a TokenizedDocument,
+    so the text is only tokenized once:
+
+    - 'frequency': summed corpus frequency of a sentence's content words,
+      normalized by its length (the classic NLPProcessor scoring)
+    - 'tfidf': the same, with every word weighted by its inverse sentence
+      frequency so words that occur everywhere count less
+    - 'textrank': PageRank over the cosine similarity graph of the TF-IDF
+      sentence vectors; the graph is never built, each iteration multiplies
+      by the sentence-term matrix and its transpose instead
+
+    The top sentences are chosen with a heap and returned in text order.
+    Repeated sentences are scored separately, by position.
+    """
+
+    METHODS = ('frequency', 'tfidf', 'textrank')
+
+    def __init__(self, stop_words, method=None, damping=0.85, max_iter=50, tolerance=1e-6):
+        """
+        Args:
+            stop_words (set): Words that never contribute to a sentence's score
+            method (str): 'frequency', 'tfidf' or 'textrank', defaults to config.SUMMARY_METHOD
+            damping (float): TextRank damping factor
+            max_iter (int): TextRank power iterations at most
+            tolerance (float): TextRank stops once the scores change less than this
+        """
+        self.stop_words = stop_words
+        self.method = method or config.SUMMARY_METHOD
+        if self.method not in self.METHODS:
+            raise ValueError(f"Unknown summary method '{self.method}'. Available methods are: {list(self.METHODS)}")
+        self.damping = damping
+        self.max_iter = max_iter
+        self.tolerance = tolerance
+
+    def scores(self, document):
+        """Score every sentence of a TokenizedDocument with the configured method."""
+        counts = document.sentence_term_matrix()  # Only content words carry weight
+        lengths = document.sentence_lengths()
+
+        if self.method == 'frequency':
+            return counts @ document.term_counts() / (lengths + 1)
+
+        document_frequency = np.bincount(counts.indices, minlength=len(document.terms))
+        idf = np.log((1 + document.num_sentences) / (1 + document_frequency)) + 1
+        if self.method == 'tfidf':
+            return counts @ (document.term_counts() * idf) / (lengths + 1)
+        return self._textrank(counts @ diags(idf))
+
+    def _textrank(self, tfidf):
+        """PageRank over sentence cosine similarities, in O(nonzeros) per iteration."""
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        vectors = diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ tfidf
+        vectors_t = vectors.T.tocsr()
+        self_similarity = (norms > 0).astype(float)  # Each unit vector's similarity with itself
+
+        def similarity_times(x):
+            return vectors @ (vectors_t @ x) - self_similarity * x
+
+        count = tfidf.shape[0]
+        degree = similarity_times(np.ones(count))
+        connected = degree > 1e-12
+        ranks = np.full(count, 1.0 / count)
+        for _ in range(self.max_iter):
+            outgoing = np.divide(ranks, degree, out=np.zeros(count), where=connected)
+            dangling = ranks[~connected].sum() / count
+            updated = (1 - self.damping) / count + self.damping * (similarity_times(outgoing) + dangling)
+            converged = np.abs(updated - ranks).sum() < self.tolerance
+            ranks = updated
+            if converged:
+                break
+        return ranks
+
+    def summarize(self, text, num_sentences=None, ratio=None):
+        """
+        Return the best sentences of text, in their original order.
+
+        Args:
+            text (str | TokenizedDocument): Text to summarize
+            num_sentences (int): Sentences in the summary, defaults to config.SUMMARY_SENTENCES
+            ratio (float): Summary length as a fraction of the sentences; overrides num_sentences
+        """
+        document = text if isinstance(text, TokenizedDocument) else TokenizedDocument(text, self.stop_words)
+        sentences = document.sentences
+        if ratio is not None:
+            num_sentences = max(1, round(len(sentences) * ratio))
+        num_sentences = num_sentences or config.SUMMARY_SENTENCES
+
+        # Return original text if it's too short
+        if len(sentences) <= num_sentences:
+            return document.text
+
+        scores = self.scores(document)
+        top = heapq.nlargest(num_sentences, range(len(sentences)), key=scores.__getitem__)
+        return '. '.join(sentences[i] for i in sorted(top)) + '.'
@@ -0,0 +1,95 @@
+import re
+import sys
+from array import array
+import numpy as np
+from scipy.sparse import csr_matrix
+
+SENTENCE_PATTERN = re.compile(r'[^.!?]+')
+WORD_PATTERN = re.compile(r"\w+(?:['’-]\w+)*")  # Keeps contractions and hyphenated words whole
+
+class TokenizedDocument:
+    """
+    A text split once into sentences and interned, lowercased words.
+
+    Words are runs of word characters, so punctuation next to a word is
+    stripped rather than kept in the term ("budget," is "budget"), while
+    contractions and hyphenated words such as "don't" and "follow-up" stay
+    one term. They are stored as int32 term ids into terms, in text order,
+    with sentence_offsets marking where each sentence's words start and end.
+    stopword_mask and content_mask are per-term flags, computed once for
+    the whole vocabulary of the text; content words are the words that are
+    not stop words. Every analyzer of NLPProcessor reads this structure
+    instead of re-splitting the text.
+    """
+
+    def __init__(self, text, stop_words):
+        """
+        Args:
+            text (str): Text to tokenize
+            stop_words (set): Words flagged in stopword_mask
+        """
+        self.text = text
+        vocabulary = {}
+        term_ids = array('i')
+        offsets = array('q', [0])
+        self.sentences = []
+        for match in SENTENCE_PATTERN.finditer(text):
+            sentence = match.group().strip()
+            if not sentence:
+                continue
+            for word in WORD_PATTERN.findall(sentence.lower()):
+                term_id = vocabulary.get(word)
+                if term_id is None:
+                    term_id = vocabulary[sys.intern(word)] = len(vocabulary)
+                term_ids.append(term_id)
+            offsets.append(len(term_ids))
+            self.sentences.append(sentence)
+
+        self.terms = list(vocabulary)
+        self.term_ids = np.frombuffer(term_ids, dtype=np.int32) if term_ids else np.zeros(0, dtype=np.int32)
+        self.sentence_offsets = np.frombuffer(offsets, dtype=np.int64)
+        self.stopword_mask = np.fromiter((term in stop_words for term in self.terms), dtype=bool, count=len(self.terms))
+        self.content_mask = ~self.stopword_mask
+        self._term_counts = None
+        self._sentence_term_matrix = None
+
+    @property
+    def num_sentences(self):
+        return len(self.sentences)
+
+    @property
+    def num_words(self):
+        return len(self.term_ids)
+
+    def sentence_lengths(self):
+        """Words per sentence, stop words included."""
+        return np.diff(self.sentence_offsets)
+
+    def sentence_terms(self, index):
+        """Term ids of one sentence."""
+        return self.term_ids[self.sentence_offsets[index]:self.sentence_offsets[index + 1]]
+
+    def term_counts(self):
+        """Occurrences of each content term in the text; other terms count zero."""
+        if self._term_counts is None:
+            counts = np.bincount(self.term_ids, minlength=len(self.terms))
+            counts[~self.content_mask] = 0
+            self._term_counts = counts
+        return self._term_counts
+
+    def sentence_term_matrix(self):
+        """Sparse sentences x terms matrix of content word counts."""
+        if self._sentence_term_matrix is None:
+            rows = np.repeat(np.arange(self.num_sentences), self.sentence_lengths())
+            keep = self.content_mask[self.term_ids]
+            self._sentence_term_matrix = csr_matrix(
+                (np.ones(int(keep.sum())), (rows[keep], self.term_ids[keep])),
+                shape=(self.num_sentences, len(self.terms))
+            )  # Duplicate entries are summed into counts
+        return self._sentence_term_matrix
+
+    def top_terms(self, count):
+        """The most frequent content terms, ties broken by first occurrence."""
+        counts = self.term_counts()
+        order = np.argsort(-counts, kind='stable')[:count]
+        return [self.terms[i] for i in order if counts[i] > 0]
@@ -0,0 +1,163 @@
+import os
+import threading
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.decomposition import LatentDirichletAllocation
+from . import config
+from .nlp_resources import get_resources
+from .tokenized_document import TokenizedDocument
+
+class OnlineTopicModel:
+    """
+    LDA topic model trained incrementally with partial_fit.
+
+    The vocabulary has a fixed capacity so the model's shape never changes:
+    words are assigned ids as they are first seen, and once the vocabulary
+    is full, new words are ignored.
+
+    A model can be saved and loaded again, so topics keep their ids across
+    processes and meetings. Updates and inference are serialized so one
+    model can be shared between threads.
+    """
+
+    def __init__(self, num_topics=3, vocabulary_size=None, random_state=42, stop_words=None):
+        """
+        Args:
+            num_topics (int): Number of LDA topics
+            vocabulary_size (int): Maximum number of distinct words learned
+            random_state (int): Seed for reproducible topics
+            stop_words (set): Words left out of raw text, defaults to the shared stop word set
+        """
+        self.num_topics = num_topics
+        self.vocabulary_size = vocabulary_size or config.TOPIC_VOCABULARY_SIZE
+        self.vocabulary = {}
+        self.terms = []
+        self.stop_words = stop_words
+        self.lda = LatentDirichletAllocation(
+            n_components=num_topics,
+            learning_method='online',
+            random_state=random_state
+        )
+        self.documents_seen = 0
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('stop_words', None)
+        self._lock = threading.RLock()
+
+    def save(self, path):
+        """Write the model to path, replacing any previous version atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with self._lock:
+            joblib.dump(self, temp_path)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a model written by save()."""
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise ValueError(f"{path} does not contain an {cls.__name__}")
+        return model
+
+    @property
+    def is_fitted(self):
+        return hasattr(self.lda, 'components_')
+
+    def _tokenize(self, document):
+        """Return document as a TokenizedDocument, tokenized like NLPProcessor's documents."""
+        if isinstance(document, TokenizedDocument):
+            return document
+        return TokenizedDocument(document, self.stop_words if self.stop_words is not None else get_resources().stop_words)
+
+    def _counts(self, documents, learn, by_sentence=False):
+        """Build a document-term count matrix, one row per document or per sentence."""
+        blocks = [self._document_counts(self._tokenize(document), learn, by_sentence) for document in documents]
+        if not blocks:
+            return csr_matrix((0, self.vocabulary_size))
+        return vstack(blocks, format='csr')
+
+    def _document_counts(self, document, learn, by_sentence=True):
+        """Count the content words of a TokenizedDocument, one row per sentence or one in total."""
+        model_ids = np.full(len(document.terms), -1, dtype=np.int64)
+        for term_id in np.flatnonzero(document.content_mask):
+            term = document.terms[term_id]
+            model_id = self.vocabulary.get(term)
+            if model_id is None and learn and len(self.terms) < self.vocabulary_size:
+                model_id = self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+            if model_id is not None:
+                model_ids[term_id] = model_id
+        cols = model_ids[document.term_ids]
+        if by_sentence:
+            rows, num_rows = np.repeat(np.arange(document.num_sentences), document.sentence_lengths()), document.num_sentences
+        else:
+            rows, num_rows = np.zeros(len(cols), dtype=np.int64), 1
+        keep = cols >= 0
+        return csr_matrix((np.ones(int(keep.sum())), (rows[keep], cols[keep])), shape=(num_rows, self.vocabulary_size))
+
+    def partial_fit(self, documents, by_sentence=False):
+        """
+        Update the topics with a batch of new documents.
+
+        Args:
+            documents (list | TokenizedDocument): Texts or TokenizedDocuments; a single
+                TokenizedDocument is learned sentence by sentence
+            by_sentence (bool): Learn each sentence of the documents as its own row
+        """
+        if isinstance(documents, TokenizedDocument):
+            documents, by_sentence = [documents], True
+        with self._lock:
+            counts = self._counts(documents, learn=True, by_sentence=by_sentence)
+            counts = counts[np.diff(counts.indptr) > 0]
+            if counts.shape[0]:
+                self.lda.partial_fit(counts)
+                self.documents_seen += counts.shape[0]
+        return self
+
+    def transform(self, documents):
+        """Return the topic distribution of each document (text or TokenizedDocument) without updating the model."""
+        with self._lock:
+            return self.lda.transform(self._counts(documents, learn=False))
+
+    def document_topics(self, sentences, num_topics=3, num_words=5):
+        """
+        Infer the main topics of one document without updating the model.
+
+        Args:
+            sentences (list | TokenizedDocument): The document, split into sentences
+            num_topics (int): Topics reported, most prominent first
+            num_words (int): Words reported per topic
+
+        Returns:
+            list: Topics in the shape of topics(), each with its 'weight' in the document
+        """
+        if not isinstance(sentences, TokenizedDocument):
+            sentences = " ".join(sentences)
+        weights = self.transform([sentences])[0]
+        topics = self.topics(num_words)
+        ranked = np.argsort(weights)[::-1][:num_topics]
+        return [dict(topics[i], weight=float(weights[i])) for i in ranked]
+
+    def topics(self, num_words=5):
+        """Return the top words of each topic in the same shape as NLPProcessor.extract_topics."""
+        with self._lock:
+            components = self.lda.components_[:, :len(self.terms)].copy()
+        num_words = min(num_words, len(self.terms))
+        topics = []
+        for topic_idx, weights in enumerate(components):
+            top = np.argpartition(weights, -num_words)[-num_words:]
+            top = top[np.argsort(weights[top])[::-1]]
+            topics.append({
+                'topic': f'Topic {topic_idx + 1}',
+                'words': [self.terms[i] for i in top]
+            })
+        return topics
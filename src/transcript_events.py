@@ -0,0 +1,113 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+class Subscription:
+    """
+    One subscriber's view of a TranscriptEventBus.
+
+    Every event published after subscribing is delivered to the subscriber
+    exactly once, in sequence order, through drain().
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self._events = deque()
+        self._ready = threading.Condition()
+        self.closed = False
+
+    def _deliver(self, event):
+        with self._ready:
+            self._events.append(event)
+            self._ready.notify_all()
+
+    def _close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+    def drain(self, timeout=None):
+        """
+        Wait for events and take all that have arrived.
+
+        Args:
+            timeout (float): Seconds to wait for the first event; None waits indefinitely
+
+        Returns:
+            list: Events in sequence order, empty on timeout or once the bus is closed
+        """
+        with self._ready:
+            self._ready.wait_for(lambda: self._events or self.closed, timeout)
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def __iter__(self):
+        """Yield events as they arrive until the bus is closed."""
+        while True:
+            events = self.drain()
+            if not events and self.closed:
+                return
+            yield from events
+
+    def unsubscribe(self):
+        self.bus.unsubscribe(self)
+
+class TranscriptEventBus:
+    """
+    Thread-safe publish/subscribe channel for transcript events.
+
+    Publishers (recognition workers, the analysis thread) never block on
+    subscribers; each subscriber has its own queue. Events are dicts with a
+    bus-wide 'sequence' number, a 'type' and a 'time', e.g.
+    {'sequence': 3, 'type': 'segment', 'time': ..., 'text': 'hello'}.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.closed = False
+
+    def subscribe(self):
+        """Return a Subscription receiving every event published from now on."""
+        subscription = Subscription(self)
+        with self._lock:
+            if self.closed:
+                subscription._close()
+            else:
+                self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        subscription._close()
+
+    def publish(self, event_type, **fields):
+        """
+        Number an event and deliver it to every subscriber.
+
+        Args:
+            event_type (str): 'segment', 'partial' or 'analysis'
+            **fields: Event payload, e.g. text or analysis
+
+        Returns:
+            dict: The published event
+        """
+        with self._lock:
+            event = {'sequence': next(self._sequence), 'type': event_type, 'time': time.time(), **fields}
+            # Delivering under the lock keeps sequence order identical for all subscribers
+            for subscription in self._subscribers:
+                subscription._deliver(event)
+        return event
+
+    def close(self):
+        """Wake every subscriber; drain() returns what is left, then empty lists."""
+        with self._lock:
+            self.closed = True
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            subscription._close()
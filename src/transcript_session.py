@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from datetime import datetime
+from .incremental_analysis import IncrementalAnalyzer
+from .transcript_events import TranscriptEventBus
+from .segment_log import SegmentLog
+from . import config
+
+class TranscriptSession:
+    """
+    Transcript bookkeeping shared by RealtimeTranscriber and RealtimeSession.
+
+    Recognition results are released into full_transcript strictly in the
+    order their utterances were dequeued, whatever order the workers finish
+    in. Each released segment is published on the event bus, appended to
+    the segment log and passed to on_result. The session also runs the
+    interim and final analyses and saves the final transcript.
+
+    Subclasses capture and recognize the audio, and provide nlp_processor.
+    """
+
+    def __init__(self, backend, analysis_interval=30, on_result=None, segment_log=None, name=None, **log_fields):
+        """
+        Args:
+            backend (RecognizerBackend): Recognition engine, named in the segment log
+            analysis_interval (int): Seconds between interim analyses
+            on_result (callable): Called with each result dict, see PartialTranscriber
+            segment_log (bool | str): Append segments to a crash-safe log as they are recognized;
+                a path chooses the file, defaults to config.SEGMENT_LOG
+            name (str): Suffix of the transcript and segment log file names
+            **log_fields: Extra fields for the segment log's session line
+        """
+        self.backend = backend
+        self.analysis_interval = analysis_interval
+        self.on_result = on_result
+        self.name = name
+        self.full_transcript = []
+        self.latencies = []  # Seconds from the end of each utterance's capture to its text
+        self.recognition_time = 0.0  # Seconds the backend spent on the released utterances
+        self.analyzer = None  # Built on first use; folds in new segments at each interim analysis
+        self.last_analysis = None
+        self.events = TranscriptEventBus()  # Segments, partials and interim analyses, see subscribe()
+        self.segment_log_option = config.SEGMENT_LOG if segment_log is None else segment_log
+        self.segment_log = None
+        self._log_fields = log_fields
+
+        self._results_lock = threading.Lock()
+        self._pending_results = {}
+        self._next_result = 0
+
+    def subscribe(self):
+        """Receive every transcript event from now on, see TranscriptEventBus."""
+        return self.events.subscribe()
+
+    def _file_name(self, prefix, extension):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = f"_{self.name}" if self.name is not None else ""
+        return os.path.join(config.TRANSCRIPTIONS_DIR, f"{prefix}_{timestamp}{suffix}.{extension}")
+
+    def _open_segment_log(self):
+        """Start the session's segment log, see SegmentLog."""
+        if not self.segment_log_option:
+            return
+        path = self.segment_log_option
+        if path is True:
+            path = self._file_name("realtime_segments", "jsonl")
+        try:
+            self.segment_log = SegmentLog(path, backend=type(self.backend).__name__, **self._log_fields)
+        except Exception as e:
+            print(f"Error opening segment log: {e}")
+
+    def _log_segment(self, sequence, text, **timings):
+        """Append a recognized segment to the segment log, if there is one."""
+        if not self.segment_log:
+            return
+        timings = {name: value for name, value in timings.items() if value is not None}
+        try:
+            self.segment_log.append(sequence, text, **timings)
+        except Exception as e:
+            print(f"Error writing segment log: {e}")
+
+    def _close_outputs(self):
+        """End the event stream and the segment log."""
+        self.events.close()
+        if self.segment_log:
+            self.segment_log.close()
+
+    def release_result(self, sequence, text, captured_at=None, recognition_seconds=None, start=None, end=None):
+        """
+        Buffer a result and append every result that is now in order to full_transcript.
+
+        Args:
+            sequence (int): Dequeue number of the utterance
+            text (str): Recognized text, None if recognition failed
+            captured_at (float): time.perf_counter() when the utterance's capture ended
+            recognition_seconds (float): Time the backend spent on the utterance
+            start (float): Stream position of the utterance in seconds, when the capture knows it
+            end (float): Stream position of the utterance's end in seconds
+        """
+        with self._results_lock:
+            self._pending_results[sequence] = (text, captured_at, recognition_seconds, start, end)
+            while self._next_result in self._pending_results:
+                text, captured_at, recognition_seconds, start, end = self._pending_results.pop(self._next_result)
+                sequence = self._next_result
+                self._next_result += 1
+                if recognition_seconds is not None:
+                    self.recognition_time += recognition_seconds
+                latency = None
+                if captured_at is not None:
+                    latency = time.perf_counter() - captured_at
+                    self.latencies.append(latency)
+                if text and text.strip():  # Only add non-empty transcriptions
+                    self._add_segment(sequence, text, recognition_seconds=recognition_seconds,
+                                      latency=latency, start=start, end=end)
+                if self.on_result:
+                    self.on_result({'utterance': sequence, 'final': True, 'text': text or '',
+                                    'start': start, 'end': end})
+
+    def on_partial_result(self, result):
+        """Take a result from a PartialTranscriber, which delivers finals in order."""
+        if result['final'] and result['text'].strip():
+            self._add_segment(result['utterance'], result['text'], start=result['start'], end=result['end'])
+        elif not result['final']:
+            self.events.publish('partial', text=result['text'], utterance=result['utterance'])
+        if self.on_result:
+            self.on_result(result)
+
+    def _add_segment(self, sequence, text, **timings):
+        self.full_transcript.append(text)
+        print(f"Transcribed: {text}")
+        self.events.publish('segment', text=text, index=len(self.full_transcript) - 1)
+        self._log_segment(sequence, text, **timings)
+
+    def interim_analysis(self):
+        """Update the running analysis with segments recognized since the last one."""
+        if not self.full_transcript:
+            return None
+
+        try:
+            if self.analyzer is None:
+                self.analyzer = IncrementalAnalyzer(self.nlp_processor)
+            self.last_analysis = self.analyzer.update_from(self.full_transcript).report()
+            self.events.publish('analysis', analysis=self.last_analysis)
+            return self.last_analysis
+        except Exception as e:
+            print(f"Error performing analysis: {e}")
+            return None
+
+    def _perform_analysis(self):
+        """Perform NLP analysis on the complete transcript."""
+        if not self.full_transcript:
+            return None
+
+        try:
+            analysis_result, _ = self.nlp_processor.analyze_text(
+                " ".join(self.full_transcript),
+                output_dir=os.path.join(config.PROCESSED_DATA_DIR, 'realtime_analysis')
+            )
+            return analysis_result
+        except Exception as e:
+            print(f"Error performing analysis: {e}")
+            return None
+
+    def _save_final_transcript(self):
+        """Save the complete transcript to a file."""
+        if not self.full_transcript:
+            return
+
+        filepath = self._file_name("realtime_transcript", "txt")
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write("\n".join(self.full_transcript))
+            print(f"Full transcript saved to: {filepath}")
+        except Exception as e:
+            print(f"Error saving transcript: {e}")
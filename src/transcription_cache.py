@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import wave
+from contextlib import contextmanager
+from . import config
+
+class TranscriptionCache:
+    """
+    Persistent, content-addressed cache of transcription results.
+
+    Entries are keyed by a hash of the decoded audio plus the recognizer
+    backend and its settings. The cache lives in a SQLite database so several
+    worker processes can share it, and the least recently used entries are
+    evicted once the stored transcripts exceed max_bytes.
+    """
+
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, path=None, max_bytes=None):
+        """
+        Args:
+            path (str): SQLite database file, defaults to config.CACHE_DIR/transcriptions.sqlite
+            max_bytes (int): Size bound for stored transcripts
+        """
+        self.path = path or os.path.join(config.CACHE_DIR, 'transcriptions.sqlite')
+        self.max_bytes = max_bytes or config.CACHE_MAX_BYTES
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, size INTEGER NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources (file_hash TEXT PRIMARY KEY, audio_hash TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Run statements in one write-locked transaction.
+
+        A fresh connection per call keeps the cache safe across threads and
+        worker processes; SQLite serialises the writers.
+        """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @classmethod
+    def file_hash(cls, file_path):
+        """Hash the raw bytes of a file."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(cls.HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def audio_hash(cls, wav_file):
+        """Hash the decoded PCM frames and format of a WAV file or buffer."""
+        digest = hashlib.sha256()
+        if hasattr(wav_file, 'seek'):
+            wav_file.seek(0)
+        with wave.open(wav_file, 'rb') as reader:
+            digest.update(f"{reader.getframerate()}:{reader.getsampwidth()}:{reader.getnchannels()}".encode())
+            frames_per_block = max(1, cls.HASH_BLOCK_SIZE // (reader.getsampwidth() * reader.getnchannels()))
+            for block in iter(lambda: reader.readframes(frames_per_block), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(audio_hash, settings):
+        """Combine an audio hash with recognizer settings into a cache key."""
+        encoded = json.dumps(settings, sort_keys=True, default=str)
+        return hashlib.sha256(f"{audio_hash}:{encoded}".encode()).hexdigest()
+
+    def lookup_source(self, file_hash):
+        """Return the audio hash previously recorded for a source file, if any."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT audio_hash FROM sources WHERE file_hash = ?", (file_hash,)).fetchone()
+        return row[0] if row else None
+
+    def remember_source(self, file_hash, audio_hash):
+        """Record the audio hash of a source file so later uploads can skip decoding."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (file_hash, audio_hash))
+
+    def get(self, key):
+        """Return the cached result for a key, or None on a miss."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT result FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.execute(
+                "UPDATE stats SET value = value + 1 WHERE name = ?",
+                ('hits' if row else 'misses',)
+            )
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, result):
+        """Store a result and evict least recently used entries beyond max_bytes."""
+        encoded = json.dumps(result)
+        size = len(encoded.encode('utf-8'))
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, encoded, size, time.time())
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+                for old_key, old_size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                    total -= old_size
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size."""
+        with self._transaction() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'entries': entries,
+            'bytes': size
+        }
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM sources")
+            conn.execute("UPDATE stats SET value = 0")
@@ -0,0 +1,67 @@
+import numpy as np
+import soundfile as sf
+from . import config
+
+def min_max_envelope(samples, n_bins):
+    """
+    Reduce a signal to per-bin minima and maxima.
+    
+    Drawing the envelope instead of every sample keeps peaks visible while
+    the number of points depends only on the display width.
+    
+    Returns:
+        tuple: (mins, maxs, bin_size)
+    """
+    bin_size = max(1, -(-len(samples) // max(1, n_bins)))
+    mins, maxs = _bin_extremes(samples, bin_size)
+    return mins, maxs, bin_size
+
+def _bin_extremes(samples, bin_size):
+    """Minimum and maximum of each bin_size run of samples; the last bin may be partial."""
+    usable = len(samples) // bin_size * bin_size
+    body = np.asarray(samples[:usable]).reshape(-1, bin_size)
+    mins, maxs = body.min(axis=1), body.max(axis=1)
+    if usable < len(samples):
+        tail = np.asarray(samples[usable:])
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+    return mins, maxs
+
+def read_envelope(audio_file, start=0.0, end=None, n_bins=None):
+    """
+    Compute the min/max envelope of a time range of an audio file.
+    
+    Seeks straight to the range and reads it block by block, so only one
+    block of samples is in memory however long the file or range is.
+    
+    Returns:
+        tuple: (times, mins, maxs) with times in seconds at the start of each bin
+    """
+    n_bins = n_bins or config.WAVEFORM_POINTS
+    with sf.SoundFile(audio_file) as f:
+        first = min(f.frames, max(0, int(start * f.samplerate)))
+        last = f.frames if end is None else min(f.frames, max(first, int(end * f.samplerate)))
+        frames = last - first
+        bin_size = max(1, -(-frames // n_bins))
+        block_size = bin_size * max(1, config.WAVEFORM_BLOCK_FRAMES // bin_size)
+        
+        mins, maxs = [], []
+        f.seek(first)
+        for block in f.blocks(blocksize=block_size, frames=frames, dtype='float32', always_2d=True):
+            # Blocks hold whole bins, so only the final one can end in a partial bin
+            block_mins, block_maxs = _bin_extremes(np.mean(block, axis=1), bin_size)
+            mins.append(block_mins)
+            maxs.append(block_maxs)
+        
+        samplerate = f.samplerate
+    
+    if not mins:
+        return np.zeros(0), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    mins = np.concatenate(mins)
+    maxs = np.concatenate(maxs)
+    times = (first + np.arange(len(mins)) * bin_size) / samplerate
+    return times, mins, maxs
+
+def envelope_trace(times, mins, maxs):
+    """Interleave an envelope into (x, y) points drawing one vertical stroke per bin."""
+    return np.repeat(times, 2), np.column_stack((mins, maxs)).ravel()
@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+import pytest
+from src.nlp_processor import NLPProcessor
+
+class WordListSentiment:
+    """Tiny polarity scorer standing in for VADER."""
+
+    def polarity_scores(self, text):
+        words = text.lower().split()
+        pos = sum(word.strip('.') == 'good' for word in words) / max(len(words), 1)
+        neg = sum(word.strip('.') == 'bad' for word in words) / max(len(words), 1)
+        return {'neg': neg, 'neu': 1 - pos - neg, 'pos': pos, 'compound': pos - neg}
+
+@pytest.fixture
+def make_processor():
+    """Build an NLPProcessor on stub resources; keyword arguments replace individual resources."""
+    def make(**resources):
+        defaults = {
+            'sentiment_analyzer': WordListSentiment(),
+            'stop_words': {'the', 'a', 'and', 'is', 'was', 'we'},
+            'vectorizer_settings': {'max_df': 0.95, 'min_df': 1},
+        }
+        return NLPProcessor(SimpleNamespace(**{**defaults, **resources}))
+    return make
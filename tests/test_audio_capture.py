@@ -0,0 +1,124 @@
+import functools
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+import pytest
+from src import realtime_transcription
+from src.audio_capture import FileInputStream, RingBuffer, RingBufferCapture, RingSegment, StreamingVAD, detach
+from src.audio_queue import BoundedAudioQueue
+from src.realtime_transcription import RealtimeTranscriber
+from src.recognition_backends import FakeBackend
+
+RATE = 16000
+
+def make_signal(pattern, seed=0):
+    """Half-second pieces of loud noise ('s') or near-silence ('.')."""
+    rng = np.random.default_rng(seed)
+    pieces = [rng.standard_normal(RATE // 2) * (0.3 if symbol == 's' else 0.001) for symbol in pattern]
+    return np.concatenate(pieces).astype(np.float32)
+
+@pytest.fixture
+def speech_wav(tmp_path):
+    path = str(tmp_path / "speech.wav")
+    sf.write(path, make_signal("..ss...s..."), RATE, subtype='PCM_16')
+    return path
+
+def test_ring_buffer_views_are_contiguous_across_the_wrap():
+    ring = RingBuffer(10)
+    ring.write(np.arange(8, dtype='<i2'))
+    ring.write(np.arange(8, 14, dtype='<i2'))
+
+    assert ring.oldest() == 4
+    assert list(ring.samples(4, 14)) == list(range(4, 14))
+    view = ring.view(6, 12)
+    assert isinstance(view, memoryview)
+    assert np.frombuffer(view, dtype='<i2').tolist() == list(range(6, 12))
+    with pytest.raises(IndexError):
+        ring.samples(2, 6)
+
+def test_ring_segments_detach_until_overwritten():
+    ring = RingBuffer(10)
+    ring.write(np.arange(8, dtype='<i2'))
+    stale = []
+    segment = RingSegment(ring, 2, 6, RATE, on_stale=lambda: stale.append(True))
+    segment.start, segment.end = 2 / RATE, 6 / RATE
+
+    audio = detach(segment)
+    assert isinstance(audio.frame_data, bytes) and audio.start == segment.start
+    assert np.frombuffer(audio.frame_data, dtype='<i2').tolist() == [2, 3, 4, 5]
+
+    ring.write(np.arange(8, 14, dtype='<i2'))  # Wraps over samples 0-3
+    assert detach(segment) is None and stale == [True]
+    with pytest.raises(IndexError):
+        ring.read(2, 6)
+    assert ring.read(4, 14).tolist() == list(range(4, 14))
+
+def test_merge_drops_overwritten_segments():
+    ring = RingBuffer(10)
+    ring.write(np.arange(8, dtype='<i2'))
+    first, second = RingSegment(ring, 0, 2, RATE), RingSegment(ring, 6, 8, RATE)
+    for segment, start in ((first, 0), (second, 6)):
+        segment.start, segment.end = start / RATE, (start + 2) / RATE
+    queue = BoundedAudioQueue(maxsize=2, policy='merge')
+    queue.put(first)
+    queue.put(second)
+    ring.write(np.arange(8, 12, dtype='<i2'))  # Overwrites the first segment
+
+    queue.put(sr.AudioData(bytes(4), RATE, 2))
+    stats = queue.stats()
+    assert stats['drops'] == 1 and stats['merges'] == 0 and stats['depth'] == 2
+    assert queue.get() is second
+
+def test_streaming_vad_is_independent_of_block_size():
+    samples = (make_signal("..ss...s...") * 32767).astype('<i2')
+
+    def segments(block):
+        vad = StreamingVAD(RATE)
+        found = []
+        for start in range(0, len(samples), block):
+            found += vad.process(samples[start:start + block])
+        return found + vad.flush()
+
+    found = segments(1024)
+    assert found == segments(333) == segments(len(samples))
+    assert len(found) == 2
+    (first_start, first_end), (second_start, second_end) = found
+    assert abs(first_start / RATE - 0.9) < 0.05 and abs(first_end / RATE - 2.1) < 0.05
+    assert abs(second_start / RATE - 3.4) < 0.05 and abs(second_end / RATE - 4.1) < 0.05
+
+def test_capture_hands_out_zero_copy_segments(speech_wav):
+    segments = []
+    capture = RingBufferCapture(
+        on_segment=segments.append,
+        input_stream_factory=functools.partial(FileInputStream, speech_wav, speed=0)
+    )
+    capture.start()
+    assert capture.wait(timeout=10)
+    capture.stop()
+
+    expected, _ = sf.read(speech_wav, dtype='int16')
+    assert len(segments) == 2
+    for audio in segments:
+        assert isinstance(audio.frame_data, memoryview)
+        assert audio.frame_data.obj is not None
+        samples = np.frombuffer(audio.frame_data, dtype='<i2')
+        assert any(np.array_equal(expected[start:start + len(samples)], samples)
+                   for start in np.flatnonzero(expected == samples[0]))
+    stats = capture.stats()
+    assert stats['segments'] == 2 and stats['lost_samples'] == 0
+    assert abs(stats['captured_seconds'] - 5.5) < 0.1
+
+def test_realtime_transcriber_records_from_ring_capture(speech_wav, monkeypatch, tmp_path):
+    monkeypatch.setattr(realtime_transcription, "NLPProcessor", lambda: None)
+    monkeypatch.setattr(realtime_transcription.config, "TRANSCRIPTIONS_DIR", str(tmp_path))
+    transcriber = RealtimeTranscriber(
+        backend=FakeBackend(text="heard"),
+        input_stream_factory=functools.partial(FileInputStream, speech_wav, speed=0)
+    )
+
+    transcriber.start_recording()
+    assert transcriber.capture.wait(timeout=10)
+    transcriber.stop_recording()
+
+    assert transcriber.microphone is None
+    assert transcriber.full_transcript == ["heard", "heard"]
@@ -0,0 +1,58 @@
+import io
+import os
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+from src.audio_file_handler import AudioFileHandler
+from src.audio_preprocessing import AudioPreprocessor
+
+RATE = 16000
+
+def write_tone(path, seconds=0.5):
+    t = np.arange(int(seconds * RATE)) / RATE
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 220 * t), RATE)
+
+def test_decode_returns_pcm_array(tmp_path):
+    path = str(tmp_path / "tone.flac")
+    write_tone(path)
+    
+    samples, sample_rate = AudioFileHandler().decode(path)
+    
+    assert sample_rate == RATE
+    assert samples.dtype == np.int16
+    assert len(samples) == RATE // 2
+
+def test_wav_source_decodes_without_touching_disk(tmp_path, monkeypatch):
+    processed = tmp_path / "processed"
+    os.makedirs(processed)
+    monkeypatch.setattr("src.config.PROCESSED_DATA_DIR", str(processed))
+    path = str(tmp_path / "tone.ogg")
+    write_tone(path)
+    
+    source = AudioFileHandler().wav_source(path)
+    
+    assert isinstance(source, io.BytesIO)
+    assert os.listdir(processed) == []
+    with sr.AudioFile(source) as audio:
+        assert audio.SAMPLE_RATE == RATE
+    source.seek(0)
+    audio_data, _ = AudioPreprocessor().load_audio(source)
+    assert len(AudioPreprocessor().preprocess(audio_data)) == RATE // 2
+
+def test_wav_source_keeps_wav_files_in_place(tmp_path):
+    path = str(tmp_path / "tone.wav")
+    write_tone(path)
+    
+    assert AudioFileHandler().wav_source(path) == path
+
+def test_convert_to_wav_uses_unique_names(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.PROCESSED_DATA_DIR", str(tmp_path))
+    path = str(tmp_path / "tone.flac")
+    write_tone(path)
+    handler = AudioFileHandler()
+    
+    first = handler.convert_to_wav(path)
+    second = handler.convert_to_wav(path)
+    
+    assert first != second
+    assert sf.info(first).frames == sf.info(second).frames == RATE // 2
@@ -0,0 +1,99 @@
+import numpy as np
+import soundfile as sf
+import pytest
+from src.audio_preprocessing import AudioPreprocessor
+
+def write_signal(path, rate, channels, seconds=3.0):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.4 * np.sin(2 * np.pi * 330 * t)[:, None] + 0.05 * rng.standard_normal((len(t), channels))
+    sf.write(path, signal, rate, subtype='FLOAT')
+
+@pytest.mark.parametrize("rate,channels", [(16000, 1), (44100, 2), (22050, 1)])
+def test_streaming_matches_in_memory_pipeline(tmp_path, monkeypatch, rate, channels):
+    monkeypatch.setattr("src.config.PREPROCESS_BLOCK_SECONDS", 0.37)
+    source = str(tmp_path / "input.wav")
+    write_signal(source, rate, channels)
+    preprocessor = AudioPreprocessor()
+    
+    expected, _ = preprocessor.load_audio(source)
+    expected = preprocessor.preprocess(expected)
+    output = preprocessor.process_audio(source, str(tmp_path / "output.wav"))
+    actual, actual_rate = sf.read(output, dtype='float32')
+    
+    assert actual_rate == preprocessor.sample_rate
+    assert len(actual) == len(expected)
+    np.testing.assert_allclose(actual, expected, atol=2e-3)
+
+def test_reduce_noise_state_carries_across_blocks():
+    rng = np.random.default_rng(1)
+    signal = rng.standard_normal(1000).astype(np.float32)
+    preprocessor = AudioPreprocessor()
+    blocks = [signal[:1], signal[1:300], signal[300:]]
+    
+    streamed = np.concatenate(list(preprocessor.iter_reduce_noise(blocks)))
+    
+    np.testing.assert_allclose(streamed, preprocessor.reduce_noise(signal), atol=1e-6)
+
+def test_process_batch_reports_each_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.PROCESSED_DATA_DIR", str(tmp_path))
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f"clip_{i}.wav")
+        write_signal(path, 16000, 1, seconds=0.5)
+        paths.append(path)
+    
+    results = AudioPreprocessor().process_batch(paths + [str(tmp_path / "missing.wav")], workers=2)
+    
+    assert [r['success'] for r in results] == [True, True, True, False]
+    assert all(sf.info(r['output_file']).samplerate == 16000 for r in results[:3])
+
+def speech_like(rate=16000):
+    """Two tone bursts and a noise burst (unvoiced) separated by silence."""
+    rng = np.random.default_rng(2)
+    t = np.arange(rate) / rate
+    tone = 0.3 * np.sin(2 * np.pi * 200 * t)
+    hiss = 0.03 * rng.standard_normal(rate // 2)
+    silence = np.zeros(rate)
+    return np.concatenate([silence, tone, silence, hiss, silence, tone, silence]).astype(np.float32)
+
+def test_detect_speech_finds_voiced_and_unvoiced_segments():
+    preprocessor = AudioPreprocessor()
+    segments = preprocessor.detect_speech(speech_like())
+    
+    assert len(segments) == 3
+    for segment, (start, end) in zip(segments, [(1.0, 2.0), (3.0, 3.5), (4.5, 5.5)]):
+        assert segment['start'] == pytest.approx(start - 0.1, abs=0.05)
+        assert segment['end'] == pytest.approx(end + 0.1, abs=0.05)
+
+def test_frame_features_use_views():
+    audio = speech_like()
+    energy, zcr = AudioPreprocessor().frame_features(audio)
+    
+    assert len(energy) == len(zcr) == 1 + (len(audio) - 480) // 160
+    assert energy.max() == pytest.approx(0.3 / np.sqrt(2), rel=0.05)
+
+def test_trim_silence_and_report():
+    preprocessor = AudioPreprocessor()
+    audio = speech_like()
+    speech, segments = preprocessor.trim_silence(audio)
+    report = preprocessor.vad_report(len(audio) / 16000, len(speech) / 16000)
+    
+    assert len(speech) < len(audio) / 2
+    assert report['skipped_seconds'] == pytest.approx(report['total_seconds'] - report['speech_seconds'])
+    assert report['skipped_ratio'] > 0.5
+
+def test_silence_has_no_speech():
+    assert AudioPreprocessor().detect_speech(np.zeros(16000, dtype=np.float32)) == []
+
+@pytest.mark.parametrize("reply_amplitude", [0.2, 0.1])
+def test_quieter_second_speaker_is_kept(reply_amplitude):
+    rate = 16000
+    t = np.arange(10 * rate) / rate
+    audio = np.sin(2 * np.pi * 200 * t).astype(np.float32)
+    audio[:9 * rate] *= 0.5
+    audio[9 * rate:] *= reply_amplitude
+    
+    segments = AudioPreprocessor().detect_speech(audio)
+    
+    assert segments == [{'start': 0.0, 'end': pytest.approx(10.0)}]
@@ -0,0 +1,72 @@
+import queue
+import threading
+import speech_recognition as sr
+import pytest
+from src.audio_queue import BoundedAudioQueue
+
+def make_audio(value, seconds=1.0, rate=16000):
+    return sr.AudioData(bytes([value]) * int(seconds * rate * 2), rate, 2)
+
+def drain(audio_queue):
+    items = []
+    while not audio_queue.empty():
+        items.append(audio_queue.get(timeout=0))
+    return items
+
+def test_block_policy_waits_for_a_free_slot():
+    audio_queue = BoundedAudioQueue(maxsize=2, policy='block')
+    audio_queue.put(make_audio(1))
+    audio_queue.put(make_audio(2))
+
+    with pytest.raises(queue.Full):
+        audio_queue.put(make_audio(3), timeout=0.05)
+
+    threading.Timer(0.05, audio_queue.get).start()
+    audio_queue.put(make_audio(4), timeout=2)
+
+    stats = audio_queue.stats()
+    assert stats['depth'] == 2 and stats['drops'] == 0
+    assert stats['blocked_seconds'] > 0
+
+def test_drop_oldest_policy():
+    audio_queue = BoundedAudioQueue(maxsize=2, policy='drop_oldest')
+    for value in (1, 2, 3):
+        audio_queue.put(make_audio(value))
+
+    assert [audio.frame_data[0] for audio in drain(audio_queue)] == [2, 3]
+    assert audio_queue.stats()['drops'] == 1
+
+def test_merge_policy_joins_adjacent_utterances():
+    audio_queue = BoundedAudioQueue(maxsize=2, policy='merge', merge_max_seconds=3.5)
+    for value in (1, 2, 3, 4):
+        audio_queue.put(make_audio(value))
+
+    items = drain(audio_queue)
+    stats = audio_queue.stats()
+    # 1+2 merge to make room for 3, then (1+2)+3 to make room for 4
+    assert [len(audio.frame_data) // 32000 for audio in items] == [3, 1]
+    assert items[0].frame_data[0] == 1 and items[0].frame_data[-1] == 3
+    assert stats['merges'] == 2 and stats['drops'] == 0 and stats['max_depth'] == 2
+
+def test_merge_falls_back_to_dropping():
+    audio_queue = BoundedAudioQueue(maxsize=1, policy='merge', merge_max_seconds=1.5)
+    audio_queue.put(make_audio(1))
+    audio_queue.put(make_audio(2))
+
+    assert [audio.frame_data[0] for audio in drain(audio_queue)] == [2]
+    assert audio_queue.stats()['drops'] == 1
+
+def test_shutdown_markers_bypass_the_bound():
+    audio_queue = BoundedAudioQueue(maxsize=1, policy='block')
+    audio_queue.put(make_audio(1))
+    audio_queue.put(None, timeout=0)
+
+    assert audio_queue.qsize() == 1
+    assert audio_queue.get(timeout=0).frame_data[0] == 1
+    assert audio_queue.get(timeout=0) is None
+    with pytest.raises(queue.Empty):
+        audio_queue.get(timeout=0.01)
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedAudioQueue(policy='spill')
@@ -0,0 +1,59 @@
+import numpy as np
+from src import config
+from src.nlp_resources import NLPResources
+from src.topic_model import OnlineTopicModel
+
+THEMES = [
+    ['budget', 'cost', 'invoice', 'spending', 'forecast'],
+    ['server', 'deploy', 'outage', 'database', 'latency'],
+]
+
+def make_transcript(theme, seed):
+    rng = np.random.default_rng(seed)
+    return " ".join(" ".join(rng.choice(THEMES[theme], size=6)) + "." for _ in range(6))
+
+def test_saved_model_infers_the_same_topics(tmp_path):
+    model = OnlineTopicModel(num_topics=2)
+    for seed in range(6):
+        model.partial_fit([make_transcript(seed % 2, seed)])
+    path = str(tmp_path / "topics.joblib")
+
+    model.save(path)
+    loaded = OnlineTopicModel.load(path)
+
+    documents = [make_transcript(0, 100), make_transcript(1, 101)]
+    assert np.allclose(loaded.transform(documents), model.transform(documents))
+    assert loaded.topics() == model.topics()
+    loaded.partial_fit([make_transcript(0, 102)])  # Still trainable after loading
+    assert loaded.documents_seen == model.documents_seen + 1
+
+def test_topics_are_inferred_from_the_corpus_model_once_trained(tmp_path, monkeypatch, make_processor):
+    monkeypatch.setattr(config, "TOPIC_MODEL_PATH", str(tmp_path / "topics.joblib"))
+    processor = make_processor(corpus_topic_model=OnlineTopicModel(num_topics=2))
+    text = make_transcript(1, 50)
+
+    assert all('weight' not in topic for topic in processor.extract_topics(text))
+    processor.update_topic_model([make_transcript(seed % 2, seed) for seed in range(2)])
+    assert all('weight' not in topic for topic in processor.extract_topics(text))  # 12 sentences are too few
+
+    processor.update_topic_model([make_transcript(seed % 2, seed) for seed in range(2, 20)])
+    first = processor.extract_topics(text, num_topics=1)
+    second = processor.extract_topics(make_transcript(1, 51), num_topics=1)
+
+    # Meetings about the same theme land on the same corpus topic
+    assert first[0]['topic'] == second[0]['topic']
+    assert set(first[0]['words']) <= set(THEMES[1])
+    assert first[0]['weight'] > 0.5
+    assert OnlineTopicModel.load(config.TOPIC_MODEL_PATH).documents_seen == 120
+
+def test_analysis_trains_the_shared_model_from_disk(tmp_path, monkeypatch, make_processor):
+    monkeypatch.setattr(config, "TOPIC_MODEL_PATH", str(tmp_path / "topics.joblib"))
+    processor = make_processor(corpus_topic_model=OnlineTopicModel(num_topics=2))
+
+    processor.analyze_text(make_transcript(0, 1), output_dir=str(tmp_path), learn_topics=True)
+    processor.analyze_text(make_transcript(1, 2), output_dir=str(tmp_path))  # Learning is opt-in
+
+    # A new process picks up the saved model
+    reloaded = NLPResources().corpus_topic_model
+    assert reloaded.documents_seen == 6
+    assert reloaded.is_fitted
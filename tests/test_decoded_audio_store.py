@@ -0,0 +1,79 @@
+import os
+import time
+import numpy as np
+import soundfile as sf
+import librosa
+from src.decoded_audio_store import DecodedAudioStore
+
+def write_tone(path, rate=44100, seconds=1.0, freq=440):
+    t = np.arange(int(rate * seconds)) / rate
+    sf.write(path, 0.5 * np.sin(2 * np.pi * freq * t), rate, subtype='FLOAT')
+
+def test_load_matches_librosa_and_is_memory_mapped(tmp_path):
+    source = str(tmp_path / "tone.wav")
+    write_tone(source)
+    store = DecodedAudioStore(str(tmp_path / "store"))
+    
+    y, sr = store.load(source, 22050)
+    expected, _ = librosa.load(source)
+    
+    assert sr == 22050
+    assert isinstance(y, np.memmap) and not y.flags.writeable
+    np.testing.assert_allclose(y, expected, atol=1e-4)
+
+def test_decodes_once_per_sample_rate(tmp_path, monkeypatch):
+    source = str(tmp_path / "tone.wav")
+    write_tone(source)
+    store = DecodedAudioStore(str(tmp_path / "store"))
+    decodes = []
+    original = store._decode
+    monkeypatch.setattr(store, "_decode", lambda *args: decodes.append(args[1]) or original(*args))
+    
+    store.load(source, 22050)
+    store.load(source, 22050)
+    store.load(source, 16000)
+    
+    assert decodes == [22050, 16000]
+
+def test_changed_source_is_decoded_again(tmp_path):
+    source = str(tmp_path / "tone.wav")
+    write_tone(source, seconds=1.0)
+    store = DecodedAudioStore(str(tmp_path / "store"))
+    first, _ = store.load(source, 16000)
+    
+    write_tone(source, seconds=2.0)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    second, _ = store.load(source, 16000)
+    
+    assert len(first) == 16000 and len(second) == 32000
+
+def test_hash_verification_keeps_touched_files(tmp_path, monkeypatch):
+    source = str(tmp_path / "tone.wav")
+    write_tone(source)
+    store = DecodedAudioStore(str(tmp_path / "store"), verify_hash=True)
+    store.load(source, 16000)
+    decodes = []
+    monkeypatch.setattr(store, "_decode", lambda *args: decodes.append(args))
+    
+    os.utime(source, (time.time() + 5, time.time() + 5))
+    store.load(source, 16000)
+    
+    assert decodes == []
+
+def test_least_recently_used_decodes_are_evicted(tmp_path):
+    sources = []
+    for i in range(3):
+        sources.append(str(tmp_path / f"tone_{i}.wav"))
+        write_tone(sources[-1], freq=440 + 100 * i)
+    one_decode = 16000 * 4 + 128  # float32 samples plus the .npy header
+    store = DecodedAudioStore(str(tmp_path / "store"), max_bytes=2 * one_decode)
+    
+    first, _ = store.load(sources[0], 16000)
+    store.load(sources[1], 16000)
+    os.utime(store._paths(sources[1], 16000)[1], (1, 1))  # Least recently used
+    store.load(sources[2], 16000)
+    
+    stored = [path for path in os.listdir(tmp_path / "store") if path.endswith('.npy')]
+    assert sorted(stored) == sorted(os.path.basename(store._paths(source, 16000)[0]) for source in sources[::2])
+    assert np.isfinite(first).all()  # Still readable through its mapping
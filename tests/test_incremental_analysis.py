@@ -0,0 +1,63 @@
+import numpy as np
+from src.incremental_analysis import IncrementalAnalyzer
+from src.tokenized_document import TokenizedDocument
+from src.topic_model import OnlineTopicModel
+
+def make_segments(count, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = ['budget', 'release', 'server', 'design', 'meeting', 'customer', 'good', 'bad', 'the', 'we']
+    return [" ".join(rng.choice(vocabulary, size=8)) + "." for _ in range(count)]
+
+def test_matches_full_analysis_on_small_transcripts(make_processor):
+    processor = make_processor()
+    segments = make_segments(12)
+    text = " ".join(segments)
+
+    analyzer = IncrementalAnalyzer(processor)
+    for start in range(0, len(segments), 5):
+        analyzer.update(segments[start:start + 5])
+    report = analyzer.report()
+
+    assert report['key_phrases'] == processor.extract_key_phrases(text)
+    assert report['summary'] == processor.generate_summary(text, method='frequency')
+    assert set(report) == {'sentiment', 'summary', 'topics', 'key_phrases'}
+    assert len(report['topics']) == 3
+
+def test_update_from_only_processes_new_segments(make_processor):
+    analyzer = IncrementalAnalyzer(make_processor())
+    transcript = ["good design meeting."]
+    analyzer.update_from(transcript)
+    transcript += ["bad server release.", "good budget."]
+    analyzer.update_from(transcript)
+
+    assert analyzer.segments_seen == 3
+    assert analyzer.word_freq['good'] == 2
+    assert analyzer.sentiment()['sentiment'] == 'positive'
+
+def test_state_stays_bounded_on_long_sessions(make_processor):
+    analyzer = IncrementalAnalyzer(make_processor(), candidate_limit=50)
+    for batch in range(20):
+        analyzer.update(make_segments(100, seed=batch))
+
+    assert analyzer.sentence_count == 2000
+    assert len(analyzer.candidates) == 50
+    assert len(analyzer.summary().split('. ')) == 3
+
+def test_online_topic_model_has_fixed_vocabulary():
+    model = OnlineTopicModel(num_topics=2, vocabulary_size=4)
+    model.partial_fit(["budget release budget", "server design customer meeting"])
+    model.partial_fit(["completely unseen words"])
+
+    assert model.terms == ['budget', 'release', 'server', 'design']
+    assert model.lda.components_.shape == (2, 4)
+    assert model.transform(["budget server"]).shape == (1, 2)
+    assert all(len(topic['words']) == 4 for topic in model.topics(num_words=5))
+
+def test_raw_text_queries_use_the_document_tokenization():
+    stop_words = {'the', 'a', 'and'}
+    model = OnlineTopicModel(num_topics=2, stop_words=stop_words)
+    model.partial_fit(TokenizedDocument("We don't ship on Friday. The budget can't grow.", stop_words))
+
+    assert "don't" in model.terms and "can't" in model.terms
+    trained = model.transform([TokenizedDocument("don't ship", stop_words)])
+    assert np.allclose(model.transform(["don't ship"]), trained)
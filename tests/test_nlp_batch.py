@@ -0,0 +1,84 @@
+import numpy as np
+from src.nlp_processor import get_processor
+
+def make_texts(count, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = ['budget', 'release', 'server', 'design', 'meeting', 'customer', 'good', 'bad', 'the', 'we']
+    return [" ".join(" ".join(rng.choice(vocabulary, size=8)) + "." for _ in range(rng.integers(1, 6)))
+            for _ in range(count)]
+
+def test_batch_records_match_single_document_analysis(make_processor):
+    processor = make_processor()
+    texts = make_texts(10)
+
+    records = list(processor.analyze_batch(texts, chunk_size=4))
+
+    assert [record['index'] for record in records] == list(range(10))
+    for record, text in zip(records, texts):
+        assert record['success'] and record['source'] is None
+        assert record['words'] == len(text.split())
+        assert record['sentiment'] == processor.analyze_sentiment(text)
+        assert record['summary'] == processor.generate_summary(text)
+        assert record['key_phrases'] == processor.extract_key_phrases(text)
+        assert all(len(topic['words']) <= 5 for topic in record['topics'])
+        if processor.tokenize(text).num_sentences >= 2:
+            vocabulary = set(text.lower().replace('.', ' ').split())
+            assert all(set(topic['words']) <= vocabulary for topic in record['topics'])
+
+def test_chunk_shares_one_topic_vocabulary(make_processor):
+    processor = make_processor()
+    texts = ["budget server. budget design. budget meeting.", "release customer. server design. good meeting."]
+
+    records = list(processor.analyze_batch(texts, chunk_size=2))
+
+    # 'budget' is in every sentence of the first text, so pruning drops it there alone,
+    # but across the chunk it is in half of the sentences and stays
+    assert all('budget' not in topic['words'] for topic in processor.extract_topics(texts[0]))
+    assert any('budget' in topic['words'] for topic in records[0]['topics'])
+
+def test_batch_reads_files_and_reports_failures(tmp_path, make_processor):
+    paths = []
+    for index, text in enumerate(make_texts(3)):
+        paths.append(tmp_path / f"transcript_{index}.txt")
+        paths[-1].write_text(text, encoding='utf-8')
+    paths.insert(1, tmp_path / "missing.txt")
+
+    records = list(make_processor().analyze_batch(paths, from_files=True, chunk_size=2))
+
+    assert [record['source'] for record in records] == [str(path) for path in paths]
+    assert [record['success'] for record in records] == [True, False, True, True]
+    assert 'error' in records[1]
+
+def test_process_pool_matches_in_process_records():
+    texts = make_texts(9, seed=1)
+    in_process = list(get_processor().analyze_batch(texts, chunk_size=2))
+
+    records = list(get_processor().analyze_batch(texts, workers=2, chunk_size=2))
+
+    assert [record['index'] for record in records] == list(range(9))
+    assert [record['key_phrases'] for record in records] == [record['key_phrases'] for record in in_process]
+    assert [record['summary'] for record in records] == [record['summary'] for record in in_process]
+
+def test_process_pool_uses_the_processors_resources(make_processor):
+    processor = make_processor()
+    texts = make_texts(6, seed=2)
+
+    records = list(processor.analyze_batch(texts, workers=2, chunk_size=2))
+
+    # WordListSentiment scores differ from VADER's, so these came from the caller's resources
+    assert [record['sentiment'] for record in records] == [processor.analyze_sentiment(text) for text in texts]
+
+def test_process_pool_streams_records(make_processor):
+    consumed = []
+
+    def texts():
+        for index, text in enumerate(make_texts(40, seed=3)):
+            consumed.append(index)
+            yield text
+
+    pooled = make_processor().analyze_batch(texts(), workers=2, chunk_size=2)
+    first = next(pooled)
+
+    # At most 2 * workers chunks are in flight, plus the chunk being submitted
+    assert first['index'] == 0 and len(consumed) <= 5 * 2
+    assert len([first] + list(pooled)) == 40
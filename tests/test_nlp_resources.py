@@ -0,0 +1,72 @@
+import threading
+import time
+import nltk
+import pytest
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from src import nlp_resources
+from src.nlp_processor import NLPProcessor, get_processor
+from src.nlp_resources import NLPResources, ensure_nltk_data
+
+def fail_download(*args, **kwargs):
+    raise AssertionError("nltk.download called")
+
+def test_installed_data_is_never_downloaded(monkeypatch):
+    monkeypatch.setattr(nltk.data, "find", lambda resource: resource)
+    monkeypatch.setattr(nltk, "download", fail_download)
+
+    assert ensure_nltk_data('corpora/stopwords', 'stopwords')
+
+def test_download_can_be_disabled(monkeypatch):
+    def missing(resource):
+        raise LookupError(resource)
+    monkeypatch.setattr(nltk.data, "find", missing)
+    monkeypatch.setattr(nltk, "download", fail_download)
+    monkeypatch.setattr(nlp_resources.config, "NLTK_DOWNLOAD", False)
+
+    assert not ensure_nltk_data('corpora/stopwords', 'stopwords')
+
+def test_each_resource_loads_once_across_threads():
+    resources = NLPResources()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resources._get('model', loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert 'model' in resources.load_seconds
+
+def test_failed_resources_are_not_retried():
+    resources = NLPResources()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        raise LookupError("no lexicon")
+
+    for _ in range(3):
+        with pytest.raises(LookupError):
+            resources._get('lexicon', loader)
+    assert len(calls) == 1
+
+def test_processors_share_lazily_loaded_resources(monkeypatch):
+    monkeypatch.setattr(nlp_resources, "ensure_nltk_data", lambda resource, package: False)
+    resources = NLPResources()
+
+    first, second = NLPProcessor(resources), NLPProcessor(resources)
+    assert resources.load_seconds == {}  # Construction loads nothing
+
+    assert first.stop_words == ENGLISH_STOP_WORDS
+    assert first.stop_words is second.stop_words
+    assert first.extract_key_phrases("budget budget release the") == ["budget", "release"]
+    assert NLPProcessor().resources is nlp_resources.get_resources()
+    assert get_processor() is get_processor()
@@ -0,0 +1,106 @@
+import time
+import numpy as np
+import speech_recognition as sr
+from src.partial_transcription import PartialTranscriber
+from src.recognition_backends import FakeBackend
+
+RATE = 16000
+CHUNK = 1600  # 100 ms
+
+def chunks(pattern, seed=0):
+    """Yield 100 ms chunks of noise ('s') or silence ('.') following a pattern string."""
+    rng = np.random.default_rng(seed)
+    for symbol in pattern:
+        if symbol == 's':
+            yield (rng.standard_normal(CHUNK) * 3000).astype('<i2').tobytes()
+        else:
+            yield bytes(CHUNK * 2)
+
+def make_transcriber(**kwargs):
+    options = dict(sample_rate=RATE, energy_threshold=300, window_seconds=1.0, hop_seconds=0.3,
+                   pause_seconds=0.5, preroll_seconds=0.2, workers=2)
+    options.update(kwargs)
+    return PartialTranscriber(FakeBackend(words_per_second=4), **options)
+
+def test_partials_precede_ordered_finals():
+    transcriber = make_transcriber()
+    for chunk in chunks("...ssssssssss......ssss......"):
+        transcriber.feed(chunk)
+        time.sleep(0.005)
+    transcriber.close()
+
+    results = list(transcriber.results(timeout=1))
+    finals = [result for result in results if result['final']]
+    assert [result['utterance'] for result in finals] == [0, 1]
+    first_final = results.index(finals[0])
+    assert any(not result['final'] and result['utterance'] == 0 for result in results[:first_final])
+    assert all(result['utterance'] == 1 for result in results[first_final + 1:] if not result['final'])
+
+    # The final covers the speech plus pre-roll, without the trailing pause
+    assert finals[0]['start'] == 0.1
+    assert abs(finals[0]['end'] - 1.3) < 1e-9
+
+    stats = transcriber.stats()
+    assert stats['utterances'] == 2 and stats['finals'] == 2
+    assert stats['first_word_latency']['max'] > 0
+
+def test_final_text_is_whole_utterance():
+    utterance = b''.join(chunks("sssssss"))
+    expected = FakeBackend(words_per_second=4).transcribe(sr.AudioData(utterance, RATE, 2))
+    seen = []
+    transcriber = make_transcriber(preroll_seconds=0.1, on_result=seen.append)
+    for chunk in chunks("sssssss....."):
+        transcriber.feed(chunk)
+    transcriber.close()
+
+    assert [result['text'] for result in seen if result['final']] == [expected]
+
+def test_partials_cut_first_word_latency():
+    pattern = "." * 3 + "s" * 20 + "." * 8
+
+    def first_word_latency(hop_seconds):
+        transcriber = make_transcriber(hop_seconds=hop_seconds, window_seconds=1.0)
+        transcriber.backend.latency = 0.02
+        for chunk in chunks(pattern):
+            transcriber.feed(chunk)
+            time.sleep(0.01)  # 10x faster than real time
+        transcriber.close()
+        return transcriber.stats()['first_word_latency']['mean']
+
+    assert first_word_latency(0.3) < first_word_latency(10.0) / 2
+
+def test_stale_partials_are_dropped():
+    transcriber = make_transcriber(workers=4)
+    transcriber._utterance_id = 0
+    transcriber._captured_at[0] = 0.0
+    transcriber._deliver_partial({'utterance': 0, 'final': False, 'text': 'newer', 'start': 0, 'end': 1}, 2)
+    transcriber._deliver_partial({'utterance': 0, 'final': False, 'text': 'older', 'start': 0, 'end': 1}, 1)
+    transcriber.close()
+
+    assert [result['text'] for result in transcriber.results(timeout=1)] == ['newer']
+    assert transcriber.stats()['stale_partials'] == 1
+
+def test_slow_backend_keeps_one_partial_per_utterance():
+    transcriber = make_transcriber(workers=1, hop_seconds=0.1)
+    transcriber.backend.latency = 0.1
+    calls = []
+    transcribe = transcriber.backend.transcribe
+    transcriber.backend.transcribe = lambda audio: calls.append(len(audio.frame_data)) or transcribe(audio)
+    for chunk in chunks("s" * 30 + "." * 6):
+        transcriber.feed(chunk)
+    transcriber.close()
+
+    stats = transcriber.stats()
+    # 30 partials were due; the queued one kept being replaced and was superseded by the final
+    assert len(calls) <= 2 and calls[-1] == 30 * CHUNK * 2  # The final: all speech, without the pause
+    assert stats['coalesced_partials'] >= 25 and stats['stale_partials'] == 1 and stats['finals'] == 1
+
+def test_callback_results_are_not_queued():
+    seen = []
+    transcriber = make_transcriber(on_result=seen.append)
+    for chunk in chunks("ssss......"):
+        transcriber.feed(chunk)
+    transcriber.close()
+
+    assert seen[-1]['final']
+    assert transcriber._results is None
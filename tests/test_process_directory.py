@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+import pytest
+from src.speech_recognition import SpeechHandler
+from src.transcription_cache import TranscriptionCache
+
+RATE = 16000
+
+@pytest.fixture
+def handler(monkeypatch, tmp_path):
+    monkeypatch.setattr(sr, "Microphone", lambda *args, **kwargs: None)
+    monkeypatch.setattr("src.config.TRANSCRIPTIONS_DIR", str(tmp_path / "transcripts"))
+    os.makedirs(tmp_path / "transcripts")
+    handler = SpeechHandler()
+    monkeypatch.setattr(
+        handler.recognizer, "recognize_google",
+        lambda audio_data, *args, **kwargs: f"{len(audio_data.frame_data) // 2} samples"
+    )
+    return handler
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    directory = tmp_path / "audio"
+    os.makedirs(directory / "nested")
+    for i in range(6):
+        subdir = directory / "nested" if i % 2 else directory
+        sf.write(str(subdir / f"clip_{i}.wav"), 0.3 * np.ones(RATE * (i + 1) // 4), RATE, subtype='PCM_16')
+    (directory / "notes.txt").write_text("not audio")
+    return str(directory)
+
+def test_parallel_results_match_serial_order(handler, audio_dir):
+    serial = handler.process_directory(audio_dir, conversion_workers=1, recognition_workers=1)
+    parallel = handler.process_directory(
+        audio_dir, conversion_workers=2, recognition_workers=3, max_in_flight=2
+    )
+    
+    assert len(serial) == 6
+    assert all(result['success'] for result in parallel)
+    assert [r['index'] for r in parallel] == list(range(6))
+    assert [r['original_file'] for r in parallel] == [r['original_file'] for r in serial]
+    assert [r['transcription'] for r in parallel] == [r['transcription'] for r in serial]
+
+def test_iter_process_directory_streams_every_file(handler, audio_dir):
+    results = list(handler.iter_process_directory(audio_dir, 2, 2, max_in_flight=1))
+    
+    assert sorted(r['index'] for r in results) == list(range(6))
+
+def test_parallel_runs_answer_seen_files_from_the_cache(handler, audio_dir, tmp_path):
+    handler.cache = TranscriptionCache(str(tmp_path / "cache.sqlite"))
+    first = handler.process_directory(audio_dir, conversion_workers=2, recognition_workers=2)
+    
+    for result in first:
+        assert handler.cache.lookup_source(TranscriptionCache.file_hash(result['original_file']))
+    second = handler.process_directory(audio_dir, conversion_workers=2, recognition_workers=2)
+    
+    # Answered from the source hash, before any file is sent for decoding
+    assert all(result['cached'] and result['wav_file'] == result['original_file'] for result in second)
+    assert [r['transcription'] for r in second] == [r['transcription'] for r in first]
+
+def test_missing_directory_returns_empty(handler, tmp_path):
+    assert handler.process_directory(str(tmp_path / "missing")) == []
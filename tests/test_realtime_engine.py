@@ -0,0 +1,118 @@
+import threading
+import numpy as np
+import speech_recognition as sr
+import pytest
+from src import realtime_engine
+from src.audio_capture import PushInputStream
+from src.realtime_engine import RealtimeEngine
+from src.segment_log import SegmentLog
+from src.recognition_backends import FakeBackend
+
+class RecordingBackend(FakeBackend):
+    """FakeBackend that records the marker byte of each utterance it recognizes."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.order = []
+        self._order_lock = threading.Lock()
+
+    def transcribe(self, audio):
+        with self._order_lock:
+            self.order.append(audio.frame_data[0])
+        return super().transcribe(audio)
+
+def marked_audio(marker, index=0):
+    return sr.AudioData(bytes([marker, index]) * 800, 16000, 2)
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    monkeypatch.setattr(realtime_engine.config, "TRANSCRIPTIONS_DIR", str(tmp_path))
+    engines = []
+    def make(**kwargs):
+        engines.append(RealtimeEngine(**kwargs))
+        return engines[-1]
+    yield make
+    for engine in engines:
+        engine.shutdown()
+
+def test_round_robin_keeps_a_flooding_stream_from_starving_others(engine):
+    backend = RecordingBackend(latency=0.01)
+    shared = engine(backend=backend, recognition_workers=1)
+    flooding = shared.open_session(queue_size=100)
+    quiet = shared.open_session()
+
+    for index in range(20):
+        flooding.submit(marked_audio(1, index))
+    quiet.submit(marked_audio(2))
+    quiet.submit(marked_audio(2, 1))
+    flooding.wait_idle(timeout=5)
+    quiet.wait_idle(timeout=5)
+
+    assert len(backend.order) == 22
+    first, second = [i for i, marker in enumerate(backend.order) if marker == 2]
+    assert first <= 2 and second <= 4
+
+def test_sessions_keep_separate_ordered_transcripts(engine):
+    shared = engine(backend=FakeBackend(realtime_factor=0.5), recognition_workers=4)
+    sessions = [shared.open_session() for _ in range(3)]
+    audios = {session.session_id: [marked_audio(session.session_id + 1, i) for i in range(6)] for session in sessions}
+    expected = {session_id: [FakeBackend().transcribe(audio) for audio in items] for session_id, items in audios.items()}
+
+    for index in range(6):
+        for session in sessions:
+            session.submit(audios[session.session_id][index])
+    for session in sessions:
+        session.wait_idle(timeout=5)
+
+    for session in sessions:
+        assert session.full_transcript == expected[session.session_id]
+
+def test_thread_count_does_not_grow_with_sessions(engine):
+    shared = engine(backend=FakeBackend(), recognition_workers=2, analysis_workers=1)
+    before = threading.active_count()
+    sessions = [shared.open_session() for _ in range(20)]
+
+    assert threading.active_count() == before
+    assert shared.stats()['sessions'] == 20
+    for session in sessions:
+        shared.close_session(session)
+
+def test_pushed_audio_is_transcribed_and_finalized(engine):
+    shared = engine(backend=FakeBackend(text="pushed"), recognition_workers=2,
+                    nlp_processor=object())  # Final analysis fails and is reported as None
+    session = shared.open_session(input_stream_factory=PushInputStream)
+    events = session.subscribe()
+    rng = np.random.default_rng(0)
+
+    session.start_recording()
+    for loud in (False, True, True, False, False, False, True, False, False):
+        level = 10000 if loud else 10
+        session.push((rng.standard_normal(8000) * level).astype('<i2').tobytes())
+    analysis = session.stop_recording()
+
+    assert session.full_transcript == ["pushed", "pushed"]
+    assert analysis is None
+    assert [(event['type'], event['text']) for event in events] == [('segment', "pushed")] * 2
+    assert session.session_id not in shared.sessions
+
+def test_low_latency_session_publishes_partials(engine, tmp_path):
+    shared = engine(backend=FakeBackend(words_per_second=4), recognition_workers=2, nlp_processor=object())
+    path = str(tmp_path / "session.jsonl")
+    session = shared.open_session(input_stream_factory=PushInputStream, low_latency=True, segment_log=path)
+    events = session.subscribe()
+    rng = np.random.default_rng(0)
+
+    session.start_recording()
+    for loud in [True] * 15 + [False] * 10:
+        level = 10000 if loud else 10
+        session.push((rng.standard_normal(1600) * level).astype('<i2').tobytes())
+    session.stop_recording()
+
+    types = [event['type'] for event in events]
+    assert 'partial' in types and types[-1] == 'segment'
+    assert types.index('partial') < types.index('segment')
+    assert len(session.full_transcript) == 1
+    recovered = SegmentLog.recover(path)
+    assert recovered['session']['session'] == session.session_id
+    segment, = recovered['segments']
+    assert segment['end'] - segment['start'] > 1.0
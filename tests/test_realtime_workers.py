@@ -0,0 +1,104 @@
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+import pytest
+from src.recognition_backends import FakeBackend
+from src import realtime_transcription
+from src.realtime_transcription import RealtimeTranscriber
+
+class DummyMicrophone:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Run RealtimeTranscriber without a microphone or NLTK data."""
+    monkeypatch.setattr(sr, "Microphone", DummyMicrophone)
+    monkeypatch.setattr(sr.Recognizer, "adjust_for_ambient_noise", lambda *args, **kwargs: None)
+    monkeypatch.setattr(realtime_transcription, "NLPProcessor", lambda: None)
+
+def make_audio(seconds, seed):
+    samples = (np.random.default_rng(seed).standard_normal(int(seconds * 16000)) * 3000).astype('<i2')
+    return sr.AudioData(samples.tobytes(), 16000, 2)
+
+class CountingBackend(FakeBackend):
+    """FakeBackend that records how many calls overlap."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+        self._active_lock = threading.Lock()
+
+    def transcribe(self, audio):
+        with self._active_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            return super().transcribe(audio)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+def test_workers_reassemble_results_in_order(offline):
+    # Earlier utterances are longer, so they finish after later ones
+    audios = [make_audio(0.5 - 0.05 * i, seed=i) for i in range(8)]
+    expected = [FakeBackend().transcribe(audio) for audio in audios]
+    backend = CountingBackend(realtime_factor=0.2)
+    transcriber = RealtimeTranscriber(backend=backend, recognition_workers=4)
+
+    transcriber._start_recognition_workers()
+    for audio in audios:
+        transcriber.transcript_queue.put(audio)
+    transcriber._stop_recognition_workers()
+
+    assert transcriber.full_transcript == expected
+    assert backend.peak > 1
+
+def test_failed_utterances_do_not_stall_order(offline):
+    audios = [make_audio(0.1, seed=1), sr.AudioData(bytes(3200), 16000, 2), make_audio(0.1, seed=2)]
+    transcriber = RealtimeTranscriber(backend=FakeBackend(text="said"), recognition_workers=3)
+
+    transcriber._start_recognition_workers()
+    for audio in audios:
+        transcriber.transcript_queue.put(audio)
+    transcriber._stop_recognition_workers()
+
+    assert transcriber.full_transcript == ["said", "said"]
+    assert not any(worker.is_alive() for worker in threading.enumerate()
+                   if worker.name.startswith("RecognitionThread"))
+
+def test_workers_scale_throughput(offline):
+    audios = [make_audio(0.1, seed=i) for i in range(8)]
+
+    def run(workers):
+        transcriber = RealtimeTranscriber(backend=FakeBackend(latency=0.05), recognition_workers=workers)
+        started = time.perf_counter()
+        transcriber._start_recognition_workers()
+        for audio in audios:
+            transcriber.transcript_queue.put(audio)
+        transcriber._stop_recognition_workers()
+        return time.perf_counter() - started
+
+    assert run(4) < run(1) / 2
+
+def test_default_mode_results_carry_stream_positions(offline):
+    seen = []
+    transcriber = RealtimeTranscriber(backend=FakeBackend(text="said"), recognition_workers=2, on_result=seen.append)
+    audio = make_audio(0.2, seed=3)
+    audio.start, audio.end = 1.5, 1.7
+
+    transcriber._start_recognition_workers()
+    transcriber.transcript_queue.put(audio)
+    transcriber.transcript_queue.put(make_audio(0.2, seed=4))
+    transcriber._stop_recognition_workers()
+
+    assert [(result['start'], result['end']) for result in seen] == [(1.5, 1.7), (None, None)]
+    assert set(seen[0]) == {'utterance', 'final', 'text', 'start', 'end'}
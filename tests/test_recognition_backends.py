@@ -0,0 +1,75 @@
+import time
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+import pytest
+from src import config
+from src.recognition_backends import FakeBackend, GoogleBackend, RecognizerBackend, get_backend, get_shared_backend
+from src.speech_recognition import SpeechHandler
+
+def make_audio(seconds=1.0, seed=0, rate=16000):
+    rng = np.random.default_rng(seed)
+    samples = (rng.standard_normal(int(seconds * rate)) * 3000).astype('<i2')
+    return sr.AudioData(samples.tobytes(), rate, 2)
+
+def test_fake_backend_is_deterministic():
+    first = FakeBackend().transcribe(make_audio(seed=1))
+    
+    assert first == FakeBackend().transcribe(make_audio(seed=1))
+    assert first != FakeBackend().transcribe(make_audio(seed=2))
+    assert len(first.split()) == 2
+
+def test_fake_backend_simulates_latency():
+    backend = FakeBackend(latency=0.05, realtime_factor=0.1)
+    started = time.perf_counter()
+    backend.transcribe(make_audio(seconds=0.5))
+    
+    assert time.perf_counter() - started >= 0.1
+    assert backend.calls == 1
+
+def test_fake_backend_rejects_silence():
+    silence = sr.AudioData(bytes(3200), 16000, 2)
+    with pytest.raises(sr.UnknownValueError):
+        FakeBackend().transcribe(silence)
+
+def test_transcribe_batch_reports_each_utterance():
+    silence = sr.AudioData(bytes(3200), 16000, 2)
+    results = FakeBackend(text="hello").transcribe_batch([make_audio(), silence])
+    
+    assert results[0] == {"success": True, "text": "hello"}
+    assert not results[1]["success"]
+
+def test_get_backend_follows_config(monkeypatch):
+    monkeypatch.setattr("src.config.RECOGNIZER_BACKEND", "fake")
+    monkeypatch.setitem(config.RECOGNIZER_OPTIONS, "fake", {"text": "configured"})
+    
+    backend = get_backend()
+    
+    assert isinstance(backend, FakeBackend) and backend.text == "configured"
+    assert isinstance(get_backend("google"), GoogleBackend)
+    with pytest.raises(ValueError):
+        get_backend("missing")
+
+def test_speech_handler_uses_selected_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(sr, "Microphone", lambda *args, **kwargs: None)
+    wav = str(tmp_path / "clip.wav")
+    sf.write(wav, 0.3 * np.sin(np.arange(16000) / 5), 16000, subtype='PCM_16')
+    
+    handler = SpeechHandler(backend=FakeBackend(text="offline"))
+    
+    assert handler.transcribe_file(wav)["text"] == "offline"
+    assert handler.recognizer_settings()["backend"] == "fake"
+
+def test_backends_must_implement_transcribe():
+    class Incomplete(RecognizerBackend):
+        name = 'incomplete'
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_shared_backend_is_built_once(monkeypatch):
+    monkeypatch.setattr("src.config.RECOGNIZER_BACKEND", "fake")
+    
+    assert get_shared_backend() is get_shared_backend("fake")
+    assert isinstance(get_shared_backend(), FakeBackend)
+
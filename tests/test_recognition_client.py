@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import speech_recognition as sr
+import pytest
+from src.recognition_backends import HttpBackend
+from src.recognition_client import RecognitionClient
+
+class StandInService:
+    """Local stand-in for a recognition service that can fail on purpose."""
+
+    def __init__(self, failures=0, status=503, delay=0.0, text="hello world"):
+        self.failures = failures
+        self.status = status
+        self.delay = delay
+        self.text = text
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                with service.lock:
+                    service.requests += 1
+                    service.active += 1
+                    service.peak = max(service.peak, service.active)
+                    service.connections.add(self.client_address)
+                    fail = service.requests <= service.failures
+                time.sleep(service.delay)
+                with service.lock:
+                    service.active -= 1
+
+                if fail:
+                    status, body = service.status, b'{}'
+                else:
+                    status, body = 200, json.dumps({"text": service.text}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/recognize"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def service_factory():
+    services = []
+    def make(**kwargs):
+        services.append(StandInService(**kwargs))
+        return services[-1]
+    yield make
+    for service in services:
+        service.close()
+
+def make_audio():
+    samples = (np.random.default_rng(0).standard_normal(1600) * 3000).astype('<i2')
+    return sr.AudioData(samples.tobytes(), 16000, 2)
+
+async def recognize_all(client, count):
+    async with client:
+        return await client.recognize_many([make_audio()] * count)
+
+def test_retries_transient_failures(service_factory):
+    service = service_factory(failures=2)
+    client = RecognitionClient(service.url, backoff_base=0.01)
+
+    results = asyncio.run(recognize_all(client, 1))
+
+    assert results == [{"success": True, "text": "hello world"}]
+    stats = client.stats()
+    assert stats['requests'] == 3 and stats['retries'] == 2 and stats['succeeded'] == 1
+
+def test_concurrency_limit_and_pooled_connections(service_factory):
+    service = service_factory(delay=0.05)
+    client = RecognitionClient(service.url, concurrency=4)
+
+    started = time.perf_counter()
+    results = asyncio.run(recognize_all(client, 16))
+    elapsed = time.perf_counter() - started
+
+    assert all(result["success"] for result in results)
+    assert service.peak <= 4
+    assert len(service.connections) <= 4
+    assert elapsed < 16 * 0.05
+    assert client.stats()['throughput'] > 0
+
+def test_budget_bounds_retries(service_factory):
+    service = service_factory(failures=100)
+    client = RecognitionClient(service.url, budget=0.3, max_attempts=100, backoff_base=0.05, backoff_max=0.1)
+
+    started = time.perf_counter()
+    results = asyncio.run(recognize_all(client, 1))
+
+    assert not results[0]["success"]
+    assert time.perf_counter() - started < 0.6
+    assert client.stats()['failed'] == 1
+
+def test_client_errors_are_not_retried(service_factory):
+    service = service_factory(failures=1, status=400)
+    client = RecognitionClient(service.url, backoff_base=0.01)
+
+    results = asyncio.run(recognize_all(client, 1))
+
+    assert not results[0]["success"]
+    assert service.requests == 1
+
+def test_http_backend_from_threads(service_factory):
+    service = service_factory(failures=1, text="pooled")
+    backend = HttpBackend(service.url, backoff_base=0.01)
+    try:
+        texts = []
+        threads = [threading.Thread(target=lambda: texts.append(backend.transcribe(make_audio()))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert texts == ["pooled"] * 4
+        assert backend.stats()['retries'] == 1
+    finally:
+        backend.close()
+
+def test_queueing_is_charged_to_the_budget(service_factory):
+    service = service_factory(delay=0.2)
+    client = RecognitionClient(service.url, concurrency=1, budget=0.3, request_timeout=5)
+
+    results = asyncio.run(recognize_all(client, 3))
+
+    # The second job waits 0.2 s for the slot, leaving it too little of its budget
+    assert [result["success"] for result in results] == [True, False, False]
+    assert service.requests <= 2
+
+def test_queued_job_fails_when_its_budget_ends(service_factory):
+    service = service_factory(delay=2.0)
+    client = RecognitionClient(service.url, concurrency=1, budget=10)
+
+    async def queued_behind_a_slow_job():
+        async with client:
+            slow = asyncio.create_task(client.recognize(make_audio()))
+            await asyncio.sleep(0.1)  # The slow job holds the only slot
+            client.budget = 0.3
+            started = time.perf_counter()
+            with pytest.raises(sr.RequestError, match="waiting for a connection"):
+                await client.recognize(make_audio())
+            waited = time.perf_counter() - started
+            assert await slow == "hello world"
+            return waited
+
+    # Gives up when its own budget runs out, not when the slot frees up
+    assert asyncio.run(queued_behind_a_slow_job()) < 1.0
+    assert service.requests == 1
+
+def test_throughput_ignores_idle_time(service_factory):
+    service = service_factory(delay=0.05)
+    client = RecognitionClient(service.url)
+
+    async def with_idle_gap():
+        async with client:
+            await client.recognize(make_audio())
+            await asyncio.sleep(0.5)
+            await client.recognize(make_audio())
+
+    asyncio.run(with_idle_gap())
+
+    assert client.stats()['elapsed'] < 0.4
@@ -0,0 +1,56 @@
+import numpy as np
+import soundfile as sf
+import pytest
+from src.recognition_backends import FakeBackend
+from src.replay import latency_percentiles, replay
+
+RATE = 16000
+
+@pytest.fixture
+def meeting_wav(tmp_path):
+    """Six one-second utterances separated by one second of near-silence."""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for _ in range(6):
+        pieces.append(rng.standard_normal(RATE) * 0.001)
+        pieces.append(rng.standard_normal(RATE) * 0.3)
+    pieces.append(rng.standard_normal(RATE) * 0.001)
+    path = str(tmp_path / "meeting.wav")
+    sf.write(path, np.concatenate(pieces), RATE, subtype='PCM_16')
+    return path
+
+def test_replay_reports_latency_queue_depth_and_real_time_factor(meeting_wav):
+    report = replay(meeting_wav, speed=10, backend=FakeBackend(latency=0.05), sample_interval=0.02,
+                    recognition_workers=2, timeout=10)
+
+    assert report['utterances'] == 6
+    assert len(report['transcript']) == 6
+    assert report['audio_seconds'] == pytest.approx(13.0)
+    assert not report['timed_out']
+    # Six recognitions of at least 50 ms each, independent of the 10x replay speed
+    assert 6 * 0.05 / 13 <= report['real_time_factor'] < 0.1
+    latency = report['latency']
+    assert 0.05 <= latency['p50'] <= latency['p95'] <= latency['max'] < 1.0
+    assert report['queue_depth'] and all(depth >= 0 for _, depth in report['queue_depth'])
+    assert report['capture']['lost_samples'] == 0
+
+def test_slow_backend_builds_a_queue(meeting_wav):
+    report = replay(meeting_wav, speed=0, backend=FakeBackend(latency=0.1), sample_interval=0.01,
+                    recognition_workers=1, timeout=10)
+
+    assert report['utterances'] == 6
+    assert report['max_queue_depth'] >= 2
+    assert report['latency']['max'] > report['latency']['p50'] >= 0.1
+
+def test_replay_reports_a_timeout(meeting_wav):
+    report = replay(meeting_wav, speed=1, backend=FakeBackend(), timeout=0.2)
+
+    assert report['timed_out']
+    assert report['wall_seconds'] < 5
+
+def test_latency_percentiles():
+    summary = latency_percentiles([0.1, 0.2, 0.3, 0.4])
+
+    assert summary['p50'] == pytest.approx(0.25)
+    assert summary['max'] == 0.4
+    assert latency_percentiles([]) is None
@@ -0,0 +1,78 @@
+import os
+import time
+import numpy as np
+import speech_recognition as sr
+from src.realtime_transcription import RealtimeTranscriber
+from src.recognition_backends import FakeBackend
+from src.segment_log import SegmentLog
+
+def test_log_is_readable_while_writing_and_fsyncs_in_batches(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    log = SegmentLog(path, fsync_interval=60, fsync_batch=4, backend="FakeBackend")
+
+    for sequence in range(10):
+        log.append(sequence, f"segment {sequence}", recognition_seconds=0.1)
+        assert len(SegmentLog.read(path)) == sequence + 2  # Session line plus segments so far
+
+    assert log.fsyncs == 1 + 2  # Opening, then after segments 4 and 8
+    recovered = SegmentLog.recover(path)
+    assert not recovered['complete']
+    assert recovered['session']['backend'] == "FakeBackend"
+    log.close()
+    assert SegmentLog.recover(path)['complete']
+
+def test_interval_fsync_does_not_wait_for_the_next_segment(tmp_path):
+    log = SegmentLog(str(tmp_path / "quiet.jsonl"), fsync_interval=0.05, fsync_batch=100)
+
+    log.append(0, "only segment")
+    assert log.fsyncs == 1
+    deadline = time.monotonic() + 5
+    while log.fsyncs == 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert log.fsyncs == 2
+    log.close()
+    assert log.fsyncs == 3
+
+def test_recover_skips_torn_final_line(tmp_path):
+    path = str(tmp_path / "crashed.jsonl")
+    log = SegmentLog(path)
+    log.append(1, "second")
+    log.append(0, "first")
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "segment", "sequence": 2, "te')  # Crash mid-write
+
+    recovered = SegmentLog.recover(path)
+    assert recovered['transcript'] == ["first", "second"]
+    assert not recovered['complete']
+    assert [segment['sequence'] for segment in recovered['segments']] == [0, 1]
+
+def test_transcriber_logs_segments_as_they_are_recognized(tmp_path, monkeypatch):
+    monkeypatch.setattr(RealtimeTranscriber, "nlp_processor", None)
+    path = str(tmp_path / "live.jsonl")
+    transcriber = RealtimeTranscriber(backend=FakeBackend(text="logged"), recognition_workers=2,
+                                      capture='ring', segment_log=path)
+    rng = np.random.default_rng(0)
+
+    transcriber._open_segment_log()
+    transcriber._start_recognition_workers()
+    for _ in range(3):
+        samples = (rng.standard_normal(1600) * 3000).astype('<i2')
+        transcriber.transcript_queue.put(sr.AudioData(samples.tobytes(), 16000, 2))
+    transcriber._stop_recognition_workers()
+
+    # Not closed yet, as after a crash
+    recovered = SegmentLog.recover(path)
+    assert recovered['transcript'] == transcriber.full_transcript == ["logged"] * 3
+    assert all(segment['recognition_seconds'] >= 0 for segment in recovered['segments'])
+    transcriber.segment_log.close()
+    assert SegmentLog.recover(path)['complete']
+
+def test_default_log_lands_in_transcriptions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.TRANSCRIPTIONS_DIR", str(tmp_path))
+    transcriber = RealtimeTranscriber(backend=FakeBackend(), capture='ring', segment_log=True)
+
+    transcriber._open_segment_log()
+    transcriber.segment_log.close()
+
+    assert [name for name in os.listdir(tmp_path) if name.startswith("realtime_segments_")]
@@ -0,0 +1,71 @@
+import os
+import numpy as np
+import soundfile as sf
+import librosa
+import pytest
+from src.decoded_audio_store import DecodedAudioStore
+from src.spectrogram_tiles import SpectrogramTileStore
+
+@pytest.fixture
+def chirp(tmp_path):
+    rate = 22050
+    t = np.arange(rate * 6) / rate
+    path = str(tmp_path / "chirp.wav")
+    sf.write(path, 0.5 * np.sin(2 * np.pi * (200 + 300 * t) * t), rate, subtype='FLOAT')
+    return path
+
+@pytest.fixture
+def tiles(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.SPECTROGRAM_TILE_FRAMES", 64)
+    store = DecodedAudioStore(str(tmp_path / "decoded"))
+    return SpectrogramTileStore(str(tmp_path / "tiles"), audio_store=store)
+
+def test_assembled_tiles_match_full_stft(chirp, tiles):
+    y, _ = librosa.load(chirp)
+    expected = librosa.amplitude_to_db(np.abs(librosa.stft(y)), ref=np.max)
+    
+    db, column_seconds, start = tiles.assemble(chirp)
+    
+    assert db.shape == expected.shape
+    assert start == 0.0 and column_seconds == pytest.approx(512 / 22050)
+    assert np.abs(db - expected).max() <= 120 / 255 / 2 + 1e-3
+
+def test_time_range_reuses_tiles(chirp, tiles, monkeypatch):
+    full, _, _ = tiles.assemble(chirp)
+    monkeypatch.setattr(tiles, "_compute_tiles", lambda *args: pytest.fail("tiles recomputed"))
+    
+    window, _, start = tiles.assemble(chirp, 2.0, 3.0)
+    first = int(2.0 / (512 / 22050))
+    
+    assert start == pytest.approx(first * 512 / 22050)
+    np.testing.assert_array_equal(window, full[:, first:first + window.shape[1]])
+
+def test_columns_are_pooled_to_display_width(chirp, tiles):
+    db, column_seconds, _ = tiles.assemble(chirp, max_columns=50)
+    
+    assert db.shape[1] <= 50
+    assert column_seconds > 512 / 22050
+
+def test_least_recently_viewed_files_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.SPECTROGRAM_TILE_FRAMES", 64)
+    rate = 22050
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"tone_{i}.wav"))
+        sf.write(paths[-1], 0.5 * np.sin(2 * np.pi * (300 + 100 * i) * np.arange(rate) / rate), rate, subtype='FLOAT')
+    store = DecodedAudioStore(str(tmp_path / "decoded"))
+    probe = SpectrogramTileStore(str(tmp_path / "probe"), audio_store=store)
+    probe.get_index(paths[0])
+    one_file = sum(entry.stat().st_size for entry in (tmp_path / "probe").iterdir())
+    tiles = SpectrogramTileStore(str(tmp_path / "tiles"), audio_store=store, max_bytes=2 * one_file)
+    
+    tiles.get_index(paths[0])
+    tiles.get_index(paths[1])
+    tiles.get_index(paths[0])  # Now the most recently viewed
+    os.utime(tiles._base_path(paths[1]) + ".json", (1, 1))
+    tiles.get_index(paths[2])
+    
+    remaining = {name.split('.')[0].split('_')[0] for name in os.listdir(tmp_path / "tiles")}
+    assert remaining == {os.path.basename(tiles._base_path(path)) for path in paths[::2]}
+    db, _, _ = tiles.assemble(paths[1])  # Evicted files are recomputed on demand
+    assert db.shape[1] == 1 + rate // 512
@@ -0,0 +1,141 @@
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+import pytest
+from src.speech_recognition import SpeechHandler, pcm_to_float
+
+RATE = 16000
+
+def make_bursts(path, bursts, gap=1.0, burst=1.0):
+    """Write a WAV with tone bursts separated by silence."""
+    t = np.arange(int(burst * RATE)) / RATE
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    silence = np.zeros(int(gap * RATE))
+    parts = [silence]
+    for _ in range(bursts):
+        parts += [tone, silence]
+    sf.write(path, np.concatenate(parts), RATE, subtype='PCM_16')
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setattr(sr, "Microphone", lambda *args, **kwargs: None)
+    handler = SpeechHandler()
+    calls = []
+    
+    def fake_recognize(audio_data, *args, **kwargs):
+        calls.append(len(audio_data.frame_data))
+        return f"segment {len(calls)}"
+    
+    monkeypatch.setattr(handler.recognizer, "recognize_google", fake_recognize)
+    handler.calls = calls
+    return handler
+
+def test_iter_transcribe_file_splits_on_silence(tmp_path, handler):
+    wav = str(tmp_path / "bursts.wav")
+    make_bursts(wav, bursts=3)
+    
+    results = list(handler.iter_transcribe_file(wav))
+    
+    assert [r["text"] for r in results] == ["segment 1", "segment 2", "segment 3"]
+    for i, result in enumerate(results):
+        assert result["start"] == pytest.approx(1.0 + 2.0 * i, abs=0.05)
+        assert result["end"] > result["start"] + 1.0
+
+def test_segments_are_capped_at_max_length(tmp_path, handler, monkeypatch):
+    monkeypatch.setattr("src.config.SEGMENT_MAX_SECONDS", 2)
+    wav = str(tmp_path / "long.wav")
+    make_bursts(wav, bursts=1, burst=5.0)
+    
+    list(handler.iter_transcribe_file(wav))
+    
+    assert len(handler.calls) == 3
+    frame = RATE * 30 // 1000
+    assert max(handler.calls) <= (2 * RATE + frame) * 2
+
+def test_transcribe_file_streaming_stitches_segments(tmp_path, handler):
+    wav = str(tmp_path / "bursts.wav")
+    make_bursts(wav, bursts=2)
+    
+    result = handler.transcribe_file_streaming(wav)
+    
+    assert result["success"]
+    assert result["text"] == "segment 1 segment 2"
+    assert [s["text"] for s in result["segments"]] == ["segment 1", "segment 2"]
+
+def test_only_speech_is_sent_and_reported(tmp_path, handler):
+    wav = str(tmp_path / "bursts.wav")
+    make_bursts(wav, bursts=2, gap=3.0)
+    
+    result = handler.transcribe_file_streaming(wav)
+    short = handler.transcribe_file(wav)
+    
+    assert result["vad"]["total_seconds"] == pytest.approx(11.0)
+    assert result["vad"]["skipped_seconds"] > 5.0
+    assert short["success"] and short["vad"]["speech_seconds"] < 3.0
+    assert handler.calls[-1] < 3 * RATE * 2
+
+def test_24_bit_wavs_are_unpacked(tmp_path, handler):
+    wav = str(tmp_path / "bursts24.wav")
+    make_bursts(wav, bursts=2)
+    data, _ = sf.read(wav)
+    sf.write(wav, data, RATE, subtype='PCM_24')
+    
+    result = handler.transcribe_file_streaming(wav)
+    short = handler.transcribe_file(wav)
+    
+    assert result["text"] == "segment 1 segment 2"
+    assert result["segments"][0]["start"] == pytest.approx(1.0, abs=0.05)
+    assert short["success"] and short["vad"]["speech_seconds"] < 3.0
+
+def test_pcm_to_float_matches_soundfile(tmp_path):
+    wav = str(tmp_path / "ramp24.wav")
+    ramp = np.linspace(-0.9, 0.9, 101)
+    sf.write(wav, ramp, RATE, subtype='PCM_24')
+    with sr.AudioFile(wav) as source:
+        frame_data = source.stream.read(-1)
+    
+    assert np.allclose(pcm_to_float(frame_data, 3), sf.read(wav)[0], atol=1e-6)
+    with pytest.raises(ValueError):
+        pcm_to_float(b"\x00" * 10, 5)
+
+def test_process_audio_file_opens_the_wav_once(tmp_path, handler, monkeypatch):
+    monkeypatch.setattr("src.config.TRANSCRIPTIONS_DIR", str(tmp_path))
+    wav = str(tmp_path / "bursts.wav")
+    make_bursts(wav, bursts=2)
+    opened = []
+    original = sr.AudioFile.__enter__
+    def counting_enter(self):
+        opened.append(1)
+        return original(self)
+    monkeypatch.setattr(sr.AudioFile, "__enter__", counting_enter)
+    
+    result = handler.process_audio_file(wav)
+    
+    assert result["success"] and len(opened) == 1
+
+def test_transcribe_file_sends_audio_without_detected_speech(tmp_path, handler):
+    wav = str(tmp_path / "quiet.wav")
+    sf.write(wav, np.zeros(RATE), RATE, subtype='PCM_16')
+    
+    result = handler.transcribe_file(wav)
+    
+    assert result["text"] == "segment 1" and result["vad"]["speech_seconds"] == 0.0
+    assert handler.calls == [RATE * 2]
+
+def test_failed_segments_mark_the_transcript_partial(tmp_path, handler, monkeypatch):
+    monkeypatch.setattr("src.config.TRANSCRIPTIONS_DIR", str(tmp_path))
+    wav = str(tmp_path / "bursts.wav")
+    make_bursts(wav, bursts=3)
+    def flaky_recognize(audio_data, *args, **kwargs):
+        handler.calls.append(len(audio_data.frame_data))
+        if len(handler.calls) == 2:
+            raise sr.RequestError("connection reset")
+        return f"segment {len(handler.calls)}"
+    monkeypatch.setattr(handler.recognizer, "recognize_google", flaky_recognize)
+    
+    result = handler.process_audio_file(wav, streaming=True)
+    
+    assert result["success"] and result["transcription"] == "segment 1 segment 3"
+    assert result["partial"] and len(result["errors"]) == 1
+    failed, = result["failed_segments"]
+    assert failed["start"] == pytest.approx(3.0, abs=0.05) and "connection reset" in failed["error"]
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from src.summarizer import Summarizer
+from src.tokenized_document import TokenizedDocument
+
+STOP_WORDS = {'the', 'a', 'and', 'we'}
+
+def make_transcript(words, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"word{i}" for i in range(300)] + ['the', 'a', 'and', 'we']
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    tokens = rng.choice(vocabulary, size=words, p=weights / weights.sum())
+    boundaries = np.cumsum(rng.integers(4, 20, size=words // 4))
+    boundaries = boundaries[boundaries < words]
+    return ". ".join(" ".join(sentence) for sentence in np.split(tokens, boundaries)) + "."
+
+def dense_textrank(text, damping=0.85, iterations=200):
+    """Reference TextRank that builds the full similarity matrix."""
+    document = TokenizedDocument(text, STOP_WORDS)
+    sentences, term_ids, offsets, terms = document.sentences, document.term_ids, document.sentence_offsets, document.terms
+    content = [term not in STOP_WORDS for term in terms]
+    counts = np.zeros((len(sentences), len(terms)))
+    for row in range(len(sentences)):
+        for term in term_ids[offsets[row]:offsets[row + 1]]:
+            if content[term]:
+                counts[row, term] += 1
+    idf = np.log((1 + len(sentences)) / (1 + (counts > 0).sum(axis=0))) + 1
+    vectors = counts * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    degree = similarity.sum(axis=1)
+    count = len(sentences)
+    ranks = np.full(count, 1.0 / count)
+    for _ in range(iterations):
+        outgoing = np.divide(ranks, degree, out=np.zeros(count), where=degree > 1e-12)
+        ranks = (1 - damping) / count + damping * (similarity @ outgoing + ranks[degree <= 1e-12].sum() / count)
+    return ranks
+
+def test_textrank_matches_dense_reference():
+    text = make_transcript(600)
+    summarizer = Summarizer(STOP_WORDS, method='textrank', max_iter=200, tolerance=1e-12)
+
+    ranks = summarizer.scores(TokenizedDocument(text, STOP_WORDS))
+
+    assert np.allclose(ranks, dense_textrank(text), atol=1e-9)
+    assert ranks.sum() == pytest.approx(1.0)
+
+def test_frequency_scoring_matches_word_counts():
+    text = "budget review today. budget budget. server outage! the and we. budget server?"
+    document = TokenizedDocument(text, STOP_WORDS)
+
+    scores = Summarizer(STOP_WORDS, method='frequency').scores(document)
+
+    assert document.sentences == ["budget review today", "budget budget", "server outage", "the and we", "budget server"]
+    # budget occurs 4 times, server 2, review, today and outage once
+    assert scores.tolist() == pytest.approx([6 / 4, 8 / 3, 3 / 3, 0, 6 / 3])
+
+@pytest.mark.parametrize("method", Summarizer.METHODS)
+def test_repeated_sentences_are_kept_apart(method):
+    text = "budget plan approved. weather talk. budget plan approved. lunch."
+
+    summary = Summarizer(STOP_WORDS, method=method).summarize(text, num_sentences=2)
+
+    assert summary == "budget plan approved. budget plan approved."
+
+def test_summary_length_is_configurable():
+    text = make_transcript(2000)
+    summarizer = Summarizer(STOP_WORDS)
+    sentences = TokenizedDocument(text, STOP_WORDS).sentences
+
+    assert len(summarizer.summarize(text, num_sentences=5).split('. ')) == 5
+    assert len(summarizer.summarize(text, ratio=0.1).split('. ')) == round(len(sentences) * 0.1)
+    assert summarizer.summarize("Too short. To summarize.") == "Too short. To summarize."
+    with pytest.raises(ValueError):
+        Summarizer(STOP_WORDS, method='lexrank')
@@ -0,0 +1,58 @@
+import numpy as np
+from src import config
+from src.tokenized_document import TokenizedDocument
+from src.topic_model import OnlineTopicModel
+
+STOP_WORDS = {'the', 'we', 'a'}
+
+def test_document_layout():
+    document = TokenizedDocument("We ship the Budget today! The budget, again? ...", STOP_WORDS)
+
+    assert document.sentences == ["We ship the Budget today", "The budget, again"]
+    assert document.terms == ['we', 'ship', 'the', 'budget', 'today', 'again']
+    assert document.term_ids.dtype == np.int32
+    assert document.term_ids.tolist() == [0, 1, 2, 3, 4, 2, 3, 5]
+    assert document.sentence_offsets.tolist() == [0, 5, 8]
+    assert document.sentence_terms(1).tolist() == [2, 3, 5]
+    assert document.stopword_mask.tolist() == [True, False, True, False, False, False]
+    assert document.content_mask.tolist() == [False, True, False, True, True, True]
+    assert document.num_words == 8
+
+def test_punctuation_is_stripped_from_words():
+    document = TokenizedDocument("Don't skip the follow-up, budget; (budget) \"review\"", STOP_WORDS)
+
+    assert document.terms == ["don't", 'skip', 'the', 'follow-up', 'budget', 'review']
+    assert document.top_terms(3) == ['budget', "don't", 'skip']
+
+def test_term_counts_and_matrix_cover_content_words_only():
+    document = TokenizedDocument("budget plan. the budget. budget budget plan.", STOP_WORDS)
+
+    assert dict(zip(document.terms, document.term_counts().tolist())) == {'budget': 4, 'plan': 2, 'the': 0}
+    assert document.sentence_term_matrix().toarray().tolist() == [[1, 1, 0], [1, 0, 0], [2, 1, 0]]
+    assert document.top_terms(10) == ['budget', 'plan']
+
+def test_interned_terms_share_one_string():
+    first = TokenizedDocument("quarterly " * 3, STOP_WORDS)
+    second = TokenizedDocument("quarterly report", STOP_WORDS)
+
+    assert first.terms[0] is second.terms[0]
+
+def test_analyze_text_tokenizes_once(tmp_path, monkeypatch, make_processor):
+    monkeypatch.setattr(config, "TOPIC_MODEL_PATH", str(tmp_path / "topics.joblib"))
+    monkeypatch.setattr(config, "TOPIC_MODEL_MIN_DOCUMENTS", 1)
+    constructed = []
+    original = TokenizedDocument.__init__
+    def counting_init(self, *args, **kwargs):
+        constructed.append(1)
+        original(self, *args, **kwargs)
+    monkeypatch.setattr(TokenizedDocument, "__init__", counting_init)
+    processor = make_processor(stop_words=STOP_WORDS, corpus_topic_model=OnlineTopicModel(num_topics=2))
+    text = "good budget review. server outage was bad. budget approved. we ship the release. release notes."
+
+    first, _ = processor.analyze_text(text, output_dir=str(tmp_path), learn_topics=True)
+    second, _ = processor.analyze_text(text, output_dir=str(tmp_path))  # Now inferred from the corpus model
+
+    assert len(constructed) == 2
+    assert first['key_phrases'][:2] == ['budget', 'release']
+    assert len(first['summary'].split('. ')) == 3
+    assert all('weight' in topic for topic in second['topics'])
@@ -0,0 +1,67 @@
+import threading
+import numpy as np
+import speech_recognition as sr
+from src.recognition_backends import FakeBackend
+from src.realtime_transcription import RealtimeTranscriber
+from src.transcript_events import TranscriptEventBus
+
+def test_every_subscriber_gets_each_event_once_in_order():
+    bus = TranscriptEventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+
+    publishers = [
+        threading.Thread(target=lambda n=n: [bus.publish('segment', text=f"{n}-{i}") for i in range(100)])
+        for n in range(4)
+    ]
+    for publisher in publishers:
+        publisher.start()
+    for publisher in publishers:
+        publisher.join()
+    bus.close()
+
+    received = [list(first), list(second)]
+    for events in received:
+        assert [event['sequence'] for event in events] == list(range(400))
+        assert len({event['text'] for event in events}) == 400
+    assert received[0] == received[1]
+
+def test_drain_returns_burst_without_polling():
+    bus = TranscriptEventBus()
+    subscription = bus.subscribe()
+
+    assert subscription.drain(timeout=0.01) == []
+    bus.publish('segment', text="one")
+    bus.publish('segment', text="one")  # Repeated text is not deduplicated
+    assert [event['text'] for event in subscription.drain(timeout=1)] == ["one", "one"]
+
+    bus.close()
+    assert subscription.drain() == [] and subscription.closed
+
+def test_unsubscribed_and_late_subscribers():
+    bus = TranscriptEventBus()
+    early = bus.subscribe()
+    bus.publish('segment', text="before")
+    late = bus.subscribe()
+    early.unsubscribe()
+    bus.publish('segment', text="after")
+
+    assert [event['text'] for event in early.drain(timeout=0)] == ["before"]
+    assert [event['text'] for event in late.drain(timeout=0)] == ["after"]
+
+def test_transcriber_publishes_segments(monkeypatch):
+    monkeypatch.setattr(RealtimeTranscriber, "nlp_processor", None)
+    transcriber = RealtimeTranscriber(backend=FakeBackend(text="said"), recognition_workers=3, capture='ring')
+    subscription = transcriber.subscribe()
+    rng = np.random.default_rng(0)
+
+    transcriber._start_recognition_workers()
+    for _ in range(5):
+        samples = (rng.standard_normal(1600) * 3000).astype('<i2')
+        transcriber.transcript_queue.put(sr.AudioData(samples.tobytes(), 16000, 2))
+    transcriber._stop_recognition_workers()
+    transcriber.events.close()
+
+    events = list(subscription)
+    assert [event['type'] for event in events] == ['segment'] * 5
+    assert [event['index'] for event in events] == list(range(5))
+    assert [event['sequence'] for event in events] == list(range(5))
@@ -0,0 +1,90 @@
+from multiprocessing import Pool
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+from src.speech_recognition import SpeechHandler
+from src.transcription_cache import TranscriptionCache
+
+def _put_entries(args):
+    path, worker = args
+    cache = TranscriptionCache(path, max_bytes=10 ** 6)
+    for i in range(20):
+        cache.put(f"{worker}-{i}", {'transcription': f"text {worker} {i}"})
+        assert cache.get(f"{worker}-{i}") is not None
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = TranscriptionCache(str(tmp_path / "cache.sqlite"), max_bytes=200)
+    for i in range(3):
+        cache.put(f"key{i}", {'transcription': "x" * 40})
+    cache.get("key0")
+    cache.put("key3", {'transcription': "x" * 40})
+    
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+    assert cache.stats()['bytes'] <= 200
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = TranscriptionCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("missing") is None
+    cache.put("present", {'transcription': "hello"})
+    assert cache.get("present") == {'transcription': "hello"}
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+def test_key_depends_on_settings():
+    assert TranscriptionCache.make_key("abc", {'backend': 'google'}) != \
+        TranscriptionCache.make_key("abc", {'backend': 'fake'})
+
+def test_concurrent_processes_share_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    TranscriptionCache(path)
+    with Pool(4) as pool:
+        pool.map(_put_entries, [(path, worker) for worker in range(4)])
+    
+    stats = TranscriptionCache(path).stats()
+    assert stats['entries'] == 80
+    assert stats['hits'] == 80
+
+def test_handler_skips_recognizer_on_repeat_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(sr, "Microphone", lambda *args, **kwargs: None)
+    monkeypatch.setattr("src.config.TRANSCRIPTIONS_DIR", str(tmp_path))
+    wav = str(tmp_path / "clip.wav")
+    sf.write(wav, 0.3 * np.ones(8000), 16000, subtype='PCM_16')
+    
+    handler = SpeechHandler(cache=TranscriptionCache(str(tmp_path / "cache.sqlite")))
+    calls = []
+    monkeypatch.setattr(
+        handler.recognizer, "recognize_google",
+        lambda audio_data, *args, **kwargs: calls.append(1) or "hello"
+    )
+    
+    first = handler.process_audio_file(wav)
+    second = handler.process_audio_file(wav)
+    
+    assert len(calls) == 1
+    assert second['cached'] and second['transcription'] == first['transcription']
+    assert handler.cache.stats()['hits'] == 1
+
+def test_partial_transcripts_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(sr, "Microphone", lambda *args, **kwargs: None)
+    monkeypatch.setattr("src.config.TRANSCRIPTIONS_DIR", str(tmp_path))
+    wav = str(tmp_path / "bursts.wav")
+    burst, gap = 0.5 * np.ones(16000), np.zeros(16000)
+    sf.write(wav, np.concatenate([gap, burst, gap, burst, gap]), 16000, subtype='PCM_16')
+    
+    handler = SpeechHandler(cache=TranscriptionCache(str(tmp_path / "cache.sqlite")))
+    calls = []
+    def flaky_recognize(audio_data, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise sr.RequestError("connection reset")
+        return "hello"
+    monkeypatch.setattr(handler.recognizer, "recognize_google", flaky_recognize)
+    
+    first = handler.process_audio_file(wav, streaming=True)
+    second = handler.process_audio_file(wav, streaming=True)
+    
+    assert first['partial'] and first['transcription'] == "hello"
+    assert not second.get('cached') and second['transcription'] == "hello hello"
+    assert handler.cache.stats()['entries'] == 1
@@ -0,0 +1,41 @@
+import numpy as np
+import soundfile as sf
+import pytest
+from src.waveform import min_max_envelope, read_envelope, envelope_trace
+
+RATE = 8000
+
+def test_envelope_keeps_extremes():
+    samples = np.zeros(1000, dtype=np.float32)
+    samples[123] = 0.9
+    samples[877] = -0.7
+    
+    mins, maxs, bin_size = min_max_envelope(samples, 10)
+    
+    assert bin_size == 100 and len(mins) == 10
+    assert maxs[1] == pytest.approx(0.9) and mins[8] == pytest.approx(-0.7)
+
+def test_envelope_handles_partial_last_bin():
+    mins, maxs, bin_size = min_max_envelope(np.arange(10, dtype=np.float32), 4)
+    
+    assert bin_size == 3
+    assert list(mins) == [0, 3, 6, 9] and list(maxs) == [2, 5, 8, 9]
+
+def test_read_envelope_matches_in_memory_envelope(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.WAVEFORM_BLOCK_FRAMES", 1000)
+    rng = np.random.default_rng(0)
+    signal = rng.uniform(-1, 1, RATE * 10).astype(np.float32)
+    path = str(tmp_path / "noise.wav")
+    sf.write(path, signal, RATE, subtype='FLOAT')
+    
+    times, mins, maxs = read_envelope(path, 2.0, 7.5, n_bins=300)
+    window = signal[2 * RATE:int(7.5 * RATE)]
+    expected_mins, expected_maxs, bin_size = min_max_envelope(window, 300)
+    
+    np.testing.assert_array_equal(mins, expected_mins)
+    np.testing.assert_array_equal(maxs, expected_maxs)
+    assert times[0] == pytest.approx(2.0)
+    assert times[1] - times[0] == pytest.approx(bin_size / RATE)
+    
+    x, y = envelope_trace(times, mins, maxs)
+    assert len(x) == len(y) == 2 * len(mins) <= 600